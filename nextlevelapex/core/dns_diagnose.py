@@ -53,6 +53,21 @@ def _first_ip(text: str) -> str:
     return match.group(0) if match else "unknown"
 
 
+def parse_network_services(networksetup_output: str) -> list[str]:
+    """
+    Parse `networksetup -listallnetworkservices` output.
+    The first line is a legend; disabled services are prefixed with `*`.
+    """
+    lines = networksetup_output.splitlines()
+    services: list[str] = []
+    for line in lines[1:]:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("*"):
+            continue
+        services.append(stripped)
+    return services
+
+
 def _parse_nameservers_from_scutil(scutil_output: str) -> list[str]:
     return re.findall(r"nameserver\[\d+\]\s*:\s*([0-9.]+)", scutil_output)
 
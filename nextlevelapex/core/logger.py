@@ -34,7 +34,12 @@ class LoggerProxy:
         return self._logger
 
     def __getattr__(self, item: str) -> Any:
-        return getattr(self._get_logger(), item)
+        value = getattr(self._get_logger(), item)
+        if callable(value):
+            # Bound methods (info, debug, ...) check the level per call, so keep them on the
+            # instance and skip this lookup next time; plain attributes stay live.
+            setattr(self, item, value)
+        return value
 
 
 def setup_logging(config: dict[str, Any], verbose: bool = False) -> None:
@@ -1,12 +1,16 @@
 # nextlevelapex/core/state.py
+import functools
 import hashlib
 import json
 import logging
+import os
+import stat
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Any, cast
 
-from pydantic import BaseModel, Field, ValidationError
+from pydantic import BaseModel, Field, TypeAdapter, ValidationError
 
 STATE_SCHEMA_VERSION = "2.0"
 
@@ -17,12 +21,15 @@ DEFAULT_STATE: dict[str, Any] = {
     "failed_sections": [],
     "task_status": {},  # e.g., { "dns_stack": {"status": "SUCCESS", "last_healthy": "..."} }
     "file_hashes": {},  # e.g., { "/path/to/file": "sha256:..." }
+    "file_stats": {},  # e.g., { "/path/to/file": {"mtime_ns": ..., "size": ...} }
     "health_history": {},  # e.g., { "dns_stack": [ { "timestamp": "...", "status": "PASS", ... }, ... ] }
     "service_versions": {},  # e.g., { "docker": "24.0.7", ... }
     "last_report_path": None,
 }
 
 STATE_HISTORY_DEPTH = 10  # How many historic health results to store
+HASH_CHUNK_SIZE = 65536  # Bytes read per hasher.update() call
+HASH_MAX_WORKERS = 8  # Upper bound on threads used to hash tracked files
 
 
 class TaskStatus(BaseModel):
@@ -40,6 +47,11 @@ class HealthEntry(BaseModel):
     model_config = {"extra": "allow"}
 
 
+class FileStat(BaseModel):
+    mtime_ns: int
+    size: int
+
+
 class StateSchema(BaseModel):
     version: str = STATE_SCHEMA_VERSION
     last_run_status: str = "UNKNOWN"
@@ -47,35 +59,56 @@ class StateSchema(BaseModel):
     failed_sections: list[str] = Field(default_factory=list)
     task_status: dict[str, TaskStatus] = Field(default_factory=dict)
     file_hashes: dict[str, str] = Field(default_factory=dict)
+    file_stats: dict[str, FileStat] = Field(default_factory=dict)
     health_history: dict[str, list[HealthEntry]] = Field(default_factory=dict)
     service_versions: dict[str, str] = Field(default_factory=dict)
     last_report_path: str | None = None
 
 
-def _safe_json_load(path: Path) -> dict[str, Any]:
-    try:
-        with path.open("r") as f:
-            return cast(dict[str, Any], json.load(f))
-    except Exception:
-        return {}
-
+# Serializer for whole state dicts; pydantic-core's Rust encoder replaces stdlib json here
+_STATE_JSON = TypeAdapter(dict[str, Any])
 
-def load_state(path: Path) -> dict[str, Any]:
-    if not path.exists():
-        return DEFAULT_STATE.copy()
-    data = _safe_json_load(path)
-    merged = DEFAULT_STATE.copy()
-    merged.update(data)
 
+@functools.lru_cache(maxsize=4)
+def _load_validated_state(
+    path_str: str, mtime_ns: int, size: int, inode: int
+) -> StateSchema | None:
+    """Parse and validate a state file; cached per on-disk identity of the file."""
     try:
-        # Strict validation against schema to prevent payload injection
-        validated = StateSchema.model_validate(merged)
-        return validated.model_dump()
+        # Parse and validate in one native pass; missing keys take the schema defaults
+        return StateSchema.model_validate_json(Path(path_str).read_bytes())
+    except OSError:
+        return None
     except ValidationError as e:
+        if any(err["type"] == "json_invalid" for err in e.errors()):
+            return None
+        # Strict validation against schema to prevent payload injection
         logging.warning(
             f"State file failed validation (potential poisoning). Resetting. Error: {e}"
         )
+        return None
+
+
+def dump_state_json(data: dict[str, Any], indent: int | None = 2) -> bytes:
+    """Serialize a state dict to UTF-8 JSON; indent=None gives compact separators."""
+    return _STATE_JSON.dump_json(data, indent=indent)
+
+
+def invalidate_state_cache() -> None:
+    """Drop cached state so the next load_state() re-reads from disk."""
+    _load_validated_state.cache_clear()
+
+
+def load_state(path: Path) -> dict[str, Any]:
+    try:
+        st = path.stat()
+    except OSError:
         return DEFAULT_STATE.copy()
+    validated = _load_validated_state(str(path), st.st_mtime_ns, st.st_size, st.st_ino)
+    if validated is None:
+        return DEFAULT_STATE.copy()
+    # model_dump() builds fresh containers, so callers may mutate the result freely
+    return validated.model_dump()
 
 
 def atomic_write_json_0600(data: dict[str, Any], path: Path) -> bool:
@@ -84,7 +117,7 @@ def atomic_write_json_0600(data: dict[str, Any], path: Path) -> bool:
     from nextlevelapex.core.io import atomic_write_text
 
     try:
-        content = json.dumps(data, indent=2)
+        content = dump_state_json(data).decode("utf-8")
         atomic_write_text(path, content, perms=0o600)
         return True
     except Exception as e:
@@ -97,13 +130,12 @@ def save_state(data: dict[str, Any], path: Path, dry_run: bool = False) -> bool:
         print("[DRYRUN] Would write state:", json.dumps(data, indent=2))
         return True
 
+    invalidate_state_cache()
     return atomic_write_json_0600(data, path)
 
 
 def compute_file_history_hash(path: Path) -> str | None:
     """Pure function to compute SHA256 file hash without state mutation."""
-    import os
-
     if not path.exists() or not path.is_file():
         return None
 
@@ -118,7 +150,7 @@ def compute_file_history_hash(path: Path) -> str | None:
         fd = os.open(path, os.O_RDONLY | os.O_NOFOLLOW)
         with os.fdopen(fd, "rb") as f:
             while True:
-                buf = f.read(4096)
+                buf = f.read(HASH_CHUNK_SIZE)
                 if not buf:
                     break
                 hasher.update(buf)
@@ -128,16 +160,65 @@ def compute_file_history_hash(path: Path) -> str | None:
         return None
 
 
-def compute_file_hashes(paths: list[Path]) -> dict[str, str]:
-    """Pure function to compute hashes for a list of files."""
+def compute_file_hashes(
+    paths: list[Path], known_hashes: dict[str, str] | None = None
+) -> dict[str, str]:
+    """
+    Pure function to compute hashes for a list of files.
+    Paths present in `known_hashes` reuse that hash without being read.
+    Hashing is I/O bound, so multiple files are hashed on a small thread pool;
+    results keep the order of `paths`.
+    """
+    known = known_hashes or {}
+    pending = [path for path in paths if str(path) not in known]
+    if len(pending) <= 1:
+        digests = [compute_file_history_hash(path) for path in pending]
+    else:
+        with ThreadPoolExecutor(max_workers=min(HASH_MAX_WORKERS, len(pending))) as pool:
+            digests = list(pool.map(compute_file_history_hash, pending))
+    hashed = {str(path): h for path, h in zip(pending, digests) if h}
+
     hashes = {}
     for path in paths:
-        h = compute_file_history_hash(path)
+        key = str(path)
+        h = known.get(key) or hashed.get(key)
         if h:
-            hashes[str(path)] = h
+            hashes[key] = h
     return hashes
 
 
+def stat_files(paths: list[Path]) -> dict[str, dict[str, int]]:
+    """
+    Pure function to snapshot mtime/size for regular files.
+    Symlinks and missing files are omitted, so they are never treated as unchanged.
+    """
+    stats: dict[str, dict[str, int]] = {}
+    for path in paths:
+        try:
+            st = os.lstat(path)
+        except OSError:
+            continue
+        if stat.S_ISREG(st.st_mode):
+            stats[str(path)] = {"mtime_ns": st.st_mtime_ns, "size": st.st_size}
+    return stats
+
+
+def unchanged_file_hashes(
+    prev_hashes: dict[str, str],
+    prev_stats: dict[str, dict[str, int]],
+    current_stats: dict[str, dict[str, int]],
+) -> dict[str, str]:
+    """
+    Pure function returning the previous hashes whose file mtime and size are unchanged.
+    These can be passed to compute_file_hashes() as `known_hashes` to skip re-reading.
+    """
+    return {
+        path: h
+        for path, h in prev_hashes.items()
+        if path in current_stats and prev_stats.get(path) == current_stats[path]
+    }
+
+
 def check_drift(prev_hashes: dict[str, str], current_hashes: dict[str, str]) -> bool:
     """
     Pure function to compare two hash dictionaries.
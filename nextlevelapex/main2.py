@@ -1,33 +1,41 @@
 # nextlevelapex/main.py
 
+import functools
 import importlib
+import logging
+import os
 import re
 import shutil
+import string
 import subprocess
 import sys
+import traceback
 from collections.abc import Callable
 from datetime import datetime
 from pathlib import Path
-from typing import Annotated, Any, Dict, List, Optional, Type, Union
+from typing import Annotated, Any, Dict, List, Optional, Tuple, Type, Union
 
 import typer
 
 from nextlevelapex.core.config import DEFAULT_CONFIG_PATH, generate_default_config, load_config
-from nextlevelapex.core.dns_diagnose import collect_dns_summary, render_dns_summary
+from nextlevelapex.core.dns_diagnose import parse_network_services
 from nextlevelapex.core.logger import LoggerProxy
 from nextlevelapex.core.registry import get_task_registry
 
-# Import core state and base_task utilities
-from nextlevelapex.core.report import generate_report
-
 # Import core state and base_task utilities
 from nextlevelapex.core.state import (
+    check_drift,
+    compute_file_hashes,
+    dump_state_json,
     file_hash_changed,
     get_task_health_trend,
+    invalidate_state_cache,
     load_state,
     mark_section_complete,
     mark_section_failed,
     save_state,
+    stat_files,
+    unchanged_file_hashes,
     update_file_hashes,
     update_task_health,
 )
@@ -61,14 +69,21 @@ ALLOWED_MODULES = [
     "security",
     "system",
 ]
+_ALLOWED_FULL_MODULES = frozenset(f"nextlevelapex.tasks.{m}" for m in ALLOWED_MODULES)
 
-SUDOERS_SUPPORTED_INCLUDE_DIRS = (
-    "/private/etc/sudoers.d",
-    "/etc/sudoers.d",
+SUDOERS_SUPPORTED_INCLUDE_DIRS = frozenset(
+    {
+        "/private/etc/sudoers.d",
+        "/etc/sudoers.d",
+    }
 )
+SUDOERS_PATH = Path("/etc/sudoers")
+SUDOERS_DROPIN_PATH = Path("/etc/sudoers.d/nextlevelapex")
+SUDOERS_MAX_BYTES = 65536  # Upper bound on sudoers content read for the includedir check
 SUDOERS_INTERFACE_PATTERN = re.compile(r"^[A-Za-z0-9._\-() ]+$")
 SUDOERS_USER_PATTERN = re.compile(r"^[A-Za-z0-9._-]+$")
-SUDOERS_FORBIDDEN_CHARS = ("\n", "\r", "\t", ",", "\x00", '"', "'")
+SUDOERS_FORBIDDEN_CHARS = frozenset("\n\r\t,\x00\"'")
+SERVICE_NAME_PATTERN = re.compile(r"^[a-zA-Z0-9_\-]+$")
 
 
 class InterfaceValidationError(ValueError):
@@ -79,19 +94,29 @@ class InterfaceNotFoundError(InterfaceValidationError):
     pass
 
 
-def _parse_network_services(networksetup_output: str) -> list[str]:
+NETWORK_PREFERENCES_PATH = Path("/Library/Preferences/SystemConfiguration/preferences.plist")
+
+
+@functools.lru_cache(maxsize=1)
+def _list_network_services(prefs_mtime_ns: Optional[int]) -> tuple[str, ...]:
     """
-    Parse `networksetup -listallnetworkservices` output.
-    Disabled services are prefixed with `*`.
+    Run `networksetup -listallnetworkservices` (no shell=True) and parse it.
+    Cached on the mtime of the SystemConfiguration preferences, which changes
+    whenever a network service is added, removed, or toggled.
     """
-    lines = networksetup_output.splitlines()
-    services: list[str] = []
-    for line in lines[1:]:
-        stripped = line.strip()
-        if not stripped or stripped.startswith("*"):
-            continue
-        services.append(stripped)
-    return services
+    check = subprocess.run(
+        ["networksetup", "-listallnetworkservices"], capture_output=True, text=True, check=True
+    )
+    return tuple(parse_network_services(check.stdout))
+
+
+def _active_network_services() -> tuple[str, ...]:
+    try:
+        prefs_mtime_ns = NETWORK_PREFERENCES_PATH.stat().st_mtime_ns
+    except OSError:
+        # No cache key available; always ask networksetup directly
+        return _list_network_services.__wrapped__(None)
+    return _list_network_services(prefs_mtime_ns)
 
 
 def _validate_interface_name(interface: str, valid_interfaces: list[str]) -> None:
@@ -115,25 +140,33 @@ def _validate_interface_name(interface: str, valid_interfaces: list[str]) -> Non
 
 def _sudoers_escape_arg(arg: str) -> str:
     """Strictly escape a single argument for sudoers command specs."""
-    if any(char in arg for char in SUDOERS_FORBIDDEN_CHARS):
+    if not SUDOERS_FORBIDDEN_CHARS.isdisjoint(arg):
         raise ValueError("Invalid character in sudoers argument")
     return arg.replace("\\", "\\\\").replace(" ", "\\ ")
 
 
+# Static arguments are escaped once at import; only the interface is escaped per render.
+_SUDOERS_RULE_COMMANDS_TEMPLATE = ", ".join(
+    " ".join(_sudoers_escape_arg(arg) for arg in cmd)
+    for cmd in (
+        ("/usr/libexec/ApplicationFirewall/socketfilterfw", "--setstealthmode", "on"),
+        ("/usr/sbin/networksetup", "-setdnsservers", "{iface}", "127.0.0.1"),
+        ("/usr/sbin/networksetup", "-setdnsservers", "{iface}", "Empty"),
+    )
+)
+
+
 def _render_sudoers_rule(user: str, interface: str) -> str:
-    commands = [
-        ["/usr/libexec/ApplicationFirewall/socketfilterfw", "--setstealthmode", "on"],
-        ["/usr/sbin/networksetup", "-setdnsservers", interface, "127.0.0.1"],
-        ["/usr/sbin/networksetup", "-setdnsservers", interface, "Empty"],
-    ]
-    rendered_cmds = [" ".join(_sudoers_escape_arg(arg) for arg in cmd) for cmd in commands]
-    return f"{user} ALL=(root) NOPASSWD: {', '.join(rendered_cmds)}\n"
+    commands = _SUDOERS_RULE_COMMANDS_TEMPLATE.format(iface=_sudoers_escape_arg(interface))
+    return f"{user} ALL=(root) NOPASSWD: {commands}\n"
 
 
+@functools.lru_cache(maxsize=4)
 def _sudoers_includedir_present(sudoers_content: str) -> bool:
+    # Cached on the exact content; only `#includedir` lines are tokenized.
     for raw_line in sudoers_content.splitlines():
-        line = raw_line.strip()
-        if not line:
+        line = raw_line.lstrip()
+        if not line.startswith("#includedir"):
             continue
         tokens = line.split()
         if len(tokens) < 2:
@@ -143,14 +176,31 @@ def _sudoers_includedir_present(sudoers_content: str) -> bool:
     return False
 
 
+def _drop_partial_last_line(content: str) -> str:
+    """
+    A read that hit SUDOERS_MAX_BYTES may end mid-line (e.g. `#includedir /etc/sudoers.d`
+    cut out of `/etc/sudoers.d.disabled`), so keep only the lines that were read whole.
+    """
+    if len(content) < SUDOERS_MAX_BYTES:
+        return content
+    return content[: content.rfind("\n") + 1]
+
+
 def _read_sudoers_content_for_check() -> Optional[str]:
+    """
+    Read at most SUDOERS_MAX_BYTES of /etc/sudoers, falling back to `sudo -n cat`.
+    Oversized files are cut back to their last complete line within the cap.
+    """
     try:
-        return Path("/etc/sudoers").read_text()
+        with SUDOERS_PATH.open("rb") as f:
+            content = f.read(SUDOERS_MAX_BYTES).decode("ascii", errors="replace")
+        return _drop_partial_last_line(content)
     except PermissionError:
         try:
             check = subprocess.run(
                 ["sudo", "-n", "cat", "/etc/sudoers"],
-                capture_output=True,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
                 text=True,
                 check=False,
                 timeout=5,
@@ -163,11 +213,22 @@ def _read_sudoers_content_for_check() -> Optional[str]:
             return None
         if not (check.stdout or "").strip():
             return None
-        return check.stdout
+        return _drop_partial_last_line(check.stdout[:SUDOERS_MAX_BYTES])
     except OSError:
         return None
 
 
+def _sudoers_dropin_matches(rule: str) -> bool:
+    """True if the drop-in is root-owned, mode 0440 and already contains `rule`."""
+    try:
+        st = SUDOERS_DROPIN_PATH.stat()
+        if st.st_uid != 0 or st.st_mode & 0o7777 != 0o440:
+            return False
+        return SUDOERS_DROPIN_PATH.read_text() == rule
+    except (OSError, UnicodeDecodeError):
+        return False
+
+
 def discover_tasks() -> Dict[str, Union[Type[BaseTask], Callable]]:
     """
     Dynamically import and register explicitly allowed tasks in tasks/ directory.
@@ -175,37 +236,37 @@ def discover_tasks() -> Dict[str, Union[Type[BaseTask], Callable]]:
     Returns dict: { task_name: callable }
     """
     tasks = {}
+    # Bind once: already-imported task modules are served straight from sys.modules,
+    # so repeat discovery (list-tasks, auto-fix, tests) skips the import machinery.
+    loaded_modules = sys.modules
+    import_module = importlib.import_module
 
     for module_name in ALLOWED_MODULES:
         full_module_name = f"nextlevelapex.tasks.{module_name}"
-        try:
-            module = importlib.import_module(full_module_name)
-        except Exception as e:
-            print(f"[ERROR] Could not import {full_module_name}: {e}")
-            continue
+        module = loaded_modules.get(full_module_name)
+        if module is None:
+            try:
+                module = import_module(full_module_name)
+            except Exception as e:
+                print(f"[ERROR] Could not import {full_module_name}: {e}")
+                continue
 
-        # Find all BaseTask subclasses
-        for attr in dir(module):
-            obj = getattr(module, attr)
+        # Find all BaseTask subclasses straight from the module namespace
+        namespace = vars(module)
+        for obj in namespace.values():
             if isinstance(obj, type) and issubclass(obj, BaseTask) and obj is not BaseTask:
                 task_name = getattr(obj, "name", obj.__name__)
                 tasks[task_name] = obj  # Note: store class, instantiate later
 
         # Function-based tasks via @task decorator registry
-        if hasattr(module, "TASK_REGISTRY"):
-            tasks.update(module.TASK_REGISTRY)
+        registry = namespace.get("TASK_REGISTRY")
+        if registry is not None:
+            tasks.update(registry)
 
     # Add function tasks from global registry, gated by strict exact-match provenance
-    import logging
-
     for task_name, fn in get_task_registry().items():
         module_name = getattr(fn, "__module__", "") or ""
-        valid = False
-        for allowed in ALLOWED_MODULES:
-            if module_name == f"nextlevelapex.tasks.{allowed}":
-                valid = True
-                break
-        if valid:
+        if module_name in _ALLOWED_FULL_MODULES:
             tasks[task_name] = fn
         else:
             logging.warning(
@@ -232,11 +293,20 @@ def discover_files_for_hashing() -> List[Path]:
     existing_files = [f for f in files if f.exists()]
 
     # Optionally, include all .py files in tasks/core
-    existing_files += list((APP_ROOT / "core").glob("*.py"))
-    existing_files += list((APP_ROOT / "tasks").glob("*.py"))
+    existing_files += _python_files(APP_ROOT / "core")
+    existing_files += _python_files(APP_ROOT / "tasks")
     return existing_files
 
 
+def _python_files(directory: Path) -> List[Path]:
+    """List top-level .py files in a directory with a single scandir pass."""
+    try:
+        with os.scandir(directory) as entries:
+            return [Path(e.path) for e in entries if e.name.endswith(".py") and e.is_file()]
+    except OSError:
+        return []
+
+
 def ensure_task_state(state: StateDict, task_names: List[str]) -> None:
     """
     Ensures all discovered tasks are present in state (task_status, health_history, etc.)
@@ -248,12 +318,10 @@ def ensure_task_state(state: StateDict, task_names: List[str]) -> None:
             state["health_history"][t] = []
     # Remove stale tasks (optional)
     known = set(task_names)
-    for old in list(state["task_status"].keys()):
-        if old not in known:
-            del state["task_status"][old]
-    for old in list(state["health_history"].keys()):
-        if old not in known:
-            del state["health_history"][old]
+    for section in ("task_status", "health_history"):
+        entries = state[section]
+        for old in entries.keys() - known:
+            del entries[old]
 
 
 def run_task(
@@ -291,93 +359,103 @@ def run_task(
     return result
 
 
-def execute_remediation(action: RemediationAction, dry_run: bool = False) -> bool:
-    """
-    Executes a specific remediation action safely.
-    Returns True if successful, False otherwise.
-    """
-    action_type = action.get("action_type")
-    payload = action.get("payload", "")
-    req_elevated = action.get("requires_elevated", False)
-
-    if action_type == "shell_cmd":
-        # Mitigate CWE-94 arbitrary code execution from state.json poisoning
-        # We strictly map payloads to defined argument vectors to ensure no arbitrary commands can run.
-        ALLOWED_SHELL_CMDS = {
-            "touch /tmp/nextlevelapex_dummy_heal.txt": [
-                "touch",
-                "/tmp/nextlevelapex_dummy_heal.txt",
-            ],
-        }
+# Mitigate CWE-94 arbitrary code execution from state.json poisoning
+# We strictly map payloads to defined argument vectors to ensure no arbitrary commands can run.
+_ALLOWED_SHELL_CMDS: Dict[str, Tuple[str, ...]] = {
+    "touch /tmp/nextlevelapex_dummy_heal.txt": ("touch", "/tmp/nextlevelapex_dummy_heal.txt"),
+}
 
-        if payload not in ALLOWED_SHELL_CMDS:
-            typer.secho(
-                f"    SECURITY ERROR: Disallowed shell_cmd payload intercepted: {payload}",
-                fg=typer.colors.RED,
-            )
-            return False
 
-        cmd_list = ALLOWED_SHELL_CMDS[payload]
-        if req_elevated:
-            cmd_list = ["sudo"] + cmd_list
+def _remediate_shell_cmd(payload: str, req_elevated: bool, dry_run: bool) -> bool:
+    cmd_list = _ALLOWED_SHELL_CMDS.get(payload)
+    if cmd_list is None:
+        typer.secho(
+            f"    SECURITY ERROR: Disallowed shell_cmd payload intercepted: {payload}",
+            fg=typer.colors.RED,
+        )
+        return False
 
-        cmd_str = " ".join(cmd_list)
-        if dry_run:
-            typer.secho(f"    DRY RUN: Would execute `{cmd_str}`", fg=typer.colors.YELLOW)
-            return True
+    if req_elevated:
+        cmd_list = ("sudo", *cmd_list)
 
-        try:
-            # Execute with a 30 second timeout to prevent hanging the orchestrator
-            result = subprocess.run(
-                cmd_list, check=True, text=True, capture_output=True, timeout=30
-            )
-            if result.stdout:
-                typer.echo(f"      STDOUT: {result.stdout.strip()}")
-            return True
-        except subprocess.TimeoutExpired:
-            typer.secho("    ACTION TIMED OUT AFTER 30s.", fg=typer.colors.RED)
-            return False
-        except subprocess.CalledProcessError as e:
-            typer.secho(
-                f"    ACTION FAILED (Exit {e.returncode}). STDERR: {e.stderr.strip()}",
-                fg=typer.colors.RED,
-            )
-            return False
+    cmd_str = " ".join(cmd_list)
+    if dry_run:
+        typer.secho(f"    DRY RUN: Would execute `{cmd_str}`", fg=typer.colors.YELLOW)
+        return True
 
-    elif action_type == "restart_service":
-        import re
+    try:
+        # Execute with a 30 second timeout to prevent hanging the orchestrator
+        result = subprocess.run(cmd_list, check=True, text=True, capture_output=True, timeout=30)
+        if result.stdout:
+            typer.echo(f"      STDOUT: {result.stdout.strip()}")
+        return True
+    except subprocess.TimeoutExpired:
+        typer.secho("    ACTION TIMED OUT AFTER 30s.", fg=typer.colors.RED)
+        return False
+    except subprocess.CalledProcessError as e:
+        typer.secho(
+            f"    ACTION FAILED (Exit {e.returncode}). STDERR: {e.stderr.strip()}",
+            fg=typer.colors.RED,
+        )
+        return False
 
-        if not re.match(r"^[a-zA-Z0-9_\-]+$", payload):
-            typer.secho(
-                f"    FAILED TO RESTART SERVICE: Invalid service name '{payload}'",
-                fg=typer.colors.RED,
-            )
-            return False
 
-        if sys.platform != "darwin":
-            cmd_list = ["sudo", "systemctl", "restart", payload]
-        else:
-            cmd_list = ["brew", "services", "restart", payload]
+def _remediate_restart_service(payload: str, req_elevated: bool, dry_run: bool) -> bool:
+    if SERVICE_NAME_PATTERN.fullmatch(payload) is None:
+        typer.secho(
+            f"    FAILED TO RESTART SERVICE: Invalid service name '{payload}'",
+            fg=typer.colors.RED,
+        )
+        return False
 
-        if dry_run:
-            typer.secho(f"    DRY RUN: Would restart service `{payload}`", fg=typer.colors.YELLOW)
-            return True
+    if sys.platform != "darwin":
+        cmd_list = ["sudo", "systemctl", "restart", payload]
+    else:
+        cmd_list = ["brew", "services", "restart", payload]
 
-        try:
-            subprocess.run(cmd_list, check=True, text=True, capture_output=True, timeout=15)
-            typer.echo(f"      Restarted service: {payload}")
-            return True
-        except subprocess.CalledProcessError:
-            typer.secho(f"    FAILED TO RESTART SERVICE: {payload}", fg=typer.colors.RED)
-            return False
+    if dry_run:
+        typer.secho(f"    DRY RUN: Would restart service `{payload}`", fg=typer.colors.YELLOW)
+        return True
 
-    elif action_type == "manual":
-        typer.secho(f"    MANUAL INTERVENTION REQUIRED: {payload}", fg=typer.colors.MAGENTA)
+    try:
+        subprocess.run(
+            cmd_list,
+            check=True,
+            text=True,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
+            timeout=15,
+        )
+        typer.echo(f"      Restarted service: {payload}")
+        return True
+    except subprocess.CalledProcessError:
+        typer.secho(f"    FAILED TO RESTART SERVICE: {payload}", fg=typer.colors.RED)
         return False
 
-    else:
+
+def _remediate_manual(payload: str, req_elevated: bool, dry_run: bool) -> bool:
+    typer.secho(f"    MANUAL INTERVENTION REQUIRED: {payload}", fg=typer.colors.MAGENTA)
+    return False
+
+
+_REMEDIATION_HANDLERS: Dict[str, Callable[[str, bool, bool], bool]] = {
+    "shell_cmd": _remediate_shell_cmd,
+    "restart_service": _remediate_restart_service,
+    "manual": _remediate_manual,
+}
+
+
+def execute_remediation(action: RemediationAction, dry_run: bool = False) -> bool:
+    """
+    Executes a specific remediation action safely.
+    Returns True if successful, False otherwise.
+    """
+    action_type = action.get("action_type")
+    handler = _REMEDIATION_HANDLERS.get(action_type)
+    if handler is None:
         typer.secho(f"    Unknown action type passed: {action_type}", fg=typer.colors.RED)
         return False
+    return handler(action.get("payload", ""), action.get("requires_elevated", False), dry_run)
 
 
 @app.callback(invoke_without_command=True)
@@ -416,12 +494,13 @@ def main(
     # 2b. Filter tasks if --task is provided
     if task:
         # User specified at least one filter
-        filtered = {}
-        target_lower_list = [t.lower() for t in task]
-        for name, task_callable in discovered_tasks.items():
-            name_lower = name.lower()
-            if any(t in name_lower for t in target_lower_list):
-                filtered[name] = task_callable
+        # One compiled alternation scans each name once instead of one `in` check per filter
+        filter_pattern = re.compile("|".join(re.escape(t.lower()) for t in task))
+        filtered = {
+            name: task_callable
+            for name, task_callable in discovered_tasks.items()
+            if filter_pattern.search(name.lower())
+        }
 
         if not filtered:
             typer.secho(f"No tasks matched the filters: {task}", fg=typer.colors.RED)
@@ -447,22 +526,26 @@ def main(
     ensure_task_state(state, task_names)
 
     # 3. Check config/manifest file hashes for drift detection using pure single-pass logic
-    from nextlevelapex.core.state import check_drift, compute_file_hashes
-
     files = discover_files_for_hashing()
 
     prev_hashes = state.get("file_hashes", {})
-    current_hashes = compute_file_hashes(files)
+    # Files whose mtime/size match the last run reuse their stored hash instead of being re-read
+    current_stats = stat_files(files)
+    known_hashes = unchanged_file_hashes(prev_hashes, state.get("file_stats", {}), current_stats)
+    current_hashes = compute_file_hashes(files, known_hashes=known_hashes)
     hash_drift = check_drift(prev_hashes, current_hashes)
 
     # 4. Now that drift is evaluated purely, safely update the tracked hashes in state
     state["file_hashes"] = current_hashes
+    state["file_stats"] = current_stats
 
     # 5. Run tasks as needed
+    task_status = state["task_status"]
+    force_run = hash_drift or mode in ("test", "stress", "security")
     for name, task_callable in discovered_tasks.items():
         print(f"\n[Task: {name}]")
-        last_status = state["task_status"].get(name, {}).get("status")
-        needs_run = (last_status != "PASS") or hash_drift or mode in ("test", "stress", "security")
+        info = task_status.get(name) or {}
+        needs_run = force_run or info.get("status") != "PASS"
         if not needs_run:
             print("  [SKIP] No drift or failure, healthy.")
             continue
@@ -504,6 +587,9 @@ def main(
         markdown_report = False
 
     if html_report or markdown_report:
+        # Report renderers are only loaded when a report is actually requested.
+        from nextlevelapex.core.report import generate_report
+
         h_path, m_path = generate_report(
             state, REPORTS_DIR, as_html=html_report, as_md=markdown_report
         )
@@ -517,8 +603,9 @@ def main(
     print("\n[Done] State updated.")
     print("Current health summary:")
     for t in task_names:
-        status = state["task_status"][t]["status"]
-        last_healthy = state["task_status"][t].get("last_healthy", "--")
+        info = task_status[t]
+        status = info["status"]
+        last_healthy = info.get("last_healthy", "--")
         print(f"  {t:20}: {status:8} (last healthy: {last_healthy})")
 
 
@@ -530,6 +617,8 @@ def diagnose(
     autofix: bool = typer.Option(False, help="Try recommended fix automatically (if possible)"),
 ):
     if task_name is None:
+        from nextlevelapex.core.dns_diagnose import collect_dns_summary, render_dns_summary
+
         summary = collect_dns_summary()
         typer.echo(render_dns_summary(summary))
         raise typer.Exit(code=summary.exit_code)
@@ -554,12 +643,10 @@ def diagnose(
     try:
         result = run_task(task_name, task_callable, context)
     except Exception as e:
-        import traceback as tb
-
         result = {
             "status": "ERROR",
             "explanation": str(e),
-            "traceback": tb.format_exc(),
+            "traceback": traceback.format_exc(),
         }
     status = result.get("status", "UNKNOWN")
     fg = typer.colors.GREEN if status == "PASS" else typer.colors.RED
@@ -574,8 +661,6 @@ def diagnose(
     typer.echo(f"Context: {result.get('context')}")
 
     # Show last 3 health runs
-    from nextlevelapex.core.state import get_task_health_trend
-
     history = get_task_health_trend(task_name, state)
     typer.echo("\nRecent health history:")
     for entry in history[-3:]:
@@ -637,7 +722,7 @@ def generate_report_cli(
     """
     Generate Markdown/HTML summary report for NextLevelApex.
     """
-    from nextlevelapex.core.report import generate_report  # You’ll need to finish report.py!
+    from nextlevelapex.core.report import generate_report
 
     state = load_state(STATE_PATH)
     REPORTS_DIR.mkdir(parents=True, exist_ok=True)
@@ -656,12 +741,11 @@ def reset_state(
     """
     Reset orchestrator state (all or just failed sections), with optional backup.
     """
-    import shutil
-
     if STATE_PATH.exists() and backup:
         bkup = STATE_PATH.parent / f"state.backup.{datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
         shutil.copy(STATE_PATH, bkup)
         typer.echo(f"State backup at {bkup}")
+    invalidate_state_cache()
     state = load_state(STATE_PATH)
     if only_failed:
         for s in state.get("failed_sections", []):
@@ -678,6 +762,7 @@ def reset_state(
                 "failed_sections": [],
                 "task_status": {},
                 "file_hashes": {},
+                "file_stats": {},
                 "health_history": {},
                 "service_versions": {},
                 "last_report_path": None,
@@ -732,6 +817,8 @@ def auto_fix(dry_run: bool = typer.Option(False, help="Show fixes but do not exe
         typer.secho("All tasks healthy. No remediation needed.", fg=typer.colors.GREEN)
         return
 
+    # One timestamp per healing cycle, shared by the diagnose and post-flight contexts
+    now_iso = datetime.now().isoformat()
     for t in failed_tasks:
         task_callable = discovered.get(t)
         if not task_callable:
@@ -742,7 +829,7 @@ def auto_fix(dry_run: bool = typer.Option(False, help="Show fixes but do not exe
             "mode": "diagnose",
             "state": state,
             "config": config,
-            "now": datetime.now().isoformat(),
+            "now": now_iso,
             "autofix": True,
             "dry_run": dry_run,
         }
@@ -769,6 +856,7 @@ def auto_fix(dry_run: bool = typer.Option(False, help="Show fixes but do not exe
             )
 
             actions_successful = True
+            executed_actions = 0
             for i, action in enumerate(plan.get("actions", [])):
                 typer.secho(
                     f"  [Action {i+1}] Executing {action['action_type']}...", fg=typer.colors.BLUE
@@ -776,17 +864,22 @@ def auto_fix(dry_run: bool = typer.Option(False, help="Show fixes but do not exe
                 if not execute_remediation(action, dry_run):
                     actions_successful = False
                     break  # Stop executing further actions in this plan if one fails
+                executed_actions += 1
 
             if actions_successful and not dry_run:
-                # Post-flight check: Rerun the task context lightly to verify fix
-                typer.secho("  Post-flight validation...", fg=typer.colors.BLUE)
-                post_context = {
-                    "mode": "run",
-                    "dry_run": False,
-                    "state": state,
-                    "now": datetime.now().isoformat(),
-                }
-                post_result = run_task(t, task_callable, post_context)
+                if executed_actions:
+                    # Post-flight check: Rerun the task context lightly to verify fix
+                    typer.secho("  Post-flight validation...", fg=typer.colors.BLUE)
+                    post_context = {
+                        "mode": "run",
+                        "dry_run": False,
+                        "state": state,
+                        "now": now_iso,
+                    }
+                    post_result = run_task(t, task_callable, post_context)
+                else:
+                    # Nothing changed on the host, so the diagnose result still stands
+                    post_result = result
 
                 if post_result.get("status") == "PASS":
                     typer.secho(f"  {t} SUCCESSFULLY HEALED.", fg=typer.colors.GREEN, bold=True)
@@ -825,6 +918,7 @@ def auto_fix(dry_run: bool = typer.Option(False, help="Show fixes but do not exe
 @app.command("export-state")
 def export_state(
     fmt: str = typer.Option("json", help="Export format: json or csv."),
+    compact: bool = typer.Option(False, help="Write JSON without indentation."),
 ):
     """
     Export orchestrator state as JSON or CSV only.
@@ -840,19 +934,15 @@ def export_state(
     state = load_state(STATE_PATH)
     path = REPORTS_DIR / f"state-export-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{normalized_fmt}"
     if normalized_fmt == "json":
-        import json
-
-        with path.open("w") as f:
-            json.dump(state, f, indent=2)
+        path.write_bytes(dump_state_json(state, indent=None if compact else 2))
     else:
         import csv
 
         # Flatten state to rows if possible (else error)
-        keys = sorted(state.keys())
+        keys = sorted(state)
         with path.open("w", newline="") as f:
-            writer = csv.writer(f)
-            writer.writerow(keys)
-            writer.writerow([str(state[k]) for k in keys])
+            writer = csv.writer(f, quoting=csv.QUOTE_MINIMAL, lineterminator="\n")
+            writer.writerows((keys, [str(state[k]) for k in keys]))
     typer.echo(f"Exported state to {path}")
 
 
@@ -899,41 +989,25 @@ def archive_reports_cmd(
     archive_old_reports(r_dir, dry_run=dry_run)
 
 
-@app.command("install-archiver")
-def install_archiver_cmd():
-    """
-    Generate and install a macOS launchd agent to run `archive-reports` automatically
-    on the 1st of every month at midnight.
-    """
-    agent_name = "com.nextlevelapex.archiver.plist"
-    agents_dir = Path.home() / "Library" / "LaunchAgents"
-    plist_path = agents_dir / agent_name
-
-    # We resolve the absolute paths so launchd knows exactly what to run without needing $PATH setup
-    poetry_bin = shutil.which("poetry")
-    if not poetry_bin:
-        typer.secho("Error: Could not locate `poetry` executable.", fg=typer.colors.RED)
-        raise typer.Exit(code=1)
-
-    main_py_str = str(APP_ROOT / "main2.py")
-    cwd_str = str(APP_ROOT.parent)
-
-    plist_content = f"""<?xml version="1.0" encoding="UTF-8"?>
+ARCHIVER_LABEL = "com.nextlevelapex.archiver"
+# Built once at import; only the resolved paths are substituted per install.
+ARCHIVER_PLIST_TEMPLATE = string.Template(
+    """<?xml version="1.0" encoding="UTF-8"?>
 <!DOCTYPE plist PUBLIC "-//Apple//DTD PLIST 1.0//EN" "http://www.apple.com/DTDs/PropertyList-1.0.dtd">
 <plist version="1.0">
 <dict>
     <key>Label</key>
-    <string>com.nextlevelapex.archiver</string>
+    <string>$label</string>
     <key>ProgramArguments</key>
     <array>
-        <string>{poetry_bin}</string>
+        <string>$poetry</string>
         <string>run</string>
         <string>python</string>
-        <string>{main_py_str}</string>
+        <string>$main</string>
         <string>archive-reports</string>
     </array>
     <key>WorkingDirectory</key>
-    <string>{cwd_str}</string>
+    <string>$cwd</string>
     <key>StartCalendarInterval</key>
     <dict>
         <key>Day</key>
@@ -944,12 +1018,59 @@ def install_archiver_cmd():
         <integer>0</integer>
     </dict>
     <key>StandardOutPath</key>
-    <string>{cwd_str}/reports/archiver.log</string>
+    <string>$cwd/reports/archiver.log</string>
     <key>StandardErrorPath</key>
-    <string>{cwd_str}/reports/archiver.error.log</string>
+    <string>$cwd/reports/archiver.error.log</string>
 </dict>
 </plist>
 """
+)
+
+
+def _archiver_agent_loaded() -> bool:
+    try:
+        result = subprocess.run(
+            ["launchctl", "list", ARCHIVER_LABEL],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+            timeout=10,
+        )
+    except (OSError, subprocess.TimeoutExpired):
+        return False
+    return result.returncode == 0
+
+
+@app.command("install-archiver")
+def install_archiver_cmd():
+    """
+    Generate and install a macOS launchd agent to run `archive-reports` automatically
+    on the 1st of every month at midnight.
+    """
+    agent_name = f"{ARCHIVER_LABEL}.plist"
+    agents_dir = Path.home() / "Library" / "LaunchAgents"
+    plist_path = agents_dir / agent_name
+
+    # We resolve the absolute paths so launchd knows exactly what to run without needing $PATH setup
+    poetry_bin = shutil.which("poetry")
+    if not poetry_bin:
+        typer.secho("Error: Could not locate `poetry` executable.", fg=typer.colors.RED)
+        raise typer.Exit(code=1)
+
+    main_py_str = str(APP_ROOT / "main2.py")
+    cwd_str = str(APP_ROOT.parent)
+
+    plist_content = ARCHIVER_PLIST_TEMPLATE.substitute(
+        label=ARCHIVER_LABEL, poetry=poetry_bin, main=main_py_str, cwd=cwd_str
+    )
+
+    try:
+        current_content: Optional[str] = plist_path.read_text()
+    except FileNotFoundError:
+        current_content = None
+    if current_content == plist_content and _archiver_agent_loaded():
+        typer.secho(f"Auto-archiver already up to date at {plist_path}", fg=typer.colors.GREEN)
+        return
 
     agents_dir.mkdir(parents=True, exist_ok=True)
     plist_path.write_text(plist_content)
@@ -978,7 +1099,6 @@ def install_sudoers(
     """
     import getpass
     import tempfile
-    from pathlib import Path
 
     if sys.platform != "darwin":
         typer.secho(
@@ -987,7 +1107,7 @@ def install_sudoers(
         raise typer.Exit(code=1)
 
     user = getpass.getuser()
-    sudoers_path = "/etc/sudoers.d/nextlevelapex"
+    sudoers_path = str(SUDOERS_DROPIN_PATH)
     if SUDOERS_USER_PATTERN.fullmatch(user) is None:
         typer.secho(
             "ERROR: Unsupported username for sudoers rule; please install manually via visudo.",
@@ -997,10 +1117,7 @@ def install_sudoers(
 
     # 1) Gather active network services (no shell=True).
     try:
-        check = subprocess.run(
-            ["networksetup", "-listallnetworkservices"], capture_output=True, text=True, check=True
-        )
-        valid_interfaces = _parse_network_services(check.stdout)
+        valid_interfaces = list(_active_network_services())
     except Exception as exc:
         typer.secho(f"Failed to list network services safely: {exc}", fg=typer.colors.RED)
         raise typer.Exit(code=1)
@@ -1075,6 +1192,12 @@ def install_sudoers(
         typer.secho("Once complete, re-run this command.", fg=typer.colors.WHITE)
         raise typer.Exit(code=1)
 
+    # Skip visudo and the sudo prompt only when the drop-in is already exactly what step 4
+    # would install; anything else (wrong owner/mode, which sudo ignores) is reinstalled.
+    if _sudoers_dropin_matches(rule):
+        typer.secho(f"{sudoers_path} is already up to date.", fg=typer.colors.GREEN)
+        return
+
     with tempfile.NamedTemporaryFile(mode="w", delete=False) as tf:
         tf.write(rule)
         temp_path = tf.name
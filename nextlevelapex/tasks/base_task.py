@@ -52,19 +52,26 @@ class BaseTask:
 
 
 # --- (Optional) Decorator for Function-based Tasks ---
-_registered_tasks = []
+_registered_tasks: list[Callable] = []
+# Read-only snapshot of _registered_tasks, rebuilt lazily after each registration
+_registered_tasks_snapshot: tuple[Callable, ...] | None = None
 
 
 def register_task(func: Callable) -> Callable:
     """
     Decorator to register function-based tasks for dynamic discovery.
     """
+    global _registered_tasks_snapshot
     _registered_tasks.append(func)
+    _registered_tasks_snapshot = None
     return func
 
 
-def get_registered_tasks() -> list:
+def get_registered_tasks() -> tuple[Callable, ...]:
     """
-    Return all registered function-based tasks.
+    Return all registered function-based tasks as an immutable snapshot.
     """
-    return list(_registered_tasks)
+    global _registered_tasks_snapshot
+    if _registered_tasks_snapshot is None:
+        _registered_tasks_snapshot = tuple(_registered_tasks)
+    return _registered_tasks_snapshot
@@ -1,6 +1,8 @@
 # ~/Projects/NextLevelApex/nextlevelapex/tasks/brew.py
 
+import functools
 import os
+import re
 from pathlib import Path
 
 # Import the command runner from the core module
@@ -14,15 +16,51 @@ log = LoggerProxy(__name__)
 # --- Constants ---
 HOMEBREW_INSTALL_URL = "https://raw.githubusercontent.com/Homebrew/install/HEAD/install.sh"
 HOMEBREW_PREFIX = "/opt/homebrew"  # Standard for Apple Silicon
+BREW_CANDIDATE_PATHS = (
+    Path(HOMEBREW_PREFIX) / "bin" / "brew",
+    Path("/usr/local/bin/brew"),  # Intel Macs
+)
+
+BREW_SHELLENV_VARS = ("HOMEBREW_PREFIX", "HOMEBREW_CELLAR", "HOMEBREW_REPOSITORY")
+# Matches `export VAR="value";` (or single-quoted / bare) lines emitted by `brew shellenv`
+SHELLENV_EXPORT_PATTERN = re.compile(
+    r"""^[ \t]*export[ \t]+(\w+)=(?:"([^"\n]*)"|'([^'\n]*)'|([^\s;"']+))[ \t]*;?[ \t]*$""",
+    re.MULTILINE,
+)
+# `${VAR+word}` / `${VAR:-word}` style expansions and plain `$VAR` / `${VAR}` references,
+# e.g. `PATH="/opt/homebrew/bin:/opt/homebrew/sbin${PATH+:$PATH}"`
+SHELL_PARAMETER_PATTERN = re.compile(r"\$\{(\w+)(:?)([+-])([^}]*)\}|\$\{(\w+)\}|\$(\w+)")
+
+
+@functools.lru_cache(maxsize=1)
+def _brew_path() -> Path | None:
+    """First Homebrew executable found; cached for the process (cleared after install)."""
+    for candidate in BREW_CANDIDATE_PATHS:
+        log.debug(f"Checking for brew at: {candidate}")
+        if candidate.is_file():
+            return candidate
+    return None
+
+
+def _expand_shell_parameters(value: str, env: dict[str, str]) -> str:
+    """Expand the simple parameter forms `brew shellenv` emits against `env`."""
+
+    def substitute(match: re.Match[str]) -> str:
+        name, colon, operator, word, braced, bare = match.groups()
+        if name is None:
+            return env.get(braced or bare, "")
+        current = env.get(name)
+        is_set = current is not None and (current != "" or not colon)
+        if operator == "+":
+            return _expand_shell_parameters(word, env) if is_set else ""
+        return current if is_set else _expand_shell_parameters(word, env)
+
+    return SHELL_PARAMETER_PATTERN.sub(substitute, value)
 
 
 def is_brew_installed() -> bool:
-    """Checks if the Homebrew executable exists in the expected path."""
-    brew_path = Path(HOMEBREW_PREFIX) / "bin" / "brew"
-    # Use shutil.which for basic check, or run command for more robust check
-    # return shutil.which("brew") is not None
-    log.debug(f"Checking for brew at: {brew_path}")
-    return brew_path.is_file()
+    """Checks if the Homebrew executable exists in one of the expected paths."""
+    return _brew_path() is not None
 
 
 def install_brew(dry_run: bool = False) -> bool:
@@ -43,6 +81,7 @@ def install_brew(dry_run: bool = False) -> bool:
     result = run_command(cmd, dry_run=dry_run, check=True)  # Check ensures failure stops us
 
     if result.success and not dry_run:
+        _brew_path.cache_clear()  # The cached lookup predates the install
         # Verify install after running (necessary if check=False above)
         if is_brew_installed():
             log.info("Homebrew installation successful.")
@@ -58,51 +97,67 @@ def install_brew(dry_run: bool = False) -> bool:
         return False
 
 
+def _append_profile_lines(profile_path: Path, lines: list[str]) -> None:
+    """Append lines to a shell profile with one O_APPEND write, so concurrent appends don't interleave."""
+    data = "".join(lines).encode()
+    fd = os.open(profile_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        view = memoryview(data)
+        while view:
+            view = view[os.write(fd, view) :]
+    finally:
+        os.close(fd)
+
+
 def ensure_brew_shellenv(dry_run: bool = False) -> bool:
     """Ensures brew shellenv is evaluated and added to ~/.zprofile."""
     log.info("Configuring Homebrew shell environment...")
-    brew_path = Path(HOMEBREW_PREFIX) / "bin" / "brew"
-    if not brew_path.is_file():
+    brew_path = _brew_path()
+    if brew_path is None:
         log.error("Cannot configure shellenv: brew executable not found.")
         return False
 
-    # 1. Evaluate for current process environment
-    log.debug("Evaluating brew shellenv for current Python process...")
-    result = run_command([str(brew_path), "shellenv"], dry_run=dry_run, check=True)
-    if not result.success:
-        log.error("Failed to execute 'brew shellenv'. Cannot update environment.")
-        return False
+    # 1. Evaluate for current process environment, unless a login shell already did
+    brew_prefix = str(brew_path.parent.parent)
+    if os.environ.get("HOMEBREW_PREFIX") == brew_prefix and all(
+        os.environ.get(var, "").startswith(brew_prefix) for var in BREW_SHELLENV_VARS
+    ):
+        log.debug("Homebrew environment already present; skipping 'brew shellenv'.")
+    else:
+        log.debug("Evaluating brew shellenv for current Python process...")
+        result = run_command([str(brew_path), "shellenv"], dry_run=dry_run, check=True)
+        if not result.success:
+            log.error("Failed to execute 'brew shellenv'. Cannot update environment.")
+            return False
 
-    if result.stdout and not dry_run:
-        # Parse output like: export VAR="value"; export VAR2="value2";
-        for line in result.stdout.splitlines():
-            line = line.strip()
-            if line.startswith("export "):
-                parts = line.replace("export ", "").split("=", 1)
-                if len(parts) == 2:
-                    key = parts[0]
-                    # Remove potential quotes around value
-                    value = parts[1].strip("'\"")
-                    log.debug(f"Setting env var: {key}={value}")
-                    os.environ[key] = value
-                else:
-                    log.warning(f"Could not parse brew shellenv line: {line}")
-        log.info("Current process environment updated with Homebrew paths.")
+        if result.stdout and not dry_run:
+            # Parse output like: export VAR="value"; export VAR2="value2";
+            for match in SHELLENV_EXPORT_PATTERN.finditer(result.stdout):
+                key, double_quoted, single_quoted, bare = match.groups()
+                value = next(v for v in (double_quoted, single_quoted, bare) if v is not None)
+                if "$" in value:
+                    # e.g. PATH="<prefix>/bin:<prefix>/sbin${PATH+:$PATH}" puts brew first
+                    value = _expand_shell_parameters(value, dict(os.environ))
+                if "$" in value:
+                    # Anything beyond simple parameter expansion can't be evaluated here
+                    log.debug(f"Skipping shell-expanded env var: {key}")
+                    continue
+                log.debug(f"Setting env var: {key}={value}")
+                os.environ[key] = value
+            log.info("Current process environment updated with Homebrew paths.")
 
     # 2. Add to ~/.zprofile if not present
     profile_path = Path.home() / ".zprofile"
     shellenv_command = f'eval "$({brew_path} shellenv)"'
-    line_found = False
-    if profile_path.is_file():
-        try:
-            with open(profile_path) as f:
-                for line in f:
-                    if shellenv_command in line:
-                        line_found = True
-                        break
-        except Exception as e:
-            log.error(f"Error reading {profile_path}: {e}")
-            # Continue to attempt writing, maybe file had issues
+    try:
+        profile_text = profile_path.read_text()
+    except FileNotFoundError:
+        profile_text = ""
+    except Exception as e:
+        log.error(f"Error reading {profile_path}: {e}")
+        profile_text = ""  # Continue to attempt writing, maybe file had issues
+    # The command contains no newline, so a whole-file search matches exactly the per-line one
+    line_found = shellenv_command in profile_text
 
     if line_found:
         log.info(f"Homebrew shellenv command already found in {profile_path}.")
@@ -110,9 +165,9 @@ def ensure_brew_shellenv(dry_run: bool = False) -> bool:
         log.info(f"Adding Homebrew shellenv command to {profile_path}...")
         if not dry_run:
             try:
-                with open(profile_path, "a") as f:
-                    f.write("\n# Homebrew environment\n")
-                    f.write(f"{shellenv_command}\n")
+                _append_profile_lines(
+                    profile_path, ["\n# Homebrew environment\n", f"{shellenv_command}\n"]
+                )
                 log.info(f"Successfully added shellenv command to {profile_path}.")
             except Exception as e:
                 log.error(f"Failed to write to {profile_path}: {e}")
@@ -1,5 +1,7 @@
 # ~/Projects/NextLevelApex/nextlevelapex/tasks/dev_tools.py
 
+import re
+import time
 
 from nextlevelapex.core.command import run_command
 from nextlevelapex.core.logger import LoggerProxy
@@ -9,6 +11,14 @@ from nextlevelapex.core.types import ColimaStatusResult
 
 log = LoggerProxy(__name__)
 
+COLIMA_STATUS_ATTEMPTS = 5  # after a successful `colima start`, which can report running late
+COLIMA_STATUS_RETRY_INITIAL_SECONDS = 0.3
+COLIMA_RUNNING_INDICATORS = ("colima is running", "runtime:", "socket:")
+# One case-insensitive scan for all indicators, without lowercasing a copy of the output
+COLIMA_INDICATOR_PATTERN = re.compile(
+    "|".join(map(re.escape, COLIMA_RUNNING_INDICATORS)), re.IGNORECASE
+)
+
 
 @task("Colima Setup")
 def setup_colima_task(ctx: dict) -> TaskResult:
@@ -75,7 +85,7 @@ def setup_colima(config: dict, dry_run: bool = False) -> ColimaStatusResult:
     initial_check = _check_colima_running(initial_status)
 
     if initial_check.success:
-        log.info(f"Colima already running. Reason: {initial_check.reason}")
+        log.info("Colima already running. Reason: %s", initial_check.reason)
         return initial_check
 
     # Step 2: Construct start command
@@ -93,7 +103,7 @@ def setup_colima(config: dict, dry_run: bool = False) -> ColimaStatusResult:
     if disk := colima_config.get("disk"):
         start_cmd.extend(["--disk", str(disk)])
 
-    log.info(f"Colima start command: {' '.join(start_cmd)}")
+    log.info("Colima start command: %s", " ".join(start_cmd))
 
     if dry_run:
         return ColimaStatusResult(
@@ -108,25 +118,34 @@ def setup_colima(config: dict, dry_run: bool = False) -> ColimaStatusResult:
     start_result = run_command(start_cmd, dry_run=False, check=False)
     if start_result.returncode != 0:
         log.warning(
-            f"Colima start returned RC={start_result.returncode}. Proceeding to verify status..."
+            "Colima start returned RC=%s. Proceeding to verify status...", start_result.returncode
         )
 
-    # Step 4: Verify final status
-    final_status = run_command(["colima", "status"], dry_run=False, check=True, capture=True)
-    final_check = _check_colima_running(final_status)
+    # Step 4: Verify final status (the only other `colima status` call; Step 1 returns early
+    # when the VM is already up). A non-zero RC is not fatal here: the indicators decide.
+    attempts = COLIMA_STATUS_ATTEMPTS if start_result.returncode == 0 else 1
+    delay = COLIMA_STATUS_RETRY_INITIAL_SECONDS
+    for attempt in range(attempts):
+        if attempt:
+            time.sleep(delay)
+            delay *= 2
+        final_status = run_command(["colima", "status"], dry_run=False, check=False, capture=True)
+        final_check = _check_colima_running(final_status)
+        if final_check.success:
+            break
 
     if final_check.success:
-        log.info(f"Colima appears to be running. Matched: {final_check.matched_indicators}")
+        log.info("Colima appears to be running. Matched: %s", final_check.matched_indicators)
     else:
-        log.error(f"Colima verification failed. Reason: {final_check.reason}")
+        log.error("Colima verification failed. Reason: %s", final_check.reason)
 
     return final_check
 
 
 def _check_colima_running(status_result) -> ColimaStatusResult:
-    indicators = ["colima is running", "runtime:", "socket:"]
-    combined = f"{status_result.stdout or ''}\n{status_result.stderr or ''}".lower()
-    matches = [key for key in indicators if key in combined]
+    combined = f"{status_result.stdout or ''}\n{status_result.stderr or ''}"
+    found = {m.group(0).lower() for m in COLIMA_INDICATOR_PATTERN.finditer(combined)}
+    matches = [key for key in COLIMA_RUNNING_INDICATORS if key in found]
 
     if matches:
         return ColimaStatusResult(
@@ -13,18 +13,23 @@ Read-only diagnostics here include:
 - Engine selection: docker → podman fallback
 - Context awareness (docker context show; podman has none)
 - Health reporting (State.Health.Status + last probe)
-- Host conflict checks (ps/port 53 + resolv.conf peek)
+- Host conflict checks (ps/port 53 + resolver config peek: resolv.conf, or scutil on macOS)
 - Actionable HINTs and DEBUG breadcrumbs
 """
 
 from __future__ import annotations
 
-import json
+import functools
 import platform
+import re
 import shutil
 import subprocess
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
 from typing import Any
 
+from pydantic_core import from_json
+
 from nextlevelapex.core.task import Severity, TaskResult
 
 # -------- constants --------
@@ -32,6 +37,10 @@ ENGINE_TIMEOUT = 5
 PS_TIMEOUT = 4
 NETSTAT_TIMEOUT = 4
 EXPECTED_CONTEXT = "colima"  # only applies to docker
+HELPER_CONTAINERS = ("cloudflared", "pihole")
+# Whole output lines mentioning a host DNS daemon / a port-53 socket, found in one regex scan
+HOST_DNS_PROCESS_LINE = re.compile(r"^.*(?:cloudflared|unbound|pihole).*$", re.MULTILINE)
+PORT_53_LINE = re.compile(r"^.*:53.*$", re.MULTILINE)
 
 Cmd = list[str]
 Msgs = list[tuple[Severity, str]]
@@ -46,13 +55,23 @@ def _run(cmd: Cmd, timeout: int = ENGINE_TIMEOUT) -> tuple[int, str, str]:
         return -1, "", f"{type(e).__name__}: {e}"
 
 
+def _run_parallel(*calls: Callable[[], Any]) -> list[Any]:
+    """Run independent, subprocess-bound calls on threads; results keep argument order."""
+    with ThreadPoolExecutor(max_workers=len(calls)) as pool:
+        futures = [pool.submit(call) for call in calls]
+        return [future.result() for future in futures]
+
+
+@functools.lru_cache(maxsize=8)
 def _cmd_exists(bin_name: str) -> bool:
+    # PATH lookups stat every PATH entry; cached alongside _engine_name for the run
     return shutil.which(bin_name) is not None
 
 
 # -------- engine selection --------
+@functools.lru_cache(maxsize=1)
 def _engine_name() -> str | None:
-    """Prefer docker; fallback to podman if available & responsive."""
+    """Prefer docker; fallback to podman if available & responsive (cached per check run)."""
     if _cmd_exists("docker"):
         rc, _, _ = _run(["docker", "info"])
         if rc == 0:
@@ -64,6 +83,16 @@ def _engine_name() -> str | None:
     return None
 
 
+# The original cached functions, kept so clearing still works while tests patch the names
+_PROBE_CACHES = (_cmd_exists, _engine_name)
+
+
+def _reset_probe_caches() -> None:
+    """Re-probe PATH and the engine: called once at the start of each public check."""
+    for cached in _PROBE_CACHES:
+        cached.cache_clear()
+
+
 def _engine_info() -> tuple[str | None, Msgs]:
     msgs: Msgs = []
     eng = _engine_name()
@@ -98,31 +127,34 @@ def _engine_inspect(eng: str, names: list[str]) -> list[dict[str, Any]]:
     if rc != 0 or not out:
         return []
     try:
-        data = json.loads(out)
+        # pydantic-core's native parser; `docker inspect` payloads run to tens of KB
+        data = from_json(out)
         return data if isinstance(data, list) else []
-    except json.JSONDecodeError:
+    except ValueError:
         return []
 
 
+def _inspect_by_name(eng: str, names: list[str]) -> dict[str, dict[str, Any]]:
+    # Docker reports "/name", Podman "name". A missing container fails the whole batch -> {}.
+    return {str(d.get("Name", "")).lstrip("/"): d for d in _engine_inspect(eng, names)}
+
+
 def _inspect_one(eng: str, name: str) -> dict[str, Any]:
     data = _engine_inspect(eng, [name])
     return data[0] if data else {}
 
 
-def _is_running(eng: str, name: str) -> bool:
-    info = _inspect_one(eng, name)
+def _info_running(info: dict[str, Any]) -> bool:
     return bool(info and (info.get("State") or {}).get("Running") is True)
 
 
-def _health(eng: str, name: str) -> str | None:
-    info = _inspect_one(eng, name)
+def _info_health(info: dict[str, Any]) -> str | None:
     st = info.get("State") or {}
     h = (st.get("Health") or {}).get("Status")
     return str(h) if h else None
 
 
-def _last_health_log(eng: str, name: str) -> str | None:
-    info = _inspect_one(eng, name)
+def _info_last_health_log(info: dict[str, Any]) -> str | None:
     logs = ((info.get("State") or {}).get("Health") or {}).get("Log") or []
     if not logs:
         return None
@@ -134,6 +166,18 @@ def _last_health_log(eng: str, name: str) -> str | None:
     return " | ".join(parts) if parts else None
 
 
+def _is_running(eng: str, name: str) -> bool:
+    return _info_running(_inspect_one(eng, name))
+
+
+def _health(eng: str, name: str) -> str | None:
+    return _info_health(_inspect_one(eng, name))
+
+
+def _last_health_log(eng: str, name: str) -> str | None:
+    return _info_last_health_log(_inspect_one(eng, name))
+
+
 # -------- host safety checks --------
 def _host_dns_process_lines() -> list[str]:
     if platform.system() == "Windows":
@@ -142,9 +186,7 @@ def _host_dns_process_lines() -> list[str]:
         rc, out, _ = _run(["ps", "aux"], timeout=PS_TIMEOUT)
     if rc != 0 or not out:
         return []
-    kws = ["cloudflared", "unbound", "pihole"]
-    lines = [ln for ln in out.splitlines() if any(k in ln for k in kws)]
-    return [ln for ln in lines if "mDNSResponder" not in ln]
+    return [ln for ln in HOST_DNS_PROCESS_LINE.findall(out) if "mDNSResponder" not in ln]
 
 
 def _host_port_53_binders() -> list[str]:
@@ -159,13 +201,42 @@ def _host_port_53_binders() -> list[str]:
     for c in cmds:
         rc, out, _ = _run(c, timeout=NETSTAT_TIMEOUT)
         if rc == 0 and out:
-            lines = [ln for ln in out.splitlines() if ":53" in ln]
+            lines = PORT_53_LINE.findall(out)
             if lines:
                 return lines
     return []
 
 
+def _scutil_first_resolver_summary(out: str) -> str | None:
+    start = out.find("resolver #")
+    if start < 0:
+        return None
+    end = out.find("resolver #", start + 1)
+    nameservers: list[str] = []
+    search = None
+    for ln in out[start : end if end >= 0 else len(out)].splitlines():
+        key, sep, value = ln.partition(" : ")
+        key = key.strip()
+        if not sep:
+            continue
+        if key.startswith("nameserver["):
+            nameservers.append(value.strip())
+        elif key == "search domain[0]":
+            search = value.strip()
+    if not nameservers:
+        return None
+    return f"nameservers={nameservers}" + (f" search={search}" if search else "")
+
+
+def _resolver_config_source() -> str:
+    return "scutil --dns" if platform.system() == "Darwin" else "/etc/resolv.conf"
+
+
 def _resolv_conf_summary() -> str | None:
+    if platform.system() == "Darwin":
+        # /etc/resolv.conf is a generated stub on macOS; SystemConfiguration is authoritative
+        rc, out, _ = _run(["scutil", "--dns"], timeout=PS_TIMEOUT)
+        return _scutil_first_resolver_summary(out) if rc == 0 else None
     try:
         with open("/etc/resolv.conf", encoding="utf-8") as f:
             lines = [ln.strip() for ln in f if ln.strip()]
@@ -177,14 +248,25 @@ def _resolv_conf_summary() -> str | None:
 
 
 # -------- shared container check --------
-def _container_status_check(display: str, container: str) -> TaskResult:
+def _container_status_check(
+    display: str, container: str, preloaded: dict[str, dict[str, Any]] | None = None
+) -> TaskResult:
     msgs: Msgs = []
     eng, pre_msgs = _engine_info()
     msgs.extend(pre_msgs)
     if not eng:
         return TaskResult(name=f"{display} (Helper)", success=False, changed=False, messages=msgs)
 
-    ctx = _engine_context(eng)
+    if preloaded and container in preloaded:
+        ctx, info = _engine_context(eng), preloaded[container]
+    else:
+        # One `docker inspect` feeds every field below; `context show` runs alongside it
+        ctx, info = _run_parallel(
+            lambda: _engine_context(eng), lambda: _inspect_one(eng, container)
+        )
+    running = _info_running(info)
+    health = _info_health(info)
+
     if eng == "docker":
         if ctx != EXPECTED_CONTEXT:
             msgs.append(
@@ -202,9 +284,6 @@ def _container_status_check(display: str, container: str) -> TaskResult:
         else:
             msgs.append((Severity.DEBUG, f"Docker context OK: {ctx}"))
 
-    running = _is_running(eng, container)
-    health = _health(eng, container)
-    info = _inspect_one(eng, container)
     image = (info.get("Config") or {}).get("Image") or ""
     networks = list((info.get("NetworkSettings") or {}).get("Networks") or {}.keys())
     restart = ((info.get("HostConfig") or {}).get("RestartPolicy") or {}).get("Name") or "none"
@@ -232,7 +311,7 @@ def _container_status_check(display: str, container: str) -> TaskResult:
         if health:
             msgs.append((Severity.INFO, f"Health: {health}"))
             if health != "healthy":
-                tail = _last_health_log(eng, container)
+                tail = _info_last_health_log(info)
                 if tail:
                     msgs.append((Severity.ERROR, f"Unhealthy last probe: {tail}"))
         else:
@@ -245,23 +324,34 @@ def _container_status_check(display: str, container: str) -> TaskResult:
 
 
 # -------- public helpers --------
-def cloudflared_status_check() -> TaskResult:
-    return _container_status_check("Cloudflared", "cloudflared")
+def _cloudflared_status(preloaded: dict[str, dict[str, Any]] | None = None) -> TaskResult:
+    return _container_status_check("Cloudflared", "cloudflared", preloaded)
+
+
+def _pihole_status(preloaded: dict[str, dict[str, Any]] | None = None) -> TaskResult:
+    return _container_status_check("Pi-hole", "pihole", preloaded)
+
+
+def cloudflared_status_check(preloaded: dict[str, dict[str, Any]] | None = None) -> TaskResult:
+    _reset_probe_caches()
+    return _cloudflared_status(preloaded)
 
 
-def pihole_status_check() -> TaskResult:
-    return _container_status_check("Pi-hole", "pihole")
+def pihole_status_check(preloaded: dict[str, dict[str, Any]] | None = None) -> TaskResult:
+    _reset_probe_caches()
+    return _pihole_status(preloaded)
 
 
 def dns_sanity_check() -> TaskResult:
     msgs: Msgs = []
-    lines = _host_dns_process_lines()
+    lines, binders, rc_summary = _run_parallel(
+        _host_dns_process_lines, _host_port_53_binders, _resolv_conf_summary
+    )
     if lines:
         msgs.append((Severity.ERROR, "DNS services appear to be running on the host:"))
         for ln in lines:
             msgs.append((Severity.ERROR, f"    {ln}"))
 
-    binders = _host_port_53_binders()
     if binders:
         msgs.append((Severity.ERROR, "Processes listening on port 53 detected on host:"))
         for ln in binders[:8]:
@@ -269,9 +359,8 @@ def dns_sanity_check() -> TaskResult:
         if len(binders) > 8:
             msgs.append((Severity.DEBUG, f"    …and {len(binders) - 8} more lines"))
 
-    rc_summary = _resolv_conf_summary()
     if rc_summary:
-        msgs.append((Severity.INFO, f"/etc/resolv.conf → {rc_summary}"))
+        msgs.append((Severity.INFO, f"{_resolver_config_source()} → {rc_summary}"))
 
     if lines or binders:
         msgs.append(
@@ -288,12 +377,26 @@ def dns_sanity_check() -> TaskResult:
 
 def is_container_running(container_name: str) -> bool:
     """Compatibility-only helper; not authoritative for DNS orchestration decisions."""
+    _reset_probe_caches()
     eng, _ = _engine_info()
     return bool(eng and _is_running(eng, container_name))
 
 
+def _preload_helper_containers() -> dict[str, dict[str, Any]] | None:
+    eng = _engine_name()
+    return _inspect_by_name(eng, list(HELPER_CONTAINERS)) if eng else None
+
+
 def run_all_dns_checks() -> list[TaskResult]:
-    return [dns_sanity_check(), cloudflared_status_check(), pihole_status_check()]
+    # Re-probe PATH and the engine once per run; the checks below then share the result
+    _reset_probe_caches()
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        sanity = pool.submit(dns_sanity_check)
+        # One batched `inspect` for both containers while the host probes run
+        preloaded = _preload_helper_containers()
+        cloudflared = pool.submit(_cloudflared_status, preloaded)
+        pihole = pool.submit(_pihole_status, preloaded)
+        return [sanity.result(), cloudflared.result(), pihole.result()]
 
 
 # Re-export list (and test hooks!)
@@ -1,9 +1,14 @@
 from __future__ import annotations
 
+import json
+import os
 import re
-import socket
 import subprocess
+import sys
+from concurrent.futures import Executor, ThreadPoolExecutor
+from pathlib import Path
 
+from nextlevelapex.core.dns_diagnose import parse_network_services
 from nextlevelapex.core.logger import LoggerProxy
 from nextlevelapex.core.registry import task
 from nextlevelapex.core.task import Severity, TaskContext, TaskResult
@@ -17,6 +22,7 @@ from nextlevelapex.tasks.dns_stack_runtime import (
     append_noncanonical_dns_artifact_messages,
     audit_browser_dns_posture,
     audit_noncanonical_dns_artifacts,
+    udp_dns_query,
 )
 
 log = LoggerProxy(__name__)
@@ -31,6 +37,29 @@ PLAINTEXT_UPSTREAMS = (
     "208.67.222.222",
     "208.67.220.220",
 )
+# Every spelling Pi-hole uses for a plaintext resolver on port 53: bare, `ip#53`, `ip:53`
+PLAINTEXT_UPSTREAM_FORMS = frozenset(
+    form
+    for resolver in PLAINTEXT_UPSTREAMS
+    for form in (resolver, f"{resolver}#53", f"{resolver}:53")
+)
+# The only containers the sanity check asks about; `docker ps` filters to these server-side
+SANITY_CONTAINERS = (PIHOLE_CONTAINER, *LEGACY_CONTAINERS)
+# Per-command subprocess budgets (seconds): a wedged daemon or CLI costs a bounded wait, not 5s
+# per call. `dig` gets headroom over its own `+time=2` so it can report SERVFAIL itself.
+SUBPROCESS_TIMEOUTS = {
+    "context": 1.5,
+    "ps": 3.0,
+    "inspect": 3.0,
+    "pihole_ftl": 3.0,
+    "dig": 3.0,
+    "networksetup": 1.5,
+    "networksetup_dns": 3.0,
+    "scutil": 2.0,
+}
+PIHOLE_UPSTREAM_TOKEN = re.compile(r"[A-Za-z0-9_.:-]+(?:#[0-9]+)?")
+IPV4_ADDRESS = re.compile(r"\b\d{1,3}(?:\.\d{1,3}){3}\b")
+SCUTIL_NAMESERVER = re.compile(r"nameserver\[\d+\]\s*:\s*([0-9.]+)")
 
 
 @task("DNS Stack Sanity Check")
@@ -40,10 +69,20 @@ def dns_sanity_check(context: TaskContext) -> TaskResult:
     _ = context
 
     active_context = _get_docker_context()
-    active_containers, active_ok = _docker_ps_names()
-    host_containers, host_ok = (
-        _docker_ps_names("default") if active_context == "colima" else (set(), False)
-    )
+    # The probes below are independent subprocess/socket/file waits; overlap them.
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        active_ps = pool.submit(_docker_ps_names)
+        host_ps = pool.submit(_docker_ps_names, "default") if active_context == "colima" else None
+        listener_probe = pool.submit(_host_cloudflared_listener_healthy)
+        resolvers_probe = pool.submit(_get_configured_dns_resolvers, pool)
+        artifacts_audit = pool.submit(audit_noncanonical_dns_artifacts)
+        browser_audit = pool.submit(audit_browser_dns_posture)
+        active_containers, active_ok = active_ps.result()
+        host_containers, host_ok = host_ps.result() if host_ps else (set(), False)
+        host_cloudflared_listener = listener_probe.result()
+        dns_resolvers = resolvers_probe.result()
+        noncanonical_artifacts = artifacts_audit.result()
+        browser_dns_posture = browser_audit.result()
 
     if not active_ok:
         messages.append(
@@ -58,7 +97,6 @@ def dns_sanity_check(context: TaskContext) -> TaskResult:
             )
         )
 
-    host_cloudflared_listener = _host_cloudflared_listener_healthy()
     if host_cloudflared_listener:
         messages.append(
             (
@@ -75,7 +113,12 @@ def dns_sanity_check(context: TaskContext) -> TaskResult:
             )
         )
 
-    pihole_running = (PIHOLE_CONTAINER in active_containers) or _container_running(PIHOLE_CONTAINER)
+    active_running = _running_names(active_containers, active_ok)
+    host_running = (
+        _running_names(host_containers, host_ok, "default") if active_context == "colima" else set()
+    )
+
+    pihole_running = PIHOLE_CONTAINER in active_running
     if pihole_running:
         messages.append(
             (Severity.INFO, "Confirmed: Pi-hole is running in the active runtime context.")
@@ -85,12 +128,8 @@ def dns_sanity_check(context: TaskContext) -> TaskResult:
         messages.append((Severity.ERROR, "Pi-hole is not running in the active runtime context."))
 
     for name in LEGACY_CONTAINERS:
-        in_active = (name in active_containers) or _container_running(name)
-        on_host = (
-            active_context == "colima"
-            and ((host_ok and name in host_containers) or _container_running(name, "default"))
-            and not in_active
-        )
+        in_active = name in active_running
+        on_host = name in host_running
         if in_active or on_host:
             success = False
             messages.append(
@@ -125,7 +164,6 @@ def dns_sanity_check(context: TaskContext) -> TaskResult:
         else:
             messages.append((Severity.INFO, "Pi-hole upstream matches the canonical DoH path."))
 
-    dns_resolvers = _get_configured_dns_resolvers()
     if dns_resolvers is None:
         success = False
         messages.append((Severity.ERROR, "Could not determine macOS DNS resolver configuration."))
@@ -140,27 +178,59 @@ def dns_sanity_check(context: TaskContext) -> TaskResult:
     else:
         messages.append((Severity.INFO, f"Resolver configuration matches {EXPECTED_RESOLVER_IP}."))
 
-    noncanonical_artifacts = audit_noncanonical_dns_artifacts()
     if not append_noncanonical_dns_artifact_messages(messages, noncanonical_artifacts):
         success = False
 
-    browser_dns_posture = audit_browser_dns_posture()
     if not append_browser_dns_posture_messages(messages, browser_dns_posture):
         success = False
 
     return TaskResult("DNS Stack Sanity Check", success, False, messages)
 
 
+def _docker_context_from_config() -> str | None:
+    """
+    Resolve the active context the way the docker CLI does, without booting the CLI:
+    DOCKER_CONTEXT, then DOCKER_HOST (implies "default"), then config.json's currentContext.
+    Returns None when the config cannot be read, so the caller can ask the CLI instead.
+    """
+    if env_context := os.environ.get("DOCKER_CONTEXT"):
+        return env_context
+    if os.environ.get("DOCKER_HOST"):
+        return "default"
+    config_dir = os.environ.get("DOCKER_CONFIG") or Path.home() / ".docker"
+    try:
+        config = json.loads((Path(config_dir) / "config.json").read_bytes())
+    except FileNotFoundError:
+        return "default"
+    except (OSError, ValueError):
+        return None
+    current = config.get("currentContext") if isinstance(config, dict) else None
+    return current if isinstance(current, str) and current else "default"
+
+
+def _warn_timeout(exc: subprocess.TimeoutExpired) -> None:
+    log.warning(
+        "'%s' timed out after %ss; treating it as unavailable.", " ".join(exc.cmd), exc.timeout
+    )
+
+
 def _get_docker_context() -> str | None:
+    if os.environ.get("NLX_DOCKER_CONTEXT_VIA_CLI") != "1":
+        context_name = _docker_context_from_config()
+        if context_name is not None:
+            return context_name
     try:
         result = subprocess.run(
             ["docker", "context", "show"],
             capture_output=True,
             text=True,
             check=False,
-            timeout=5,
+            timeout=SUBPROCESS_TIMEOUTS["context"],
         )
-    except (OSError, subprocess.TimeoutExpired) as exc:
+    except subprocess.TimeoutExpired as exc:
+        _warn_timeout(exc)
+        return None
+    except OSError as exc:
         log.debug("Error while checking Docker context: %s", exc)
         return None
     if result.returncode != 0:
@@ -173,16 +243,22 @@ def _docker_ps_names(context: str | None = None) -> tuple[set[str], bool]:
     cmd = ["docker"]
     if context:
         cmd.extend(["--context", context])
-    cmd.extend(["ps", "--format", "{{.Names}}"])
+    cmd.append("ps")
+    for name in SANITY_CONTAINERS:
+        cmd.extend(["--filter", f"name=^{name}$"])  # repeated name filters are OR'ed
+    cmd.extend(["--format", "{{.Names}}"])
     try:
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
             check=False,
-            timeout=5,
+            timeout=SUBPROCESS_TIMEOUTS["ps"],
         )
-    except (OSError, subprocess.TimeoutExpired) as exc:
+    except subprocess.TimeoutExpired as exc:
+        _warn_timeout(exc)
+        return set(), False
+    except OSError as exc:
         log.debug("Error while checking Docker containers for context '%s': %s", context, exc)
         return set(), False
     if result.returncode != 0:
@@ -190,32 +266,50 @@ def _docker_ps_names(context: str | None = None) -> tuple[set[str], bool]:
     return {line.strip() for line in result.stdout.splitlines() if line.strip()}, True
 
 
-def _container_running(name: str, context: str | None = None) -> bool:
+def _running_names(listed: set[str], listed_ok: bool, context: str | None = None) -> set[str]:
+    # A successful `docker ps` already names every running container; fall back to one
+    # batched inspect only when that listing failed.
+    return listed if listed_ok else _running_containers(SANITY_CONTAINERS, context)
+
+
+def _running_containers(names: tuple[str, ...], context: str | None = None) -> set[str]:
+    """Subset of `names` whose containers are running, from a single `docker inspect`."""
     cmd = ["docker"]
     if context:
         cmd.extend(["--context", context])
-    cmd.extend(["inspect", "-f", "{{.State.Running}}", name])
+    cmd.extend(["inspect", "-f", "{{.Name}} {{.State.Running}}", *names])
     try:
         result = subprocess.run(
             cmd,
             capture_output=True,
             text=True,
             check=False,
-            timeout=5,
+            timeout=SUBPROCESS_TIMEOUTS["inspect"],
         )
-    except (OSError, subprocess.TimeoutExpired) as exc:
-        log.debug("Error while inspecting container '%s' in context '%s': %s", name, context, exc)
-        return False
-
-    return result.returncode == 0 and result.stdout.strip().lower() == "true"
+    except subprocess.TimeoutExpired as exc:
+        _warn_timeout(exc)
+        return set()
+    except OSError as exc:
+        log.debug("Error while inspecting containers in context '%s': %s", context, exc)
+        return set()
+
+    # Missing containers make inspect exit non-zero, but the found ones are still printed.
+    running = set()
+    for line in (result.stdout or "").splitlines():
+        name, _, state = line.strip().partition(" ")
+        if state.lower() == "true":
+            running.add(name.lstrip("/"))
+    return running & set(names)
 
 
 def _host_cloudflared_listener_healthy() -> bool:
+    # One datagram round trip answers both "is it listening" and "does it resolve"; a
+    # closed port is reported back as ConnectionRefusedError, so no TCP pre-check is needed.
     try:
-        with socket.create_connection((LOCALHOST, CLOUDFLARED_PORT), timeout=1.5):
-            pass
-    except OSError:
-        return False
+        answer = udp_dns_query(LOCALHOST, CLOUDFLARED_PORT, "example.com", timeout=2.0)
+        return answer is not None and answer[0] == 0  # RCODE: NOERROR
+    except OSError as exc:
+        log.debug("In-process DNS probe failed (%s); falling back to dig.", exc)
 
     try:
         dig = subprocess.run(
@@ -231,9 +325,12 @@ def _host_cloudflared_listener_healthy() -> bool:
             capture_output=True,
             text=True,
             check=False,
-            timeout=5,
+            timeout=SUBPROCESS_TIMEOUTS["dig"],
         )
-    except (OSError, subprocess.TimeoutExpired):
+    except subprocess.TimeoutExpired as exc:
+        _warn_timeout(exc)
+        return False
+    except OSError:
         return False
 
     return dig.returncode == 0 and "NOERROR" in (dig.stdout or "")
@@ -246,48 +343,72 @@ def _get_pihole_upstreams() -> set[str] | None:
             capture_output=True,
             text=True,
             check=False,
-            timeout=5,
+            timeout=SUBPROCESS_TIMEOUTS["pihole_ftl"],
         )
-    except (OSError, subprocess.TimeoutExpired):
+    except subprocess.TimeoutExpired as exc:
+        _warn_timeout(exc)
+        return None
+    except OSError:
         return None
 
     if result.returncode != 0:
         return None
-    tokens = set(re.findall(r"[A-Za-z0-9_.:-]+(?:#[0-9]+)?", result.stdout or ""))
+    tokens = set(PIHOLE_UPSTREAM_TOKEN.findall(result.stdout or ""))
     return {token for token in tokens if token}
 
 
 def _find_plaintext_upstreams(upstreams: set[str]) -> set[str]:
-    findings: set[str] = set()
-    for upstream in upstreams:
-        normalized = upstream.lower()
-        for resolver in PLAINTEXT_UPSTREAMS:
-            if normalized == resolver or normalized.startswith(
-                (f"{resolver}#53", f"{resolver}:53")
-            ):
-                findings.add(upstream)
-    return findings
-
-
-def _get_configured_dns_resolvers() -> set[str] | None:
+    return {upstream for upstream in upstreams if upstream.lower() in PLAINTEXT_UPSTREAM_FORMS}
+
+
+def _network_services() -> list[str]:
+    """Enabled network services (Wi-Fi, Ethernet, ...); just Wi-Fi if they can't be listed."""
     try:
-        networksetup = subprocess.run(
-            ["networksetup", "-getdnsservers", "Wi-Fi"],
+        result = subprocess.run(
+            ["networksetup", "-listallnetworkservices"],
             capture_output=True,
             text=True,
             check=False,
-            timeout=5,
+            timeout=SUBPROCESS_TIMEOUTS["networksetup"],
         )
-        scutil = subprocess.run(
-            ["scutil", "--dns"],
-            capture_output=True,
-            text=True,
-            check=False,
-            timeout=5,
+    except subprocess.TimeoutExpired as exc:
+        _warn_timeout(exc)
+        return ["Wi-Fi"]
+    except OSError:
+        return ["Wi-Fi"]
+    services = parse_network_services(result.stdout or "") if result.returncode == 0 else []
+    return services or ["Wi-Fi"]
+
+
+def _run_resolver_probe(cmd: list[str], budget: str) -> str:
+    """stdout of one networksetup/scutil query; empty if it fails or overruns its budget."""
+    try:
+        result = subprocess.run(
+            cmd, capture_output=True, text=True, check=False, timeout=SUBPROCESS_TIMEOUTS[budget]
         )
-    except (OSError, subprocess.TimeoutExpired):
-        return None
+    except subprocess.TimeoutExpired as exc:
+        _warn_timeout(exc)
+        return ""
+    except OSError:
+        return ""
+    return result.stdout or ""
+
+
+def _get_configured_dns_resolvers(pool: Executor | None = None) -> set[str] | None:
+    if sys.platform != "darwin":
+        return None  # networksetup/scutil are macOS-only; don't fork just to hit ENOENT
+    # One query per service, each with its own budget, so a slow service only loses its own answer
+    services = _network_services()
+    commands = [["networksetup", "-getdnsservers", service] for service in services]
+    commands.append(["scutil", "--dns"])
+    budgets = ["networksetup_dns"] * len(services) + ["scutil"]
+    if pool is None:
+        with ThreadPoolExecutor(max_workers=len(commands)) as own_pool:
+            outputs = list(own_pool.map(_run_resolver_probe, commands, budgets))
+    else:
+        outputs = list(pool.map(_run_resolver_probe, commands, budgets))
+    *networksetup_outputs, scutil_output = outputs
 
-    values = set(re.findall(r"\b\d{1,3}(?:\.\d{1,3}){3}\b", networksetup.stdout or ""))
-    values.update(re.findall(r"nameserver\[\d+\]\s*:\s*([0-9.]+)", scutil.stdout or ""))
+    values = {ip for output in networksetup_outputs for ip in IPV4_ADDRESS.findall(output)}
+    values.update(SCUTIL_NAMESERVER.findall(scutil_output))
     return values if values else None
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import functools
 import hashlib
 import json
 import os
@@ -7,6 +8,7 @@ import platform
 import re
 import secrets
 import shutil
+import socket
 import subprocess
 import tarfile
 import tempfile
@@ -17,8 +19,9 @@ from typing import Any
 from urllib.error import HTTPError, URLError
 from urllib.request import Request, urlopen
 
-from jinja2 import Template
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 
+from nextlevelapex.core.io import atomic_write_text
 from nextlevelapex.core.task import Severity
 
 EXPECTED_RESOLVER_IP = "192.168.64.2"
@@ -58,12 +61,24 @@ LAUNCH_AGENT_BACKUP_PATH = (
 LAUNCH_AGENT_LOG = Path.home() / "Library" / "Logs" / "com.local.doh.log"
 PROJECT_ROOT = Path(__file__).resolve().parent.parent.parent
 LAUNCH_AGENT_TEMPLATE = PROJECT_ROOT / "assets" / "launch_agents" / "com.local.doh.plist.j2"
+JINJA_BYTECODE_CACHE_DIR = Path.home() / ".cache" / "nextlevelapex" / "jinja"
 CHROMIUM_BROWSER_SUPPORT_DIRS = (
     ("Google Chrome", ("Library", "Application Support", "Google", "Chrome")),
     ("Microsoft Edge", ("Library", "Application Support", "Microsoft Edge")),
     ("Brave Browser", ("Library", "Application Support", "BraveSoftware", "Brave-Browser")),
 )
 FIREFOX_PROFILE_DIR = ("Library", "Application Support", "Firefox", "Profiles")
+# Health polling backs off from a quick first retry to a modest ceiling
+CLOUDFLARED_HEALTH_POLL_INITIAL_SECONDS = 0.025
+CLOUDFLARED_HEALTH_POLL_MAX_SECONDS = 0.4
+PIHOLE_IMAGE_PULL_TIMEOUT_SECONDS = 600
+PIHOLE_HEALTH_POLL_INITIAL_SECONDS = 0.1
+PIHOLE_HEALTH_POLL_MAX_SECONDS = 2.0
+# Only the fields the readiness poll needs, rendered by the Docker CLI ("true healthy")
+PIHOLE_HEALTH_TEMPLATE = "{{.State.Running}} {{if .State.Health}}{{.State.Health.Status}}{{end}}"
+LAUNCHCTL_STATE_PATTERN = re.compile(r"^\s*state = (.+?)\s*$", re.MULTILINE)
+# EDNS0 OPT pseudo-record: root name, TYPE=OPT, 4096-byte UDP payload, DO bit set
+DNS_EDNS_DO_RECORD = b"\x00\x00\x29\x10\x00\x00\x00\x80\x00\x00\x00"
 
 
 @dataclass(frozen=True)
@@ -264,13 +279,22 @@ def orchestrate_dns_stack(config: dict[str, Any], dry_run: bool = False) -> Step
     if not docker_context.success:
         return StepResult(False, changed, messages, evidence)
 
+    # Docker now targets Colima, so the image download can run while legacy containers are
+    # cleaned up. The pull is a child process: it is either waited for below or terminated.
+    prefetch_evidence, image_pull = ({}, None) if dry_run else start_pihole_image_prefetch(settings)
+
     legacy = remove_legacy_containers(dry_run=dry_run)
     messages.extend(legacy.messages)
     changed |= legacy.changed
     evidence["legacy_cleanup"] = legacy.evidence
     if not legacy.success:
+        stop_pihole_image_prefetch(image_pull)
         return StepResult(False, changed, messages, evidence)
 
+    if not dry_run:
+        evidence["pihole_image_prefetch"] = finish_pihole_image_prefetch(
+            prefetch_evidence, image_pull
+        )
     pihole = ensure_pihole_container(settings, dry_run=dry_run)
     messages.extend(pihole.messages)
     changed |= pihole.changed
@@ -349,24 +373,27 @@ def ensure_cloudflared_service(settings: DNSSettings, dry_run: bool = False) ->
     if not legacy_cleanup.success:
         return StepResult(False, changed, messages, evidence)
 
-    if not LAUNCH_AGENT_TEMPLATE.exists():
+    try:
+        # The compiled template is cached per process; its mtime stat doubles as the existence check
+        rendered = render_launch_agent(settings, binary.path)
+    except FileNotFoundError:
         messages.append((Severity.ERROR, f"Missing LaunchAgent template: {LAUNCH_AGENT_TEMPLATE}"))
         return StepResult(False, changed, messages, evidence)
-
-    rendered = render_launch_agent(settings, binary.path)
-    previous = LAUNCH_AGENT_PATH.read_text(encoding="utf-8") if LAUNCH_AGENT_PATH.exists() else None
+    try:
+        previous: str | None = LAUNCH_AGENT_PATH.read_text(encoding="utf-8")
+    except FileNotFoundError:
+        previous = None
     if previous != rendered:
         if dry_run:
             messages.append((Severity.INFO, "Would rewrite the cloudflared LaunchAgent."))
         else:
-            LAUNCH_AGENT_PATH.parent.mkdir(parents=True, exist_ok=True)
-            LAUNCH_AGENT_PATH.write_text(rendered, encoding="utf-8")
-            LAUNCH_AGENT_PATH.chmod(0o644)
+            atomic_write_text(LAUNCH_AGENT_PATH, rendered, perms=0o644)
             changed = True
             messages.append((Severity.INFO, f"Updated LaunchAgent at {LAUNCH_AGENT_PATH}."))
 
     healthy = cloudflared_listener_healthy(settings)
-    launchd_running = launch_agent_running()
+    launchd_state = launch_agent_state()
+    launchd_running = launchd_state == "running"
     evidence["launchd_running"] = launchd_running
     evidence["listener_healthy"] = healthy
     if dry_run:
@@ -374,16 +401,20 @@ def ensure_cloudflared_service(settings: DNSSettings, dry_run: bool = False) ->
         return StepResult(True, changed, messages, evidence)
 
     if changed or not launchd_running or not healthy:
-        reload_result = reload_launch_agent()
+        # A new plist or an unloaded agent needs bootstrap; otherwise restarting in place suffices
+        if changed or launchd_state is None:
+            reload_result = reload_launch_agent()
+        else:
+            reload_result = kickstart_launch_agent()
         evidence["launch_agent_reload"] = reload_result
         if not reload_result["success"]:
             messages.append((Severity.ERROR, "launchctl failed to reload cloudflared LaunchAgent."))
             return StepResult(False, changed, messages, evidence)
         changed = True
-
-    if not wait_for_cloudflared_health(settings):
-        messages.append((Severity.ERROR, "cloudflared is not healthy on 127.0.0.1:5053."))
-        return StepResult(False, changed, messages, evidence)
+        # Only a fresh reload needs polling; otherwise the probe above already saw it healthy
+        if not wait_for_cloudflared_health(settings):
+            messages.append((Severity.ERROR, "cloudflared is not healthy on 127.0.0.1:5053."))
+            return StepResult(False, changed, messages, evidence)
 
     messages.append((Severity.INFO, "cloudflared is healthy on 127.0.0.1:5053."))
     return StepResult(True, changed, messages, evidence)
@@ -410,26 +441,32 @@ def ensure_cloudflared_binary(
         / f"cloudflared-{settings.cloudflared_required_version}"
     )
     stable_target = settings.cloudflared_bootstrap_bin_dir / "cloudflared"
-    preferred_version = cloudflared_version(settings.cloudflared_binary_path)
-    stable_version = cloudflared_version(stable_target)
-    versioned_version = cloudflared_version(versioned_target)
+    # Stat each candidate once; `--version` is only forked for binaries that are present.
+    preferred_exists = settings.cloudflared_binary_path.exists()
+    stable_exists = os.path.lexists(stable_target)
+    versioned_exists = versioned_target.exists()
+    preferred_version = (
+        cloudflared_version(settings.cloudflared_binary_path) if preferred_exists else None
+    )
+    stable_version = cloudflared_version(stable_target) if stable_exists else None
+    versioned_version = cloudflared_version(versioned_target) if versioned_exists else None
     evidence["candidates"] = [
         {
             "label": "preferred",
             "path": str(settings.cloudflared_binary_path),
-            "exists": settings.cloudflared_binary_path.exists(),
+            "exists": preferred_exists,
             "version": preferred_version,
         },
         {
             "label": "bootstrap_symlink",
             "path": str(stable_target),
-            "exists": stable_target.exists() or stable_target.is_symlink(),
+            "exists": stable_exists,
             "version": stable_version,
         },
         {
             "label": "bootstrap_versioned",
             "path": str(versioned_target),
-            "exists": versioned_target.exists(),
+            "exists": versioned_exists,
             "version": versioned_version,
         },
     ]
@@ -498,7 +535,7 @@ def ensure_cloudflared_binary(
                 f"Preferred cloudflared binary drifted: expected {settings.cloudflared_required_version}, observed {preferred_version} at {settings.cloudflared_binary_path}.",
             )
         )
-    elif not settings.cloudflared_binary_path.exists():
+    elif not preferred_exists:
         messages.append(
             (
                 Severity.INFO,
@@ -660,6 +697,61 @@ def ensure_docker_context_colima(dry_run: bool = False) -> StepResult:
     return StepResult(True, True, messages, evidence)
 
 
+def start_pihole_image_prefetch(
+    settings: DNSSettings,
+) -> tuple[dict[str, Any], subprocess.Popen[str] | None]:
+    """
+    Start `docker pull` for the pinned Pi-hole image in the background, only if it isn't
+    already local, so the pull in ensure_pihole_container is a quick up-to-date check.
+    Returns the evidence so far and the running pull (None when nothing was started).
+    """
+    present = _run(
+        ["docker", "image", "inspect", "--format", "{{.Id}}", settings.pihole_image], timeout=30
+    )
+    if present.success:
+        return {"present": True}, None
+    cmd = ["docker", "pull", settings.pihole_image]
+    try:
+        pull = subprocess.Popen(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    except OSError as exc:
+        failed = CommandOutcome(cmd=cmd, returncode=-1, stdout="", stderr=str(exc))
+        return {"present": False, "pull": _serialize_command(failed)}, None
+    return {"present": False}, pull
+
+
+def finish_pihole_image_prefetch(
+    evidence: dict[str, Any], pull: subprocess.Popen[str] | None
+) -> dict[str, Any]:
+    """Wait for a started prefetch and record its outcome in `evidence`."""
+    if pull is None:
+        return evidence
+    try:
+        _, stderr = pull.communicate(timeout=PIHOLE_IMAGE_PULL_TIMEOUT_SECONDS)
+    except subprocess.TimeoutExpired as exc:
+        stop_pihole_image_prefetch(pull)
+        outcome = CommandOutcome(cmd=list(pull.args), returncode=-1, stdout="", stderr=str(exc))
+    else:
+        outcome = CommandOutcome(
+            cmd=list(pull.args), returncode=pull.returncode, stdout="", stderr=stderr.strip()
+        )
+    evidence["pull"] = _serialize_command(outcome)
+    return evidence
+
+
+def stop_pihole_image_prefetch(pull: subprocess.Popen[str] | None) -> None:
+    """Terminate a prefetch that is no longer needed (kill it if it ignores SIGTERM)."""
+    if pull is None:
+        return
+    if pull.poll() is None:
+        pull.terminate()
+        try:
+            pull.communicate(timeout=10)
+            return
+        except subprocess.TimeoutExpired:
+            pull.kill()
+    pull.communicate()
+
+
 def ensure_pihole_container(settings: DNSSettings, dry_run: bool = False) -> StepResult:
     messages: list[tuple[Severity, str]] = []
     evidence: dict[str, Any] = {}
@@ -1138,8 +1230,30 @@ def is_brew_pinned(formula: str) -> bool:
     return result.success and formula in {line.strip() for line in result.stdout.splitlines()}
 
 
+@functools.lru_cache(maxsize=1)
+def _launch_agent_environment(template_dir: str) -> Environment:
+    # Compiled template code persists on disk, so a fresh process skips Jinja's parse/compile too
+    try:
+        JINJA_BYTECODE_CACHE_DIR.mkdir(mode=0o700, parents=True, exist_ok=True)
+        bytecode_cache: FileSystemBytecodeCache | None = FileSystemBytecodeCache(
+            str(JINJA_BYTECODE_CACHE_DIR)
+        )
+    except OSError:
+        bytecode_cache = None
+    return Environment(loader=FileSystemLoader(template_dir), bytecode_cache=bytecode_cache)
+
+
+@functools.lru_cache(maxsize=1)
+def _compiled_launch_agent_template(template_path: str, mtime_ns: int) -> Template:
+    # Keyed on mtime so an edited template is recompiled; Jinja compilation dominates rendering.
+    path = Path(template_path)
+    return _launch_agent_environment(str(path.parent)).get_template(path.name)
+
+
 def render_launch_agent(settings: DNSSettings, cloudflared_bin: Path) -> str:
-    template = Template(LAUNCH_AGENT_TEMPLATE.read_text())
+    template = _compiled_launch_agent_template(
+        str(LAUNCH_AGENT_TEMPLATE), LAUNCH_AGENT_TEMPLATE.stat().st_mtime_ns
+    )
     return template.render(
         CLOUDFLARED_BIN=str(cloudflared_bin),
         LOG_PATH=str(LAUNCH_AGENT_LOG),
@@ -1462,12 +1576,20 @@ def sha256_file(path: Path) -> str:
     return digest.hexdigest()
 
 
-def launch_agent_running() -> bool:
+def launch_agent_state() -> str | None:
+    """launchd's `state` for the agent (e.g. "running"), "" if unreported, None if not loaded."""
     result = _run(
         ["launchctl", "print", f"gui/{os.getuid()}/{LAUNCH_AGENT_LABEL}"],
         timeout=10,
     )
-    return result.success and "state = running" in result.stdout
+    if not result.success:
+        return None
+    match = LAUNCHCTL_STATE_PATTERN.search(result.stdout)
+    return match.group(1) if match else ""
+
+
+def launch_agent_running() -> bool:
+    return launch_agent_state() == "running"
 
 
 def reload_launch_agent() -> dict[str, Any]:
@@ -1486,7 +1608,66 @@ def reload_launch_agent() -> dict[str, Any]:
     }
 
 
+def kickstart_launch_agent() -> dict[str, Any]:
+    # Restarts an already-loaded agent in place: no bootout window and no plist re-parse
+    kickstart = _run(
+        ["launchctl", "kickstart", "-k", f"gui/{os.getuid()}/{LAUNCH_AGENT_LABEL}"],
+        timeout=15,
+    )
+    return {"success": kickstart.success, "kickstart": _serialize_command(kickstart)}
+
+
+def udp_dns_query(
+    host: str,
+    port: int,
+    qname: str,
+    *,
+    dnssec: bool = False,
+    timeout: float = 5.0,
+) -> tuple[int, int] | None:
+    """
+    Send one recursive `A` query over UDP and return the reply's (RCODE, ANCOUNT).
+    Returns None when nothing answers; other socket errors propagate so callers can use `dig`.
+    """
+    query_id = secrets.token_bytes(2)
+    question = b"".join(
+        bytes([len(label)]) + label.encode("ascii") for label in qname.rstrip(".").split(".")
+    )
+    # Header: ID, flags=RD, QDCOUNT=1, AN/NSCOUNT=0, ARCOUNT=1 only when the OPT record follows
+    arcount = b"\x00\x01" if dnssec else b"\x00\x00"
+    additional = DNS_EDNS_DO_RECORD if dnssec else b""
+    header = query_id + b"\x01\x00\x00\x01\x00\x00\x00\x00" + arcount
+    query = header + question + b"\x00\x00\x01\x00\x01" + additional
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect((host, port))
+        sock.send(query)
+        try:
+            reply = sock.recv(4096)
+        except (TimeoutError, ConnectionRefusedError):
+            return None
+    if len(reply) < 12 or reply[:2] != query_id or not reply[2] & 0x80:
+        return None
+    return reply[3] & 0x0F, int.from_bytes(reply[6:8], "big")
+
+
 def cloudflared_listener_healthy(settings: DNSSettings) -> bool:
+    # Healthy means it resolves, and it validates DNSSEC (a broken signature must SERVFAIL)
+    address, port = settings.cloudflared_address, settings.cloudflared_port
+    try:
+        answer = udp_dns_query(address, port, "example.com")
+        dnssec_probe = udp_dns_query(address, port, "dnssec-failed.org", dnssec=True)
+    except OSError:
+        pass
+    else:
+        return (
+            answer is not None
+            and answer[0] == 0
+            and answer[1] > 0
+            and dnssec_probe is not None
+            and dnssec_probe[0] == 2
+        )
+
     dig_ok = _run(
         [
             "dig",
@@ -1513,11 +1694,13 @@ def cloudflared_listener_healthy(settings: DNSSettings) -> bool:
 
 
 def wait_for_cloudflared_health(settings: DNSSettings, timeout_seconds: int = 10) -> bool:
-    deadline = time.time() + timeout_seconds
-    while time.time() < deadline:
+    deadline = time.monotonic() + timeout_seconds
+    delay = CLOUDFLARED_HEALTH_POLL_INITIAL_SECONDS
+    while time.monotonic() < deadline:
         if cloudflared_listener_healthy(settings):
             return True
-        time.sleep(0.5)
+        time.sleep(delay)
+        delay = min(delay * 2, CLOUDFLARED_HEALTH_POLL_MAX_SECONDS)
     return False
 
 
@@ -1541,32 +1724,51 @@ def remove_legacy_containers(
 
         names = {line.strip() for line in listing.stdout.splitlines() if line.strip()}
         context_evidence["visible_containers"] = sorted(names)
-        for name in container_names:
-            if name not in names:
-                continue
-            if dry_run:
+        present = [name for name in container_names if name in names]
+        if not present:
+            continue
+        if dry_run:
+            messages.extend(
+                (
+                    Severity.INFO,
+                    f"Would remove legacy container {name} from Docker context {context}.",
+                )
+                for name in present
+            )
+            changed = True
+            continue
+        # One `docker rm -f` per context removes every legacy container found there.
+        remove = _run(docker_command(["rm", "-f", *present], context=context), timeout=60)
+        context_evidence["remove"] = _serialize_command(remove)
+        remaining: set[str] = set()
+        if not remove.success:
+            # The batch may have removed some containers before failing; list again to see which.
+            recheck = _run(list_cmd, timeout=10)
+            context_evidence["recheck"] = _serialize_command(recheck)
+            if recheck.success:
+                remaining = {line.strip() for line in recheck.stdout.splitlines() if line.strip()}
+            else:
+                remaining = set(present)
+        for name in present:
+            removed = name not in remaining
+            context_evidence[name] = {"removed": removed}
+            if removed:
+                changed = True
                 messages.append(
                     (
                         Severity.INFO,
-                        f"Would remove legacy container {name} from Docker context {context}.",
+                        f"Removed legacy container {name} from Docker context {context}.",
                     )
                 )
-                changed = True
-                continue
-            remove = _run(docker_command(["rm", "-f", name], context=context), timeout=60)
-            context_evidence[name] = _serialize_command(remove)
-            if not remove.success:
+            else:
                 messages.append(
                     (
                         Severity.ERROR,
                         f"Failed to remove legacy container {name} from Docker context {context}.",
                     )
                 )
-                return StepResult(False, changed, messages, evidence)
-            changed = True
-            messages.append(
-                (Severity.INFO, f"Removed legacy container {name} from Docker context {context}.")
-            )
+        if any(name in remaining for name in present):
+            return StepResult(False, changed, messages, evidence)
     return StepResult(True, changed, messages, evidence)
 
 
@@ -1916,14 +2118,17 @@ def resolve_pihole_password(settings: DNSSettings) -> tuple[str, bool]:
 
 
 def wait_for_pihole_health(timeout_seconds: int = 60) -> bool:
-    deadline = time.time() + timeout_seconds
-    while time.time() < deadline:
-        inspect = inspect_container(PIHOLE_CONTAINER)
-        if inspect:
-            state = inspect.get("State") or {}
-            if state.get("Running") and ((state.get("Health") or {}).get("Status") == "healthy"):
-                return True
-        time.sleep(2)
+    deadline = time.monotonic() + timeout_seconds
+    delay = PIHOLE_HEALTH_POLL_INITIAL_SECONDS
+    while time.monotonic() < deadline:
+        # The image's own HEALTHCHECK does the DNS probing; we just read its verdict
+        state = _run(
+            docker_command(["inspect", "-f", PIHOLE_HEALTH_TEMPLATE, PIHOLE_CONTAINER]), timeout=20
+        )
+        if state.success and state.stdout.split() == ["true", "healthy"]:
+            return True
+        time.sleep(delay)
+        delay = min(delay * 2, PIHOLE_HEALTH_POLL_MAX_SECONDS)
     return False
 
 
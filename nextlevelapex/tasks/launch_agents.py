@@ -1,16 +1,23 @@
 # ~/Projects/NextLevelApex/nextlevelapex/tasks/launch_agents.py
 
+import functools
+import hashlib
+import json
 import os  # Need to import 'os' for _manage_launch_agent
-import stat  # For chmod
 from pathlib import Path
 
 from nextlevelapex.core.command import run_command
+from nextlevelapex.core.io import atomic_write_text
 from nextlevelapex.core.logger import LoggerProxy
 from nextlevelapex.core.registry import task
 from nextlevelapex.core.task import Severity, TaskResult
 
 log = LoggerProxy(__name__)
 
+SCRIPT_PERMS = 0o755  # launchd executes the scripts directly
+PLIST_PERMS = 0o644
+PLIST_LINT_CACHE_LIMIT = 64  # digests of plists plutil has already accepted
+
 
 # --- Helper to write script files ---
 def _write_executable_script(script_path: Path, content: str, dry_run: bool) -> bool:
@@ -22,12 +29,19 @@ def _write_executable_script(script_path: Path, content: str, dry_run: bool) ->
         print("--- End DRYRUN ---")
         return True
     try:
-        script_path.parent.mkdir(parents=True, exist_ok=True)
-        with script_path.open("w") as f:
-            f.write(content)
-        # Make executable: current_mode | owner_execute | group_execute | other_execute
-        current_mode = script_path.stat().st_mode
-        script_path.chmod(current_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+        unchanged = (
+            script_path.stat().st_mode & 0o777 == SCRIPT_PERMS
+            and script_path.read_bytes() == content.encode()
+        )
+    except OSError:
+        unchanged = False
+    if unchanged:
+        log.info(f"Script {script_path} is already up to date; leaving it untouched.")
+        return True
+    try:
+        # Written beside the target with its final mode, then renamed over it: no separate
+        # stat/chmod, and a copy launchd is executing is never truncated mid-run.
+        atomic_write_text(script_path, content, perms=SCRIPT_PERMS)
         log.info(f"Script {script_path} written and made executable.")
         return True
     except Exception as e:
@@ -36,6 +50,68 @@ def _write_executable_script(script_path: Path, content: str, dry_run: bool) ->
 
 
 # --- Helper to manage LaunchAgents ---
+@functools.lru_cache(maxsize=1)
+def _gui_user_id() -> str:
+    """Effective UID for the launchctl gui/<uid> domain; fixed for the process."""
+    return str(os.geteuid())
+
+
+def _plist_lint_cache_path() -> Path:
+    return Path.home() / ".cache" / "nextlevelapex" / "plist_lint_ok.json"
+
+
+def _load_plist_lint_cache() -> list[str]:
+    try:
+        cached = json.loads(_plist_lint_cache_path().read_bytes())
+    except (OSError, ValueError):
+        return []
+    return [d for d in cached if isinstance(d, str)] if isinstance(cached, list) else []
+
+
+def _lint_plist(plist_path: Path, plist_content: str) -> bool:
+    """`plutil -lint` the plist, skipping content whose digest already passed once."""
+    digest = hashlib.sha256(plist_content.encode()).hexdigest()
+    linted = _load_plist_lint_cache()
+    if digest in linted:
+        log.info(f"Plist file {plist_path} matches a previously linted version.")
+        return True
+
+    lint_result = run_command(["plutil", "-lint", str(plist_path)], dry_run=False, check=False)
+    if not lint_result.success:
+        log.error(f"Plist file {plist_path} failed linting.Stderr:\n{lint_result.stderr}")
+        return False
+    log.info(f"Plist file {plist_path} linted successfully.")
+
+    linted = [*linted, digest][-PLIST_LINT_CACHE_LIMIT:]
+    try:
+        atomic_write_text(_plist_lint_cache_path(), json.dumps(linted), perms=0o600)
+    except OSError as e:
+        log.debug(f"Could not record plist lint result: {e}")
+    return True
+
+
+@functools.lru_cache(maxsize=1)
+def _loaded_launch_agent_labels() -> frozenset[str]:
+    """
+    Labels launchd has loaded in the user's domain, from one `launchctl list` shared by
+    every agent setup. Cleared whenever an agent is booted out or bootstrapped.
+    """
+    result = run_command(["launchctl", "list"], dry_run=False, check=False)
+    if not result.success:
+        return frozenset()  # Unknown: treat as not loaded so the agent gets (re)loaded
+    # Columns: PID, Status, Label; the first line is the header
+    return frozenset(
+        fields[2]
+        for fields in (line.split(None, 2) for line in (result.stdout or "").splitlines()[1:])
+        if len(fields) == 3
+    )
+
+
+def _launch_agent_loaded(label: str) -> bool:
+    """True if launchd already knows the agent in the user's GUI domain."""
+    return label in _loaded_launch_agent_labels()
+
+
 def _manage_launch_agent(
     plist_name: str,  # e.g., "com.nextlevelapex.batteryalert.plist"
     plist_content: str,
@@ -56,30 +132,34 @@ def _manage_launch_agent(
         log.info(f"DRYRUN: Would bootout/bootstrap {label} using {plist_path}.")
         return True
 
+    user_id = _gui_user_id()
+    try:
+        current_content: str | None = plist_path.read_text()
+    except (FileNotFoundError, UnicodeDecodeError):
+        current_content = None
+    if current_content == plist_content and _launch_agent_loaded(label):
+        log.info(f"LaunchAgent {label} is unchanged and already loaded; skipping reload.")
+        return True
+
     try:
-        launch_agents_dir.mkdir(parents=True, exist_ok=True)
-        with plist_path.open("w") as f:
-            f.write(plist_content)
+        # launchd never observes a half-written plist
+        atomic_write_text(plist_path, plist_content, perms=PLIST_PERMS)
         log.info(f"Plist file {plist_path} written.")
     except Exception as e:
         log.error(f"Failed to write plist file {plist_path}: {e}")
         return False
 
-    # Lint the plist
-    lint_result = run_command(["plutil", "-lint", str(plist_path)], dry_run=False, check=False)
-    if not lint_result.success:
-        log.error(f"Plist file {plist_path} failed linting.Stderr:\n{lint_result.stderr}")
+    if not _lint_plist(plist_path, plist_content):
         return False
-    log.info(f"Plist file {plist_path} linted successfully.")
 
     # Unload/bootout any existing agent with the same label
     # We use the label for bootout as it's more robust if path changed
     # We use the plist path for bootstrap as it's required
-    user_id = str(os.geteuid())  # Get current user ID for launchctl domain
     log.info(f"Attempting to bootout existing agent: gui/{user_id}/{label}")
     run_command(
         ["launchctl", "bootout", f"gui/{user_id}/{label}"], dry_run=False, check=False
     )  # Ignore errors if not loaded
+    _loaded_launch_agent_labels.cache_clear()
 
     # Load/bootstrap the new agent
     log.info(f"Attempting to bootstrap agent: gui/{user_id}/{plist_path}")
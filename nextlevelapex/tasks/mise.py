@@ -9,39 +9,59 @@ from nextlevelapex.core.task import Severity, TaskContext, TaskResult
 
 log = LoggerProxy(__name__)
 
+DEFAULT_MISE_JOBS = 4  # mise's own default for parallel tool installs
+MISE_ACTIVATION_LINE = 'eval "$(mise activate zsh)"'
 
-def setup_mise_globals(tools: dict[str, str], dry_run: bool = False) -> bool:
+
+def _has_uncommented(data: bytes, needle: bytes) -> bool:
+    """True if `needle` occurs on a line whose first non-blank character isn't '#'."""
+    # Substring search and rfind run in C; a per-line regex over a large rc file does not.
+    pos = data.find(needle)
+    while pos != -1:
+        line_start = data.rfind(b"\n", 0, pos) + 1
+        if not data[line_start:pos].lstrip().startswith(b"#"):
+            return True
+        pos = data.find(needle, pos + 1)
+    return False
+
+
+def setup_mise_globals(
+    tools: dict[str, str], dry_run: bool = False, jobs: int = DEFAULT_MISE_JOBS
+) -> bool:
+    """
+    Pin `tools` as global mise versions and install them. Only the listed tools are
+    installed; other versions pinned in mise config files are left to `mise install`.
+    """
     log.debug(f"setup_mise_globals received dict: {tools} (Type: {type(tools)})")
     if not tools:
         log.info("No Mise global tools specified in config.")
         return True
 
     tool_args = [f"{name}@{version}" for name, version in tools.items()]
-    log.info(f"Setting global Mise tools: {', '.join(tool_args)}...")
+    log.info(f"Setting and installing global Mise tools: {', '.join(tool_args)}...")
 
-    cmd = ["mise", "use", "--global", *tool_args]
+    # `mise use` installs any missing tool it pins, so one invocation both records the
+    # versions and fetches them, `jobs` at a time. Unlike a bare `mise install`, it does
+    # not touch tools pinned elsewhere that weren't passed in.
+    cmd = ["mise", "use", "--global", "--jobs", str(jobs), *tool_args]
     result = run_command(cmd, dry_run=dry_run, check=True)
 
     if not result.success:
         log.error("Failed to set global Mise tools.")
         return False
 
-    cmd_install = ["mise", "install"]
-    log.info("Ensuring Mise global tools are installed...")
-    result_install = run_command(cmd_install, dry_run=dry_run, check=True)
-
-    if not result_install.success:
-        log.error("Failed to install global Mise tools after setting versions.")
-        return False
-
     log.info("Mise global tools setup finished.")
     return True
 
 
 @task("Mise Globals")
 def setup_mise_globals_task(ctx: TaskContext) -> TaskResult:
-    tools = ctx["config"].get("developer_tools", {}).get("mise", {}).get("global_tools", {})
-    success = setup_mise_globals(tools=tools, dry_run=ctx["dry_run"])
+    mise_cfg = ctx["config"].get("developer_tools", {}).get("mise", {})
+    success = setup_mise_globals(
+        tools=mise_cfg.get("global_tools", {}),
+        dry_run=ctx["dry_run"],
+        jobs=mise_cfg.get("jobs", DEFAULT_MISE_JOBS),
+    )
     messages = []
     if not success:
         messages.append((Severity.ERROR, "Failed to write mise globals"))
@@ -57,7 +77,7 @@ def ensure_mise_activation(
     shell_config_file: str = "~/.zshrc",
     dry_run: bool = False,
 ) -> bool:
-    activation_line = 'eval "$(mise activate zsh)"'
+    activation_line = MISE_ACTIVATION_LINE
     config_path = Path(shell_config_file).expanduser().resolve()
 
     log.info(f"Ensuring Mise activation command is in {config_path}...")
@@ -68,16 +88,14 @@ def ensure_mise_activation(
         )
         return True
 
-    line_found = False
-    if config_path.is_file():
-        try:
-            with open(config_path) as f:
-                for line in f:
-                    if activation_line in line and not line.strip().startswith("#"):
-                        line_found = True
-                        break
-        except Exception as e:
-            log.error(f"Error reading {config_path}: {e}")
+    try:
+        config_bytes = config_path.read_bytes()  # no decoding needed to find an ASCII command
+    except FileNotFoundError:
+        config_bytes = b""
+    except Exception as e:
+        log.error(f"Error reading {config_path}: {e}")
+        config_bytes = b""
+    line_found = _has_uncommented(config_bytes, activation_line.encode())
 
     if line_found:
         log.info(f"Mise activation line already found in {config_path}.")
@@ -1,7 +1,10 @@
 # ~/Projects/NextLevelApex/nextlevelapex/tasks/network.py
 
-import json
+import re
 import socket
+from concurrent.futures import ThreadPoolExecutor
+
+from pydantic_core import from_json
 
 from nextlevelapex.core.command import run_command
 from nextlevelapex.core.logger import LoggerProxy
@@ -10,6 +13,15 @@ from nextlevelapex.core.task import Severity, TaskContext, TaskResult
 
 log = LoggerProxy(__name__)
 
+BRIDGE_GATEWAY_TEMPLATE = "{{(index .IPAM.Config 0).Gateway}}"
+# Any routable address works: connecting a UDP socket only picks a route, nothing is sent
+ROUTE_PROBE_ADDRESS = ("1.1.1.1", 80)
+# First non-blank `networksetup -listallnetworkservices` line that is neither the
+# "An asterisk (*) denotes..." header nor a disabled (`*`-prefixed) service
+NETWORK_SERVICE_LINE = re.compile(
+    r"^[^\S\n]*(?!\*|An asterisk)(\S(?:.*\S)?)[^\S\n]*$", re.MULTILINE
+)
+
 
 @task("Advanced Networking")
 def setup_networking_tasks(context: TaskContext) -> TaskResult:
@@ -25,16 +37,24 @@ def setup_networking_tasks(context: TaskContext) -> TaskResult:
         return TaskResult("Advanced Networking", True, False, messages)
 
     networking_cfg.get("doh_method", "pihole_builtin")
-    active_iface = _get_active_network_service_name()
+    # Each probe is an independent subprocess; overlap them. The Docker-network lookup is
+    # started speculatively and only used if Colima doesn't report the VM IP itself.
+    with ThreadPoolExecutor(max_workers=3) as pool:
+        iface_probe = pool.submit(_get_active_network_service_name)
+        colima_probe = pool.submit(_get_colima_network, dry_run)
+        docker_vm_ip_probe = pool.submit(_get_vm_ip_from_docker_network, dry_run)
+        active_iface = iface_probe.result()
+        vm_ip, host_ip = colima_probe.result()
+        docker_vm_ip = docker_vm_ip_probe.result()
+
     if not active_iface:
         messages.append((Severity.ERROR, "Could not determine active network interface."))
         return TaskResult("Advanced Networking", False, False, messages)
 
     messages.append((Severity.INFO, f"Using interface: {active_iface}"))
 
-    vm_ip = _get_colima_vm_ip(dry_run)
     if not vm_ip:
-        vm_ip = _get_vm_ip_from_docker_network(dry_run)
+        vm_ip = docker_vm_ip
         if vm_ip:
             messages.append((Severity.WARNING, "Fallback Colima VM IP obtained via Docker."))
 
@@ -42,12 +62,11 @@ def setup_networking_tasks(context: TaskContext) -> TaskResult:
         messages.append((Severity.ERROR, "Could not retrieve Colima VM IP."))
         return TaskResult("Advanced Networking", False, False, messages)
 
-    host_ip = _get_host_ip_from_colima(dry_run)
     if not host_ip:
         try:
-            host_ip = socket.gethostbyname(socket.gethostname())
+            host_ip = _get_host_ip_from_route()
             messages.append((Severity.WARNING, f"Fallback host IP from socket: {host_ip}"))
-        except Exception as e:
+        except OSError as e:
             messages.append(
                 (
                     Severity.WARNING,
@@ -58,51 +77,79 @@ def setup_networking_tasks(context: TaskContext) -> TaskResult:
     return TaskResult("Advanced Networking", success, changed, messages)
 
 
+def _get_host_ip_from_route() -> str:
+    """
+    Source address the kernel would use for outbound traffic. Unlike resolving our own
+    hostname this never touches DNS, so it can't stall on a resolver that is down or
+    being switched over to Pi-hole.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as sock:
+        sock.connect(ROUTE_PROBE_ADDRESS)
+        return sock.getsockname()[0]
+
+
 def _get_active_network_service_name() -> str | None:
     try:
         out = run_command(["networksetup", "-listallnetworkservices"], capture=True, check=True)
-        for line in out.stdout.splitlines():
-            stripped = line.strip()
-            if stripped and not stripped.startswith("*") and not stripped.startswith("An asterisk"):
-                return stripped
+        match = NETWORK_SERVICE_LINE.search(out.stdout)
+        if match:
+            return match.group(1)
     except Exception as e:
         log.error(f"Failed to detect active network service: {e}")
     return None
 
 
-def _get_colima_vm_ip(dry_run: bool = False) -> str | None:
-    log.info("Fetching Colima VM IP using `colima status --json`...")
+def _get_colima_status(dry_run: bool = False) -> dict | None:
+    log.info("Fetching Colima status using `colima status --json`...")
     try:
         out = run_command(["colima", "status", "--json"], capture=True, check=True, dry_run=dry_run)
         if not out.success or not out.stdout:
-            return "DRYRUN_VM_IP" if dry_run else None
-
-        data = json.loads(out.stdout)
-        ip = data.get("ip_address") or data.get("network", {}).get("address")
-        if not ip:
-            log.warning("No IP found in Colima status output.")
             return None
-
-        return ip
+        data = from_json(out.stdout)  # pydantic-core's native parser
     except Exception as e:
-        log.error(f"Error parsing Colima VM IP: {e}", exc_info=True)
+        log.error(f"Error parsing Colima status: {e}", exc_info=True)
+        return None
+    return data if isinstance(data, dict) else None
+
+
+def _host_ip_from_vm_address(vm_ip: str | None) -> str | None:
+    """Colima's host-side bridge is the .1 address of the VM's /24 network."""
+    octets = (vm_ip or "").split("/")[0].split(".")
+    if len(octets) != 4 or not all(octet.isdigit() for octet in octets):
         return None
+    return ".".join([*octets[:3], "1"])
+
+
+def _get_colima_network(dry_run: bool = False) -> tuple[str | None, str | None]:
+    """
+    VM IP and host IP from a single `colima status --json`. Only when the status has
+    neither a gateway nor a VM address does the host IP fall back to `colima ssh`.
+    """
+    status = _get_colima_status(dry_run)
+    if status is None:
+        return ("DRYRUN_VM_IP" if dry_run else None), _get_host_ip_from_colima(dry_run)
+
+    network = status.get("network") or {}
+    vm_ip = status.get("ip_address") or network.get("address")
+    if not vm_ip:
+        log.warning("No IP found in Colima status output.")
+    host_ip = network.get("gateway") or _host_ip_from_vm_address(vm_ip)
+    return vm_ip or None, host_ip or _get_host_ip_from_colima(dry_run)
 
 
 def _get_vm_ip_from_docker_network(dry_run: bool = False) -> str | None:
     try:
+        # Let the Docker CLI pick out the one field instead of dumping the whole network JSON
         res = run_command(
-            ["docker", "network", "inspect", "bridge"],
+            ["docker", "network", "inspect", "-f", BRIDGE_GATEWAY_TEMPLATE, "bridge"],
             capture=True,
             check=False,
             dry_run=dry_run,
         )
         if res.success and res.stdout:
-            parsed = json.loads(res.stdout)
-            ipam = parsed[0].get("IPAM", {}).get("Config", [{}])[0]
-            return ipam.get("Gateway")
+            return res.stdout.strip() or None
     except Exception as e:
-        log.warning(f"Docker network fallback IP parse failed: {e}", exc_info=True)
+        log.warning(f"Docker network fallback IP lookup failed: {e}", exc_info=True)
     return None
 
 
@@ -117,5 +164,3 @@ def _get_host_ip_from_colima(dry_run: bool = False) -> str | None:
     except Exception:
         return "192.168.5.1" if not dry_run else "DRYRUN_HOST_IP"
     return None
-
-    return None
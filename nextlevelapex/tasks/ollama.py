@@ -1,5 +1,7 @@
 # ~/Projects/NextLevelApex/nextlevelapex/tasks/ollama.py
 
+import shutil
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from nextlevelapex.core.command import run_command
 from nextlevelapex.core.logger import LoggerProxy
@@ -8,6 +10,8 @@ from nextlevelapex.core.task import Severity, TaskResult
 
 log = LoggerProxy(__name__)
 
+DEFAULT_PULL_PARALLELISM = 4  # Pulls are network-bound; a few at once saturate most links
+
 
 def setup_ollama(config: dict, dry_run: bool = False) -> bool:
     """Installs Ollama and pulls specified models."""
@@ -24,12 +28,16 @@ def setup_ollama(config: dict, dry_run: bool = False) -> bool:
     #    It's good practice to ensure it here if this module can run independently.
     #    The main brew_tasks.install_formulae should ideally cover 'ollama'.
     #    If it's already installed, brew install will just say so.
-    log.info("Ensuring Ollama brew formula is installed...")
-    install_result = run_command(["brew", "install", "ollama"], dry_run=dry_run, check=True)
-    if not install_result.success and not dry_run:  # Check for actual failure if not dry run
-        log.error("Failed to install Ollama via Homebrew.")
-        return False
-    log.info("Ollama formula check/install complete.")
+    if shutil.which("ollama") and not ollama_config.get("force_reinstall", False):
+        # Spares brew's Ruby start-up just to be told it's already installed
+        log.info("Ollama already installed; skipping 'brew install ollama'.")
+    else:
+        log.info("Ensuring Ollama brew formula is installed...")
+        install_result = run_command(["brew", "install", "ollama"], dry_run=dry_run, check=True)
+        if not install_result.success and not dry_run:  # Check for actual failure if not dry run
+            log.error("Failed to install Ollama via Homebrew.")
+            return False
+        log.info("Ollama formula check/install complete.")
 
     # 2. Start Ollama service
     if ollama_config.get("start_service", True):
@@ -59,14 +67,27 @@ def setup_ollama(config: dict, dry_run: bool = False) -> bool:
         return True
 
     all_models_pulled = True
-    for model_name in models_to_pull:
-        log.info(f"Pulling Ollama model: {model_name}...")
-        # `ollama pull` can take a long time; no timeout specified here
-        pull_result = run_command(["ollama", "pull", model_name], dry_run=dry_run, check=True)
-        if not pull_result.success:
-            log.error(f"Failed to pull Ollama model: {model_name}")
-            all_models_pulled = False  # Continue trying other models
-            # Optionally, could make this a fatal error by returning False here
+    parallelism = max(
+        1, min(ollama_config.get("pull_parallelism", DEFAULT_PULL_PARALLELISM), len(models_to_pull))
+    )
+    # `ollama pull` can take a long time; no timeout specified here. Each pull is independent,
+    # so one failure doesn't stop its siblings.
+    with ThreadPoolExecutor(max_workers=parallelism) as pool:
+        pulls = {}
+        for model_name in models_to_pull:
+            log.info(f"Pulling Ollama model: {model_name}...")
+            pull = pool.submit(
+                run_command, ["ollama", "pull", model_name], dry_run=dry_run, check=True
+            )
+            pulls[pull] = model_name
+        for pull in as_completed(pulls):
+            model_name = pulls[pull]
+            if pull.result().success:
+                log.info(f"Pulled Ollama model: {model_name}")
+            else:
+                log.error(f"Failed to pull Ollama model: {model_name}")
+                all_models_pulled = False  # Continue trying other models
+                # Optionally, could make this a fatal error by returning False here
 
     if all_models_pulled:
         log.info("All specified Ollama models pulled successfully (or dry run).")
@@ -18,6 +18,7 @@ import shlex
 import subprocess
 
 # ── Standard library ────────────────────────────────────────────────────────
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 from nextlevelapex.core.logger import LoggerProxy
@@ -32,6 +33,9 @@ log = LoggerProxy(__name__)
 FIREWALL_UTIL = "/usr/libexec/ApplicationFirewall/socketfilterfw"
 PAM_SUDO_FILE = Path("/etc/pam.d/sudo")
 PAM_TID_LINE = "auth       sufficient     pam_tid.so"
+# Config flags of the subtasks that each shell out to sudo
+SUDO_SUBTASK_FLAGS = ("enable_firewall_stealth", "enable_touchid_sudo")
+SUDO_PREWARM_TIMEOUT = 60  # seconds for the user to answer the one password prompt
 
 
 # ── Helpers ────────────────────────────────────────────────────────────────
@@ -40,6 +44,16 @@ def _security_config(ctx: TaskContext) -> dict:
     return ctx["config"].get("security", {})
 
 
+def _prewarm_sudo() -> bool:
+    """Authenticate sudo once (`sudo -v`); False if cancelled, refused, or timed out."""
+    try:
+        prewarm = subprocess.run(["sudo", "-v"], check=False, timeout=SUDO_PREWARM_TIMEOUT)
+    except (OSError, subprocess.TimeoutExpired) as exc:
+        log.warning("sudo pre-authentication failed: %s", exc)
+        return False
+    return prewarm.returncode == 0
+
+
 def _run_sudo(cmd: list[str], dry_run: bool) -> subprocess.CompletedProcess[str]:
     """Wrapper that prints and executes sudo commands."""
     if dry_run:
@@ -61,9 +75,18 @@ def security_task(ctx: TaskContext) -> TaskResult:
     except (TypeError, KeyError):
         dry_run = getattr(ctx, "dry_run", False)
 
-    # Now pass both ctx and dry_run into each check
-    for fn in (_firewall_stealth, _enable_touchid_sudo):
-        sub = fn(ctx, dry_run)
+    # When both subtasks will sudo, authenticate once up front so their prompts can't
+    # interleave. If that fails, run them one after the other so each prompts on its own.
+    subtasks = (_firewall_stealth, _enable_touchid_sudo)
+    security = ctx.get("security", {})  # same lookup the subtasks use
+    both_sudo = not dry_run and all(security.get(flag, False) for flag in SUDO_SUBTASK_FLAGS)
+    parallel = not both_sudo or _prewarm_sudo()
+
+    # The subtasks are independent; run them side by side and merge in a stable order
+    with ThreadPoolExecutor(max_workers=2 if parallel else 1) as pool:
+        futures = [pool.submit(fn, ctx, dry_run) for fn in subtasks]
+    for future in futures:
+        sub = future.result()
         if not sub.success:
             result.success = False
         if sub.changed:
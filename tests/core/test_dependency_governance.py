@@ -22,6 +22,44 @@ def test_export_state_rejects_unknown_format_with_same_error():
     assert "ERROR: Unsupported export format. Allowed formats: json, csv." in result.output
 
 
+def test_export_state_json_pretty_and_compact(monkeypatch, tmp_path):
+    import json
+
+    state = {"task_status": {"A": {"status": "PASS"}}, "last_report_path": None}
+    monkeypatch.setattr("nextlevelapex.main2.REPORTS_DIR", tmp_path)
+    monkeypatch.setattr("nextlevelapex.main2.load_state", lambda _path: state)
+
+    pretty = runner.invoke(app, ["export-state"])
+    assert pretty.exit_code == 0, pretty.output
+    (pretty_path,) = tmp_path.glob("*.json")
+    assert json.loads(pretty_path.read_text()) == state
+    assert '\n  "task_status"' in pretty_path.read_text()
+    pretty_path.unlink()
+
+    compact = runner.invoke(app, ["export-state", "--compact"])
+    assert compact.exit_code == 0, compact.output
+    (compact_path,) = tmp_path.glob("*.json")
+    assert compact_path.read_text() == json.dumps(state, separators=(",", ":"))
+
+
+def test_export_state_csv_writes_header_and_value_row(monkeypatch, tmp_path):
+    import csv
+
+    state = {"version": "2.0", "completed_sections": ["A", "B"]}
+    monkeypatch.setattr("nextlevelapex.main2.REPORTS_DIR", tmp_path)
+    monkeypatch.setattr("nextlevelapex.main2.load_state", lambda _path: state)
+
+    result = runner.invoke(app, ["export-state", "--fmt", "csv"])
+    assert result.exit_code == 0, result.output
+    (csv_path,) = tmp_path.glob("*.csv")
+    assert "\r" not in csv_path.read_text()
+    with csv_path.open(newline="") as f:
+        assert list(csv.reader(f)) == [
+            ["completed_sections", "version"],
+            ["['A', 'B']", "2.0"],
+        ]
+
+
 def test_no_shell_true_in_source_code():
     """
     Scans all .py files in the nextlevelapex/ module to ensure nobody
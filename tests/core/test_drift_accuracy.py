@@ -2,8 +2,14 @@ import ast
 import tempfile
 import unittest
 from pathlib import Path
+from unittest.mock import patch
 
-from nextlevelapex.core.state import check_drift, compute_file_hashes
+from nextlevelapex.core.state import (
+    check_drift,
+    compute_file_hashes,
+    stat_files,
+    unchanged_file_hashes,
+)
 
 
 class TestDriftAccuracy(unittest.TestCase):
@@ -56,6 +62,55 @@ class TestDriftAccuracy(unittest.TestCase):
 
             self.assertTrue(check_drift(p1, p2))
 
+    def test_hashes_many_files_in_input_order(self):
+        """Pooled hashing keeps input order, skips missing files and matches single-file hashes."""
+        with tempfile.TemporaryDirectory() as td:
+            files = []
+            for i in range(12):
+                f = Path(td) / f"f{i}.txt"
+                f.write_text(f"content {i}")
+                files.append(f)
+            missing = Path(td) / "missing.txt"
+
+            hashes = compute_file_hashes([*files, missing])
+
+            self.assertEqual(list(hashes), [str(f) for f in files])
+            for f in files:
+                self.assertEqual(hashes[str(f)], compute_file_hashes([f])[str(f)])
+
+    def test_unchanged_stat_reuses_hash_without_reading(self):
+        """Files whose mtime/size match the previous snapshot are not re-read."""
+        with tempfile.TemporaryDirectory() as td:
+            f1 = Path(td) / "f1.txt"
+            f1.write_text("hello")
+            prev_hashes = compute_file_hashes([f1])
+            prev_stats = stat_files([f1])
+
+            known = unchanged_file_hashes(prev_hashes, prev_stats, stat_files([f1]))
+            with patch(
+                "nextlevelapex.core.state.compute_file_history_hash",
+                side_effect=AssertionError("unchanged file was re-read"),
+            ):
+                current = compute_file_hashes([f1], known_hashes=known)
+
+            self.assertEqual(current, prev_hashes)
+
+    def test_changed_stat_forces_rehash(self):
+        """A size change invalidates the cached hash and surfaces as drift."""
+        with tempfile.TemporaryDirectory() as td:
+            f1 = Path(td) / "f1.txt"
+            f1.write_text("hello")
+            prev_hashes = compute_file_hashes([f1])
+            prev_stats = stat_files([f1])
+
+            f1.write_text("hello, world")
+            current_stats = stat_files([f1])
+            known = unchanged_file_hashes(prev_hashes, prev_stats, current_stats)
+            current = compute_file_hashes([f1], known_hashes=known)
+
+            self.assertEqual(known, {})
+            self.assertTrue(check_drift(prev_hashes, current))
+
     def test_main_uses_compute_hashes_once(self):
         """Prove that main2.py calls compute_file_hashes on a single pass instead of double reading."""
         import nextlevelapex.main2 as main2
@@ -0,0 +1,49 @@
+import pytest
+
+import nextlevelapex.main2 as main2
+
+
+@pytest.mark.parametrize("bad", ["unbound\n", "un bound", "svc;rm", "../svc", ""])
+def test_restart_service_rejects_invalid_service_names(monkeypatch, bad):
+    monkeypatch.setattr(
+        "nextlevelapex.main2.subprocess.run",
+        lambda *a, **k: pytest.fail("subprocess must not run for invalid service names"),
+    )
+    action = {"action_type": "restart_service", "payload": bad, "requires_elevated": False}
+    assert main2.execute_remediation(action) is False
+
+
+def test_restart_service_dry_run_accepts_valid_name():
+    action = {"action_type": "restart_service", "payload": "ollama", "requires_elevated": False}
+    assert main2.execute_remediation(action, dry_run=True) is True
+
+
+def test_shell_cmd_rejects_payload_outside_allowlist(monkeypatch):
+    monkeypatch.setattr(
+        "nextlevelapex.main2.subprocess.run",
+        lambda *a, **k: pytest.fail("subprocess must not run for disallowed payloads"),
+    )
+    action = {"action_type": "shell_cmd", "payload": "rm -rf /", "requires_elevated": False}
+    assert main2.execute_remediation(action) is False
+
+
+def test_shell_cmd_runs_allowlisted_argv_with_sudo_prefix(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(tuple(cmd))
+        return main2.subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+
+    monkeypatch.setattr("nextlevelapex.main2.subprocess.run", fake_run)
+    action = {
+        "action_type": "shell_cmd",
+        "payload": "touch /tmp/nextlevelapex_dummy_heal.txt",
+        "requires_elevated": True,
+    }
+    assert main2.execute_remediation(action) is True
+    assert calls == [("sudo", "touch", "/tmp/nextlevelapex_dummy_heal.txt")]
+
+
+def test_unknown_action_type_is_rejected():
+    action = {"action_type": "reboot", "payload": "", "requires_elevated": False}
+    assert main2.execute_remediation(action) is False
@@ -1,11 +1,14 @@
+import os
 import subprocess
 from pathlib import Path
 
 import pytest
 from typer.testing import CliRunner
 
+import nextlevelapex.main2 as main2
+from nextlevelapex.core.dns_diagnose import parse_network_services
 from nextlevelapex.main2 import (
-    _parse_network_services,
+    _active_network_services,
     _read_sudoers_content_for_check,
     _render_sudoers_rule,
     _sudoers_escape_arg,
@@ -17,6 +20,19 @@ from nextlevelapex.main2 import (
 runner = CliRunner()
 
 
+@pytest.fixture(autouse=True)
+def _fresh_network_services_cache():
+    main2._list_network_services.cache_clear()
+    yield
+    main2._list_network_services.cache_clear()
+
+
+def _use_sudoers_file(monkeypatch, tmp_path: Path, content: str) -> None:
+    sudoers = tmp_path / "sudoers"
+    sudoers.write_text(content)
+    monkeypatch.setattr("nextlevelapex.main2.SUDOERS_PATH", sudoers)
+
+
 def test_install_sudoers_non_darwin_gate(monkeypatch):
     monkeypatch.setattr("nextlevelapex.main2.sys.platform", "linux")
     result = runner.invoke(app, ["install-sudoers", "--interface", "Wi-Fi"])
@@ -33,7 +49,7 @@ def test_parse_network_services_strips_and_keeps_spaces():
         "*Bluetooth PAN\n"
         "My Service Name\n"
     )
-    assert _parse_network_services(output) == ["Wi-Fi", "USB 10/100/1000 LAN", "My Service Name"]
+    assert parse_network_services(output) == ["Wi-Fi", "USB 10/100/1000 LAN", "My Service Name"]
 
 
 def test_validate_interface_allows_spaces():
@@ -76,6 +92,48 @@ def test_sudoers_rule_render_is_stable_and_single_line():
     assert rendered.count("\n") == 1
 
 
+def test_render_sudoers_rule_does_not_expand_braces_in_interface():
+    rendered = _render_sudoers_rule("alice", "{iface}")
+    assert rendered.startswith("alice ALL=(root) NOPASSWD: ")
+    assert rendered.count("-setdnsservers {iface} ") == 2
+    assert rendered.endswith("-setdnsservers {iface} Empty\n")
+
+
+def test_network_services_cached_until_preferences_change(monkeypatch, tmp_path):
+    prefs = tmp_path / "preferences.plist"
+    prefs.write_text("v1")
+    monkeypatch.setattr("nextlevelapex.main2.NETWORK_PREFERENCES_PATH", prefs)
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout="header\nWi-Fi\n", stderr="")
+
+    monkeypatch.setattr("nextlevelapex.main2.subprocess.run", fake_run)
+    assert _active_network_services() == ("Wi-Fi",)
+    assert _active_network_services() == ("Wi-Fi",)
+    assert len(calls) == 1
+
+    stat = prefs.stat()
+    os.utime(prefs, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert _active_network_services() == ("Wi-Fi",)
+    assert len(calls) == 2
+
+
+def test_network_services_uncached_without_preferences_file(monkeypatch, tmp_path):
+    monkeypatch.setattr("nextlevelapex.main2.NETWORK_PREFERENCES_PATH", tmp_path / "missing")
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout="header\nWi-Fi\n", stderr="")
+
+    monkeypatch.setattr("nextlevelapex.main2.subprocess.run", fake_run)
+    _active_network_services()
+    _active_network_services()
+    assert len(calls) == 2
+
+
 def test_sudoers_includedir_parser_handles_whitespace_and_comments():
     content = """
 Defaults        env_reset
@@ -90,9 +148,45 @@ def test_sudoers_includedir_parser_rejects_other_paths():
     assert _sudoers_includedir_present(content) is False
 
 
+def test_read_sudoers_content_reads_at_most_cap(monkeypatch, tmp_path):
+    monkeypatch.setattr("nextlevelapex.main2.SUDOERS_MAX_BYTES", 32)
+    _use_sudoers_file(monkeypatch, tmp_path, "#includedir /etc/sudoers.d\n" + "#" * 100)
+
+    content = _read_sudoers_content_for_check()
+    assert content == "#includedir /etc/sudoers.d\n"
+    assert _sudoers_includedir_present(content) is True
+
+
+def test_read_sudoers_content_drops_line_cut_by_cap(monkeypatch, tmp_path):
+    disabled = "#includedir /etc/sudoers.d.disabled\n"
+    monkeypatch.setattr("nextlevelapex.main2.SUDOERS_MAX_BYTES", len("# x\n") + 26)
+    _use_sudoers_file(monkeypatch, tmp_path, "# x\n" + disabled)
+
+    content = _read_sudoers_content_for_check()
+    assert content == "# x\n"
+    assert _sudoers_includedir_present(content) is False
+
+
+def test_read_sudoers_content_sudo_cat_drops_line_cut_by_cap(monkeypatch):
+    monkeypatch.setattr("nextlevelapex.main2.SUDOERS_MAX_BYTES", len("# x\n") + 26)
+    monkeypatch.setattr(
+        Path, "open", lambda self, *a, **k: (_ for _ in ()).throw(PermissionError())
+    )
+    monkeypatch.setattr(
+        "nextlevelapex.main2.subprocess.run",
+        lambda cmd, **kwargs: subprocess.CompletedProcess(
+            cmd, 0, stdout="# x\n#includedir /etc/sudoers.d.disabled\n", stderr=""
+        ),
+    )
+
+    content = _read_sudoers_content_for_check()
+    assert content == "# x\n"
+    assert _sudoers_includedir_present(content) is False
+
+
 def test_read_sudoers_content_permissionerror_falls_back_to_sudo_cat(monkeypatch):
     monkeypatch.setattr(
-        Path, "read_text", lambda self, *a, **k: (_ for _ in ()).throw(PermissionError())
+        Path, "open", lambda self, *a, **k: (_ for _ in ()).throw(PermissionError())
     )
 
     def fake_run(cmd, **kwargs):
@@ -107,7 +201,7 @@ def test_read_sudoers_content_permissionerror_falls_back_to_sudo_cat(monkeypatch
 
 def test_read_sudoers_content_permissionerror_denied_returns_none(monkeypatch):
     monkeypatch.setattr(
-        Path, "read_text", lambda self, *a, **k: (_ for _ in ()).throw(PermissionError())
+        Path, "open", lambda self, *a, **k: (_ for _ in ()).throw(PermissionError())
     )
 
     def fake_run(cmd, **kwargs):
@@ -126,7 +220,7 @@ def test_read_sudoers_content_permissionerror_denied_returns_none(monkeypatch):
 
 def test_read_sudoers_content_permissionerror_sudo_unavailable_returns_none(monkeypatch):
     monkeypatch.setattr(
-        Path, "read_text", lambda self, *a, **k: (_ for _ in ()).throw(PermissionError())
+        Path, "open", lambda self, *a, **k: (_ for _ in ()).throw(PermissionError())
     )
     monkeypatch.setattr(
         "nextlevelapex.main2.subprocess.run", lambda *a, **k: (_ for _ in ()).throw(OSError())
@@ -136,7 +230,7 @@ def test_read_sudoers_content_permissionerror_sudo_unavailable_returns_none(monk
 
 def test_read_sudoers_content_permissionerror_sudo_timeout_returns_none(monkeypatch):
     monkeypatch.setattr(
-        Path, "read_text", lambda self, *a, **k: (_ for _ in ()).throw(PermissionError())
+        Path, "open", lambda self, *a, **k: (_ for _ in ()).throw(PermissionError())
     )
 
     def fake_run(*a, **k):
@@ -146,7 +240,7 @@ def test_read_sudoers_content_permissionerror_sudo_timeout_returns_none(monkeypa
     assert _read_sudoers_content_for_check() is None
 
 
-def test_install_sudoers_happy_path_no_shell_and_reads_sudoers(monkeypatch):
+def test_install_sudoers_happy_path_no_shell_and_reads_sudoers(monkeypatch, tmp_path):
     monkeypatch.setattr("nextlevelapex.main2.sys.platform", "darwin")
     monkeypatch.setattr("getpass.getuser", lambda: "alice")
 
@@ -180,15 +274,9 @@ def test_install_sudoers_happy_path_no_shell_and_reads_sudoers(monkeypatch):
             return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
         raise AssertionError(f"Unexpected subprocess call: {cmd}")
 
-    original_read_text = Path.read_text
-
-    def fake_read_text(path_obj: Path, *args, **kwargs):
-        if str(path_obj) == "/etc/sudoers":
-            return "#includedir /private/etc/sudoers.d\n"
-        return original_read_text(path_obj, *args, **kwargs)
-
+    _use_sudoers_file(monkeypatch, tmp_path, "#includedir /private/etc/sudoers.d\n")
+    monkeypatch.setattr("nextlevelapex.main2.SUDOERS_DROPIN_PATH", tmp_path / "not-installed")
     monkeypatch.setattr("nextlevelapex.main2.subprocess.run", fake_run)
-    monkeypatch.setattr(Path, "read_text", fake_read_text)
 
     result = runner.invoke(app, ["install-sudoers", "--interface", "My Wi-Fi"])
     assert result.exit_code == 0
@@ -201,7 +289,65 @@ def test_install_sudoers_happy_path_no_shell_and_reads_sudoers(monkeypatch):
     assert any(call[0][:2] == ["sudo", "install"] for call in calls)
 
 
-def test_install_sudoers_fails_when_sudoers_include_missing(monkeypatch):
+class _FakeDropin:
+    def __init__(self, content: str, uid: int, mode: int):
+        self.content = content
+        self.uid = uid
+        self.mode = mode
+
+    def stat(self):
+        return os.stat_result((0o100000 | self.mode, 0, 0, 1, self.uid, 0, 0, 0, 0, 0))
+
+    def read_text(self):
+        return self.content
+
+    def __str__(self):
+        return "/etc/sudoers.d/nextlevelapex"
+
+
+def _run_install_sudoers_against(monkeypatch, tmp_path, dropin):
+    monkeypatch.setattr("nextlevelapex.main2.sys.platform", "darwin")
+    monkeypatch.setattr("getpass.getuser", lambda: "alice")
+    _use_sudoers_file(monkeypatch, tmp_path, "#includedir /private/etc/sudoers.d\n")
+    monkeypatch.setattr("nextlevelapex.main2.SUDOERS_DROPIN_PATH", dropin)
+    calls: list[list[str]] = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        if cmd == ["networksetup", "-listallnetworkservices"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout="header\nWi-Fi\n", stderr="")
+        if cmd[:3] == ["visudo", "-c", "-f"] or cmd[:2] == ["sudo", "install"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout="", stderr="")
+        raise AssertionError(f"Unexpected subprocess call: {cmd}")
+
+    monkeypatch.setattr("nextlevelapex.main2.subprocess.run", fake_run)
+    return runner.invoke(app, ["install-sudoers", "--interface", "Wi-Fi"]), calls
+
+
+def test_install_sudoers_skips_install_when_dropin_already_matches(monkeypatch, tmp_path):
+    dropin = _FakeDropin(_render_sudoers_rule("alice", "Wi-Fi"), uid=0, mode=0o440)
+
+    result, calls = _run_install_sudoers_against(monkeypatch, tmp_path, dropin)
+
+    assert result.exit_code == 0, result.output
+    assert "already up to date" in result.output
+    assert calls == [["networksetup", "-listallnetworkservices"]]
+
+
+@pytest.mark.parametrize(("uid", "mode"), [(501, 0o440), (0, 0o644), (0, 0o460)])
+def test_install_sudoers_reinstalls_matching_dropin_with_unsafe_owner_or_mode(
+    monkeypatch, tmp_path, uid, mode
+):
+    dropin = _FakeDropin(_render_sudoers_rule("alice", "Wi-Fi"), uid=uid, mode=mode)
+
+    result, calls = _run_install_sudoers_against(monkeypatch, tmp_path, dropin)
+
+    assert result.exit_code == 0, result.output
+    assert "already up to date" not in result.output
+    assert any(cmd[:2] == ["sudo", "install"] for cmd in calls)
+
+
+def test_install_sudoers_fails_when_sudoers_include_missing(monkeypatch, tmp_path):
     monkeypatch.setattr("nextlevelapex.main2.sys.platform", "darwin")
     monkeypatch.setattr("getpass.getuser", lambda: "alice")
 
@@ -220,7 +366,7 @@ def test_install_sudoers_fails_when_sudoers_include_missing(monkeypatch):
         raise AssertionError(f"Unexpected subprocess call: {cmd}")
 
     monkeypatch.setattr("nextlevelapex.main2.subprocess.run", fake_run)
-    monkeypatch.setattr(Path, "read_text", lambda self, *a, **k: "# no includedir here\n")
+    _use_sudoers_file(monkeypatch, tmp_path, "# no includedir here\n")
 
     result = runner.invoke(app, ["install-sudoers", "--interface", "Wi-Fi"])
     assert result.exit_code == 1
@@ -247,7 +393,7 @@ def test_install_sudoers_permissionerror_and_sudo_denied_exits_cleanly(monkeypat
 
     monkeypatch.setattr("nextlevelapex.main2.subprocess.run", fake_run)
     monkeypatch.setattr(
-        Path, "read_text", lambda self, *a, **k: (_ for _ in ()).throw(PermissionError())
+        Path, "open", lambda self, *a, **k: (_ for _ in ()).throw(PermissionError())
     )
 
     result = runner.invoke(app, ["install-sudoers", "--interface", "Wi-Fi"])
@@ -0,0 +1,18 @@
+import logging
+
+from nextlevelapex.core.logger import LoggerProxy
+
+
+def test_logger_proxy_caches_bound_methods_but_not_state():
+    proxy = LoggerProxy("nextlevelapex.tests.proxy")
+    logger = logging.getLogger("nextlevelapex.tests.proxy")
+
+    assert proxy.info == logger.info
+    assert "info" in vars(proxy)  # later calls bypass __getattr__
+
+    logger.setLevel(logging.WARNING)
+    assert proxy.level == logging.WARNING
+    logger.setLevel(logging.DEBUG)
+    assert proxy.level == logging.DEBUG
+    assert "level" not in vars(proxy)
+    logger.setLevel(logging.NOTSET)
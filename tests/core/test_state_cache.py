@@ -0,0 +1,51 @@
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from nextlevelapex.core.state import invalidate_state_cache, load_state, save_state
+
+
+class TestStateCache(unittest.TestCase):
+    def setUp(self):
+        invalidate_state_cache()
+
+    def test_repeated_loads_parse_once_and_return_independent_copies(self):
+        """Unchanged state files are parsed once; callers never share mutable containers."""
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "state.json"
+            self.assertTrue(save_state(load_state(path), path))
+
+            with patch.object(
+                Path, "read_bytes", autospec=True, side_effect=Path.read_bytes
+            ) as spy:
+                first = load_state(path)
+                first["task_status"]["Mutated"] = {"status": "FAIL"}
+                second = load_state(path)
+
+            self.assertEqual(spy.call_count, 1)
+            self.assertNotIn("Mutated", second["task_status"])
+
+    def test_save_state_is_visible_to_next_load(self):
+        """Writing state drops the cached copy so the new content is read back."""
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "state.json"
+            data = load_state(path)
+            self.assertTrue(save_state(data, path))
+            self.assertEqual(load_state(path)["last_run_status"], "UNKNOWN")
+
+            data["last_run_status"] = "SUCCESS"
+            self.assertTrue(save_state(data, path))
+
+            self.assertEqual(load_state(path)["last_run_status"], "SUCCESS")
+
+    def test_corrupt_or_poisoned_state_falls_back_to_defaults(self):
+        """Invalid JSON and schema violations both load as the default state."""
+        with tempfile.TemporaryDirectory() as td:
+            path = Path(td) / "state.json"
+            for payload in ("{not json", '{"task_status": {"T": {"status": 5}}}', "[]"):
+                path.write_text(payload)
+                invalidate_state_cache()
+                loaded = load_state(path)
+                self.assertEqual(loaded["task_status"], {})
+                self.assertEqual(loaded["version"], "2.0")
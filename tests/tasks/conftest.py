@@ -0,0 +1,14 @@
+import pytest
+
+import nextlevelapex.tasks.dns_stack_runtime as runtime
+
+
+@pytest.fixture(autouse=True)
+def isolated_jinja_bytecode_cache(monkeypatch, tmp_path):
+    """Keep rendered LaunchAgent bytecode out of the developer's real ~/.cache."""
+    monkeypatch.setattr(runtime, "JINJA_BYTECODE_CACHE_DIR", tmp_path / "jinja-cache")
+    runtime._launch_agent_environment.cache_clear()
+    runtime._compiled_launch_agent_template.cache_clear()
+    yield
+    runtime._launch_agent_environment.cache_clear()
+    runtime._compiled_launch_agent_template.cache_clear()
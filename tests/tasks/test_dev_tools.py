@@ -1,7 +1,7 @@
 import pytest
 
 from nextlevelapex.core.task import Severity, TaskResult
-from nextlevelapex.tasks.dev_tools import setup_colima_task
+from nextlevelapex.tasks.dev_tools import _check_colima_running, setup_colima_task
 
 
 class DummyCtx(dict):
@@ -115,3 +115,54 @@ def test_colima_task_fails_if_status_check_fails(monkeypatch):
     assert result.success is False
     assert result.changed is False
     assert any("Failed to set up Colima VM" in msg for _, msg in result.messages)
+
+
+def test_colima_already_running_checks_status_once(monkeypatch):
+    call_log = []
+
+    def mock_run_command(cmd, **kwargs):
+        call_log.append(cmd)
+        return type(
+            "MockResult",
+            (),
+            {"success": True, "returncode": 0, "stdout": "colima is running", "stderr": ""},
+        )()
+
+    monkeypatch.setattr("nextlevelapex.tasks.dev_tools.run_command", mock_run_command)
+
+    result: TaskResult = setup_colima_task(DummyCtx(dry_run=False))
+
+    assert result.success is True
+    assert call_log == [["colima", "status"]]
+
+
+def test_check_colima_running_matches_indicators_case_insensitively():
+    status = type(
+        "MockResult",
+        (),
+        {"stdout": "INFO[0000] Socket: unix:///x\nINFO[0000] Colima is running", "stderr": ""},
+    )()
+
+    result = _check_colima_running(status)
+
+    assert result.success is True
+    assert result.matched_indicators == ["colima is running", "socket:"]
+
+
+def test_colima_status_retried_with_backoff_after_successful_start(monkeypatch):
+    outputs = iter(["stopped", "stopped", "starting", "colima is running"])
+    sleeps = []
+
+    def mock_run_command(cmd, **kwargs):
+        stdout = "" if cmd[:2] == ["colima", "start"] else next(outputs)
+        return type(
+            "MockResult", (), {"success": True, "returncode": 0, "stdout": stdout, "stderr": ""}
+        )()
+
+    monkeypatch.setattr("nextlevelapex.tasks.dev_tools.run_command", mock_run_command)
+    monkeypatch.setattr("nextlevelapex.tasks.dev_tools.time.sleep", sleeps.append)
+
+    result: TaskResult = setup_colima_task(DummyCtx(dry_run=False))
+
+    assert result.success is True
+    assert sleeps == [0.3, 0.6]
@@ -1,4 +1,5 @@
 import json
+import threading
 
 import pytest
 
@@ -166,3 +167,193 @@ def test_dns_sanity_conflicts(monkeypatch):
     res = dns.dns_sanity_check()
     assert res.success is False
     assert any(m[0] == Severity.ERROR and "port 53" in m[1] for m in res.messages)
+
+
+def test_run_all_dns_checks_runs_concurrently_in_order(monkeypatch):
+    # Each stub blocks until all three are in flight, so a serial run would time out.
+    barrier = threading.Barrier(3, timeout=5)
+
+    def make_check(name):
+        def _check(*preloaded):
+            barrier.wait()
+            return dns.TaskResult(name=name, success=True, changed=False, messages=[])
+
+        return _check
+
+    # The per-run checks skip the public wrappers' cache reset; stub what actually runs
+    for attr in ("dns_sanity_check", "_cloudflared_status", "_pihole_status"):
+        monkeypatch.setattr(dns, attr, make_check(attr))
+    monkeypatch.setattr(dns, "_preload_helper_containers", lambda: None)
+
+    results = dns.run_all_dns_checks()
+
+    assert [r.name for r in results] == [
+        "dns_sanity_check",
+        "_cloudflared_status",
+        "_pihole_status",
+    ]
+
+
+def test_container_check_inspects_once(monkeypatch, unhealthy_inspect_json):
+    stub_engine(monkeypatch, "docker")
+    calls = []
+    fake_run = fake_run_factory(
+        {
+            "docker context show": (0, "colima", ""),
+            "docker inspect cloudflared": (0, unhealthy_inspect_json, ""),
+        }
+    )
+
+    def _counting_run(cmd, timeout=5):
+        calls.append(" ".join(cmd))
+        return fake_run(cmd, timeout)
+
+    monkeypatch.setattr(dns, "_run", _counting_run)
+    res = dns.cloudflared_status_check()
+
+    assert any("Unhealthy last probe" in m[1] for m in res.messages)
+    assert calls.count("docker inspect cloudflared") == 1
+
+
+def test_cmd_exists_scans_path_once(monkeypatch):
+    lookups = []
+    monkeypatch.setattr(dns.shutil, "which", lambda name: lookups.append(name) or f"/bin/{name}")
+    dns._cmd_exists.cache_clear()
+
+    assert dns._cmd_exists("docker") is True
+    assert dns._cmd_exists("docker") is True
+    assert lookups == ["docker"]
+    dns._cmd_exists.cache_clear()
+
+
+def test_engine_name_cached_until_next_run(monkeypatch):
+    monkeypatch.setattr(dns, "_cmd_exists", lambda n: n == "docker")
+    calls = []
+    monkeypatch.setattr(dns, "_run", lambda cmd, timeout=5: calls.append(cmd) or (0, "ok", ""))
+    dns._engine_name.cache_clear()
+
+    assert dns._engine_name() == "docker"
+    assert dns._engine_name() == "docker"
+    assert calls == [["docker", "info"]]
+    dns._engine_name.cache_clear()
+
+
+def test_standalone_checks_reprobe_engine_after_negative_result(monkeypatch):
+    installed: set[str] = set()
+    monkeypatch.setattr(
+        dns.shutil, "which", lambda name: f"/bin/{name}" if name in installed else None
+    )
+    monkeypatch.setattr(dns, "_run", lambda cmd, timeout=5: (1, "", ""))
+
+    assert dns.is_container_running("pihole") is False
+    assert dns._engine_name() is None
+
+    installed.add("docker")  # Docker comes up later in the same process
+    engines = []
+    monkeypatch.setattr(dns, "_is_running", lambda eng, name: engines.append(eng) or True)
+    monkeypatch.setattr(dns, "_run", lambda cmd, timeout=5: (0, "ok", ""))
+
+    assert dns.is_container_running("pihole") is True
+    assert engines == ["docker"]
+    dns._reset_probe_caches()
+
+
+def test_host_scans_keep_only_matching_lines(monkeypatch):
+    monkeypatch.setattr(dns.platform, "system", lambda: "Linux")
+    ps_out = "\n".join(
+        [
+            "USER PID COMMAND",
+            "root 10 /usr/sbin/unbound -d",
+            "root 11 /usr/sbin/mDNSResponder pihole-compat",
+            "me   12 vim notes.txt",
+            "me   13 cloudflared proxy-dns",
+        ]
+    )
+    ss_out = "Netid State Local\nudp UNCONN 127.0.0.1:53\ntcp LISTEN 0.0.0.0:22"
+    mapping = {"ps aux": (0, ps_out, ""), "ss -tunlp": (0, ss_out, "")}
+    monkeypatch.setattr(dns, "_run", fake_run_factory(mapping))
+
+    assert dns._host_dns_process_lines() == [
+        "root 10 /usr/sbin/unbound -d",
+        "me   13 cloudflared proxy-dns",
+    ]
+    assert dns._host_port_53_binders() == ["udp UNCONN 127.0.0.1:53"]
+
+
+@pytest.mark.parametrize("payload", ["not json", '{"Id": "abc"}', ""])
+def test_engine_inspect_rejects_unusable_output(monkeypatch, payload):
+    monkeypatch.setattr(dns, "_run", lambda cmd, timeout=5: (0, payload, ""))
+    assert dns._engine_inspect("docker", ["pihole"]) == []
+
+
+def test_run_all_dns_checks_batches_container_inspect(monkeypatch, healthy_inspect_json):
+    monkeypatch.setattr(dns.shutil, "which", lambda n: "/usr/bin/docker" if n == "docker" else None)
+    monkeypatch.setattr(dns, "dns_sanity_check", lambda: "sanity")
+    both = json.loads(healthy_inspect_json) * 2
+    both[0] = {**both[0], "Name": "/cloudflared"}
+    both[1] = {**both[1], "Name": "/pihole"}
+    calls = []
+    fake_run = fake_run_factory(
+        {
+            "docker info": (0, "ok", ""),
+            "docker context show": (0, "colima", ""),
+            "docker inspect cloudflared pihole": (0, json.dumps(both), ""),
+        }
+    )
+    monkeypatch.setattr(dns, "_run", lambda cmd, timeout=5: calls.append(cmd) or fake_run(cmd))
+
+    sanity, cloudflared, pihole = dns.run_all_dns_checks()
+
+    assert sanity == "sanity"
+    assert cloudflared.success is True
+    assert pihole.success is True
+    assert [cmd for cmd in calls if cmd[1] == "inspect"] == [
+        ["docker", "inspect", "cloudflared", "pihole"]
+    ]
+    dns._cmd_exists.cache_clear()
+    dns._engine_name.cache_clear()
+
+
+def test_container_check_falls_back_when_batch_misses(monkeypatch, healthy_inspect_json):
+    stub_engine(monkeypatch, "docker")
+    mapping = {
+        "docker context show": (0, "colima", ""),
+        "docker inspect pihole": (0, healthy_inspect_json, ""),
+    }
+    monkeypatch.setattr(dns, "_run", fake_run_factory(mapping))
+
+    res = dns.pihole_status_check(preloaded={})
+
+    assert res.success is True
+
+
+def test_dns_sanity_reads_scutil_resolvers_on_macos(monkeypatch):
+    monkeypatch.setattr(dns.platform, "system", lambda: "Darwin")
+    scutil = "\n".join(
+        [
+            "DNS configuration",
+            "",
+            "resolver #1",
+            "  search domain[0] : lan",
+            "  nameserver[0] : 192.168.64.2",
+            "  nameserver[1] : 192.168.64.3",
+            "",
+            "resolver #2",
+            "  domain   : local",
+            "  nameserver[0] : 10.0.0.1",
+        ]
+    )
+    mapping = {
+        "ps aux": (0, "", ""),
+        "lsof -nP -i :53": (0, "", ""),
+        "scutil --dns": (0, scutil, ""),
+    }
+    monkeypatch.setattr(dns, "_run", fake_run_factory(mapping))
+
+    res = dns.dns_sanity_check()
+
+    assert res.success is True
+    assert (
+        Severity.INFO,
+        "scutil --dns → nameservers=['192.168.64.2', '192.168.64.3'] search=lan",
+    ) in res.messages
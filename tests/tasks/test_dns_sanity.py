@@ -1,10 +1,18 @@
 from __future__ import annotations
 
+import socket
+import subprocess
+import threading
+
 import pytest
 
 import nextlevelapex.tasks.dns_sanity as dns_sanity
 from nextlevelapex.core.task import Severity
 
+# The autouse fixture stubs this out for the task-level tests; keep the real one for unit tests.
+_real_listener_healthy = dns_sanity._host_cloudflared_listener_healthy
+_real_configured_dns_resolvers = dns_sanity._get_configured_dns_resolvers
+
 
 def _msg_contains(result, severity: Severity, needle: str) -> bool:
     return any(level == severity and needle in text for level, text in result.messages)
@@ -14,7 +22,9 @@ def _msg_contains(result, severity: Severity, needle: str) -> bool:
 def _default_inputs(monkeypatch):
     monkeypatch.setattr(dns_sanity, "_host_cloudflared_listener_healthy", lambda: True)
     monkeypatch.setattr(dns_sanity, "_get_pihole_upstreams", lambda: {"host.docker.internal#5053"})
-    monkeypatch.setattr(dns_sanity, "_get_configured_dns_resolvers", lambda: {"192.168.64.2"})
+    monkeypatch.setattr(
+        dns_sanity, "_get_configured_dns_resolvers", lambda pool=None: {"192.168.64.2"}
+    )
     monkeypatch.setattr(
         dns_sanity,
         "audit_noncanonical_dns_artifacts",
@@ -48,7 +58,7 @@ def test_dns_sanity_colima_active_pihole_no_host_conflict(monkeypatch):
 
     monkeypatch.setattr(dns_sanity, "_docker_ps_names", fake_ps_names)
     monkeypatch.setattr(
-        dns_sanity, "_container_running", lambda name, context=None: name == "pihole"
+        dns_sanity, "_running_containers", lambda names, context=None: {"pihole"} & set(names)
     )
 
     result = dns_sanity.dns_sanity_check({})
@@ -71,8 +81,8 @@ def test_dns_sanity_flags_legacy_container_conflict(monkeypatch):
     monkeypatch.setattr(dns_sanity, "_docker_ps_names", fake_ps_names)
     monkeypatch.setattr(
         dns_sanity,
-        "_container_running",
-        lambda name, context=None: name in {"pihole", "cloudflared"},
+        "_running_containers",
+        lambda names, context=None: {"pihole", "cloudflared"} & set(names),
     )
 
     result = dns_sanity.dns_sanity_check({})
@@ -93,7 +103,7 @@ def test_dns_sanity_accepts_host_cloudflared_listener(monkeypatch):
 
     monkeypatch.setattr(dns_sanity, "_docker_ps_names", fake_ps_names)
     monkeypatch.setattr(
-        dns_sanity, "_container_running", lambda name, context=None: name == "pihole"
+        dns_sanity, "_running_containers", lambda names, context=None: {"pihole"} & set(names)
     )
 
     result = dns_sanity.dns_sanity_check({})
@@ -106,7 +116,7 @@ def test_dns_sanity_fails_on_plaintext_pihole_upstreams(monkeypatch):
     monkeypatch.setattr(dns_sanity, "_get_docker_context", lambda: "colima")
     monkeypatch.setattr(dns_sanity, "_docker_ps_names", lambda context=None: ({"pihole"}, True))
     monkeypatch.setattr(
-        dns_sanity, "_container_running", lambda name, context=None: name == "pihole"
+        dns_sanity, "_running_containers", lambda names, context=None: {"pihole"} & set(names)
     )
     monkeypatch.setattr(
         dns_sanity,
@@ -121,11 +131,21 @@ def test_dns_sanity_fails_on_plaintext_pihole_upstreams(monkeypatch):
     assert _msg_contains(result, Severity.ERROR, "8.8.8.8")
 
 
+def test_find_plaintext_upstreams_matches_port_53_forms_only():
+    upstreams = {"8.8.8.8", "1.1.1.1#53", "9.9.9.9:53", "8.8.4.4#5353", "host.docker.internal#5053"}
+
+    assert dns_sanity._find_plaintext_upstreams(upstreams) == {
+        "8.8.8.8",
+        "1.1.1.1#53",
+        "9.9.9.9:53",
+    }
+
+
 def test_dns_sanity_fails_when_upstream_drifted_from_host_doh(monkeypatch):
     monkeypatch.setattr(dns_sanity, "_get_docker_context", lambda: "colima")
     monkeypatch.setattr(dns_sanity, "_docker_ps_names", lambda context=None: ({"pihole"}, True))
     monkeypatch.setattr(
-        dns_sanity, "_container_running", lambda name, context=None: name == "pihole"
+        dns_sanity, "_running_containers", lambda names, context=None: {"pihole"} & set(names)
     )
     monkeypatch.setattr(dns_sanity, "_get_pihole_upstreams", lambda: {"172.19.0.2#5053"})
 
@@ -139,7 +159,7 @@ def test_dns_sanity_fails_when_doh_listener_is_unhealthy(monkeypatch):
     monkeypatch.setattr(dns_sanity, "_get_docker_context", lambda: "colima")
     monkeypatch.setattr(dns_sanity, "_docker_ps_names", lambda context=None: ({"pihole"}, True))
     monkeypatch.setattr(
-        dns_sanity, "_container_running", lambda name, context=None: name == "pihole"
+        dns_sanity, "_running_containers", lambda names, context=None: {"pihole"} & set(names)
     )
     monkeypatch.setattr(dns_sanity, "_host_cloudflared_listener_healthy", lambda: False)
 
@@ -153,9 +173,11 @@ def test_dns_sanity_fails_when_expected_resolver_is_missing(monkeypatch):
     monkeypatch.setattr(dns_sanity, "_get_docker_context", lambda: "colima")
     monkeypatch.setattr(dns_sanity, "_docker_ps_names", lambda context=None: ({"pihole"}, True))
     monkeypatch.setattr(
-        dns_sanity, "_container_running", lambda name, context=None: name == "pihole"
+        dns_sanity, "_running_containers", lambda names, context=None: {"pihole"} & set(names)
+    )
+    monkeypatch.setattr(
+        dns_sanity, "_get_configured_dns_resolvers", lambda pool=None: {"172.17.0.1"}
     )
-    monkeypatch.setattr(dns_sanity, "_get_configured_dns_resolvers", lambda: {"172.17.0.1"})
 
     result = dns_sanity.dns_sanity_check({})
 
@@ -167,7 +189,7 @@ def test_dns_sanity_fails_when_noncanonical_artifacts_exist(monkeypatch):
     monkeypatch.setattr(dns_sanity, "_get_docker_context", lambda: "colima")
     monkeypatch.setattr(dns_sanity, "_docker_ps_names", lambda context=None: ({"pihole"}, True))
     monkeypatch.setattr(
-        dns_sanity, "_container_running", lambda name, context=None: name == "pihole"
+        dns_sanity, "_running_containers", lambda names, context=None: {"pihole"} & set(names)
     )
     monkeypatch.setattr(
         dns_sanity,
@@ -193,7 +215,7 @@ def test_dns_sanity_fails_when_browser_dns_override_detected(monkeypatch):
     monkeypatch.setattr(dns_sanity, "_get_docker_context", lambda: "colima")
     monkeypatch.setattr(dns_sanity, "_docker_ps_names", lambda context=None: ({"pihole"}, True))
     monkeypatch.setattr(
-        dns_sanity, "_container_running", lambda name, context=None: name == "pihole"
+        dns_sanity, "_running_containers", lambda names, context=None: {"pihole"} & set(names)
     )
     monkeypatch.setattr(
         dns_sanity,
@@ -217,3 +239,254 @@ def test_dns_sanity_fails_when_browser_dns_override_detected(monkeypatch):
 
     assert result.success is False
     assert _msg_contains(result, Severity.ERROR, "Browser/app DNS posture drift")
+
+
+def _one_shot_dns_server(rcode: int) -> tuple[socket.socket, threading.Thread]:
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+
+    def respond() -> None:
+        query, addr = server.recvfrom(512)
+        flags = bytes([0x81, 0x80 | rcode])  # QR+RD, RA + rcode
+        server.sendto(query[:2] + flags + query[4:], addr)
+
+    thread = threading.Thread(target=respond, daemon=True)
+    thread.start()
+    return server, thread
+
+
+@pytest.mark.parametrize(("rcode", "expected"), [(0, True), (3, False)])
+def test_listener_check_reads_rcode_from_shared_udp_query(monkeypatch, rcode, expected):
+    server, thread = _one_shot_dns_server(rcode)
+    with server:
+        monkeypatch.setattr(dns_sanity, "CLOUDFLARED_PORT", server.getsockname()[1])
+        assert _real_listener_healthy() is expected
+        thread.join(timeout=2)
+
+
+def test_listener_check_treats_silence_as_unhealthy(monkeypatch):
+    calls = []
+
+    def silent_query(host, port, qname, *, dnssec=False, timeout=5.0):
+        calls.append((host, port, qname, timeout))
+        return None
+
+    monkeypatch.setattr(dns_sanity, "udp_dns_query", silent_query)
+
+    assert _real_listener_healthy() is False
+    assert calls == [(dns_sanity.LOCALHOST, dns_sanity.CLOUDFLARED_PORT, "example.com", 2.0)]
+
+
+def test_listener_check_reports_closed_port_without_dig(monkeypatch):
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as probe:
+        probe.bind(("127.0.0.1", 0))
+        closed_port = probe.getsockname()[1]
+
+    def no_dig(*args, **kwargs):
+        raise AssertionError("dig should not run when the listener refuses the query")
+
+    monkeypatch.setattr(dns_sanity, "CLOUDFLARED_PORT", closed_port)
+    monkeypatch.setattr(dns_sanity.subprocess, "run", no_dig)
+
+    assert _real_listener_healthy() is False
+
+
+def test_configured_resolvers_skip_subprocesses_off_macos(monkeypatch):
+    def no_run(*args, **kwargs):
+        raise AssertionError("networksetup/scutil should not run off macOS")
+
+    monkeypatch.setattr(dns_sanity.sys, "platform", "linux")
+    monkeypatch.setattr(dns_sanity.subprocess, "run", no_run)
+
+    assert _real_configured_dns_resolvers() is None
+
+
+def test_configured_resolvers_cover_every_enabled_service(monkeypatch):
+    calls = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append((cmd, kwargs["timeout"]))
+        if cmd[:2] == ["networksetup", "-listallnetworkservices"]:
+            stdout = (
+                "An asterisk (*) denotes that a network service is disabled.\n"
+                "Wi-Fi\nUSB 10/100/1000 LAN\n*Thunderbolt Bridge\n"
+            )
+        elif cmd == ["networksetup", "-getdnsservers", "Wi-Fi"]:
+            stdout = "There aren't any DNS Servers set on Wi-Fi.\n"
+        elif cmd[:2] == ["networksetup", "-getdnsservers"]:
+            stdout = "192.168.64.2\n"
+        else:
+            stdout = "resolver #1\n  nameserver[0] : 192.168.64.2\n"
+        return subprocess.CompletedProcess(cmd, 0, stdout=stdout, stderr="")
+
+    monkeypatch.setattr(dns_sanity.sys, "platform", "darwin")
+    monkeypatch.setattr(dns_sanity.subprocess, "run", fake_run)
+
+    assert _real_configured_dns_resolvers() == {"192.168.64.2"}
+    budget = dns_sanity.SUBPROCESS_TIMEOUTS["networksetup_dns"]
+    assert (["networksetup", "-getdnsservers", "Wi-Fi"], budget) in calls
+    assert (["networksetup", "-getdnsservers", "USB 10/100/1000 LAN"], budget) in calls
+    assert all(cmd[0] != "sh" for cmd, _ in calls)
+    assert len(calls) == 4
+
+
+def test_configured_resolvers_keep_answers_when_one_service_times_out(monkeypatch):
+    def fake_run(cmd, **kwargs):
+        if cmd[:2] == ["networksetup", "-listallnetworkservices"]:
+            return subprocess.CompletedProcess(cmd, 0, stdout="legend\nVPN\nWi-Fi\n", stderr="")
+        if cmd == ["networksetup", "-getdnsservers", "VPN"]:
+            raise subprocess.TimeoutExpired(cmd, kwargs["timeout"])
+        return subprocess.CompletedProcess(cmd, 0, stdout="192.168.64.2\n", stderr="")
+
+    monkeypatch.setattr(dns_sanity.sys, "platform", "darwin")
+    monkeypatch.setattr(dns_sanity.subprocess, "run", fake_run)
+    monkeypatch.setattr(dns_sanity.log, "warning", lambda *args: None)
+
+    assert _real_configured_dns_resolvers() == {"192.168.64.2"}
+
+
+@pytest.mark.parametrize(
+    "failure", [subprocess.TimeoutExpired(["networksetup"], 1.5), FileNotFoundError()]
+)
+def test_network_services_fall_back_to_wifi_when_listing_fails(monkeypatch, failure):
+    def failing_run(cmd, **kwargs):
+        raise failure
+
+    monkeypatch.setattr(dns_sanity.subprocess, "run", failing_run)
+    monkeypatch.setattr(dns_sanity.log, "warning", lambda *args: None)
+
+    assert dns_sanity._network_services() == ["Wi-Fi"]
+
+
+def test_docker_context_read_from_cli_config(monkeypatch, tmp_path):
+    for var in ("DOCKER_CONTEXT", "DOCKER_HOST", "NLX_DOCKER_CONTEXT_VIA_CLI"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path))
+    monkeypatch.setattr(
+        dns_sanity.subprocess, "run", lambda *a, **k: pytest.fail("docker CLI was invoked")
+    )
+
+    assert dns_sanity._get_docker_context() == "default"
+    (tmp_path / "config.json").write_text('{"currentContext": "colima"}')
+    assert dns_sanity._get_docker_context() == "colima"
+    monkeypatch.setenv("DOCKER_CONTEXT", "remote")
+    assert dns_sanity._get_docker_context() == "remote"
+
+
+def test_docker_context_falls_back_to_cli_on_unreadable_config(monkeypatch, tmp_path):
+    for var in ("DOCKER_CONTEXT", "DOCKER_HOST", "NLX_DOCKER_CONTEXT_VIA_CLI"):
+        monkeypatch.delenv(var, raising=False)
+    monkeypatch.setenv("DOCKER_CONFIG", str(tmp_path))
+    (tmp_path / "config.json").write_text("{broken")
+    monkeypatch.setattr(
+        dns_sanity.subprocess,
+        "run",
+        lambda cmd, **k: subprocess.CompletedProcess(cmd, 0, stdout="colima\n", stderr=""),
+    )
+
+    assert dns_sanity._get_docker_context() == "colima"
+
+
+def test_dns_sanity_probes_run_concurrently(monkeypatch):
+    # Both probes block until the other has started; run serially they would time out.
+    barrier = threading.Barrier(2, timeout=5)
+    monkeypatch.setattr(dns_sanity, "_get_docker_context", lambda: "colima")
+    monkeypatch.setattr(dns_sanity, "_docker_ps_names", lambda context=None: ({"pihole"}, True))
+    monkeypatch.setattr(
+        dns_sanity, "_host_cloudflared_listener_healthy", lambda: barrier.wait() is not None
+    )
+    monkeypatch.setattr(
+        dns_sanity,
+        "_get_configured_dns_resolvers",
+        lambda pool=None: barrier.wait() is not None and {"192.168.64.2"},
+    )
+
+    result = dns_sanity.dns_sanity_check({})
+
+    assert result.success is True
+
+
+def test_dns_sanity_inspects_only_when_listing_fails(monkeypatch):
+    inspected = []
+    monkeypatch.setattr(dns_sanity, "_get_docker_context", lambda: "colima")
+
+    def fake_ps_names(context=None):
+        return ({"pihole"}, True) if context is None else (set(), False)
+
+    monkeypatch.setattr(dns_sanity, "_docker_ps_names", fake_ps_names)
+    monkeypatch.setattr(
+        dns_sanity,
+        "_running_containers",
+        lambda names, context=None: inspected.append((names, context)) or set(),
+    )
+
+    result = dns_sanity.dns_sanity_check({})
+
+    assert result.success is True
+    assert inspected == [(dns_sanity.SANITY_CONTAINERS, "default")]
+
+
+def test_running_containers_batches_one_inspect(monkeypatch):
+    seen = []
+
+    def fake_run(cmd, **kwargs):
+        seen.append(cmd)
+        # `docker inspect` exits 1 when any name is missing but still prints the found ones
+        return subprocess.CompletedProcess(
+            cmd, 1, stdout="/pihole true\n/cloudflared false\n", stderr="No such object: unbound"
+        )
+
+    monkeypatch.setattr(dns_sanity.subprocess, "run", fake_run)
+
+    assert dns_sanity._running_containers(dns_sanity.SANITY_CONTAINERS, "default") == {"pihole"}
+    assert len(seen) == 1
+    assert seen[0][-3:] == list(dns_sanity.SANITY_CONTAINERS)
+
+
+def test_docker_ps_names_filters_to_sanity_containers(monkeypatch):
+    seen = []
+
+    def fake_run(cmd, **kwargs):
+        seen.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0, stdout="pihole\nunbound\n", stderr="")
+
+    monkeypatch.setattr(dns_sanity.subprocess, "run", fake_run)
+
+    assert dns_sanity._docker_ps_names("default") == ({"pihole", "unbound"}, True)
+    assert seen == [
+        [
+            "docker",
+            "--context",
+            "default",
+            "ps",
+            "--filter",
+            "name=^pihole$",
+            "--filter",
+            "name=^cloudflared$",
+            "--filter",
+            "name=^unbound$",
+            "--format",
+            "{{.Names}}",
+        ]
+    ]
+
+
+def test_subprocess_timeouts_warn_and_return_sentinels(monkeypatch):
+    budgets = []
+
+    def wedged_run(cmd, **kwargs):
+        budgets.append(kwargs["timeout"])
+        raise subprocess.TimeoutExpired(cmd, kwargs["timeout"])
+
+    warnings = []
+    monkeypatch.setenv("NLX_DOCKER_CONTEXT_VIA_CLI", "1")
+    monkeypatch.setattr(dns_sanity.subprocess, "run", wedged_run)
+    monkeypatch.setattr(dns_sanity.log, "warning", lambda *args: warnings.append(args))
+
+    assert dns_sanity._get_docker_context() is None
+    assert dns_sanity._docker_ps_names() == (set(), False)
+    assert dns_sanity._running_containers(("pihole",)) == set()
+
+    timeouts = dns_sanity.SUBPROCESS_TIMEOUTS
+    assert budgets == [timeouts["context"], timeouts["ps"], timeouts["inspect"]]
+    assert len(warnings) == 3
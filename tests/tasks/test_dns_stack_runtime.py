@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import dataclasses
 import hashlib
 import io
+import os
+import socket
+import subprocess
+import sys
 import tarfile
+import threading
 from pathlib import Path
 
 import nextlevelapex.tasks.dns_stack_runtime as runtime
@@ -23,6 +29,90 @@ def _cloudflared_archive(binary_payload: bytes = b"cloudflared") -> bytes:
     return stream.getvalue()
 
 
+def _stub_cloudflared_service(
+    monkeypatch, tmp_path, *, healthy: bool, state: str | None = "running", plist="<plist/>"
+):
+    agent_path = tmp_path / "com.local.doh.plist"
+    agent_path.write_text(plist, encoding="utf-8")
+    calls: list[str] = []
+    monkeypatch.setattr(
+        runtime,
+        "ensure_cloudflared_binary",
+        lambda settings, dry_run=False: runtime.CloudflaredBinaryResult(
+            True, path=Path("/opt/homebrew/bin/cloudflared")
+        ),
+    )
+    monkeypatch.setattr(runtime, "brew_available", lambda: False)
+    monkeypatch.setattr(
+        runtime,
+        "remove_legacy_containers",
+        lambda dry_run=False, container_names=(): runtime.StepResult(True),
+    )
+    monkeypatch.setattr(runtime, "LAUNCH_AGENT_PATH", agent_path)
+    monkeypatch.setattr(runtime, "render_launch_agent", lambda settings, binary: "<plist/>")
+    monkeypatch.setattr(runtime, "cloudflared_listener_healthy", lambda settings: healthy)
+    monkeypatch.setattr(runtime, "launch_agent_state", lambda: state)
+    monkeypatch.setattr(
+        runtime,
+        "reload_launch_agent",
+        lambda: calls.append("reload") or {"success": True},
+    )
+    monkeypatch.setattr(
+        runtime,
+        "kickstart_launch_agent",
+        lambda: calls.append("kickstart") or {"success": True},
+    )
+    monkeypatch.setattr(
+        runtime,
+        "wait_for_cloudflared_health",
+        lambda settings, timeout_seconds=10: calls.append("wait") or True,
+    )
+    return calls
+
+
+def test_ensure_cloudflared_service_noop_skips_reload_and_health_poll(monkeypatch, tmp_path):
+    calls = _stub_cloudflared_service(monkeypatch, tmp_path, healthy=True)
+
+    result = runtime.ensure_cloudflared_service(_settings())
+
+    assert result.success is True
+    assert result.changed is False
+    assert calls == []
+
+
+def test_ensure_cloudflared_service_kickstarts_loaded_unhealthy_agent(monkeypatch, tmp_path):
+    calls = _stub_cloudflared_service(monkeypatch, tmp_path, healthy=False)
+
+    result = runtime.ensure_cloudflared_service(_settings())
+
+    assert result.success is True
+    assert result.changed is True
+    assert calls == ["kickstart", "wait"]
+
+
+def test_ensure_cloudflared_service_bootstraps_new_plist_or_unloaded_agent(monkeypatch, tmp_path):
+    calls = _stub_cloudflared_service(monkeypatch, tmp_path, healthy=True, plist="<old/>")
+    assert runtime.ensure_cloudflared_service(_settings()).success is True
+    assert calls == ["reload", "wait"]
+
+    calls = _stub_cloudflared_service(monkeypatch, tmp_path, healthy=False, state=None)
+    assert runtime.ensure_cloudflared_service(_settings()).success is True
+    assert calls == ["reload", "wait"]
+
+
+def test_launch_agent_state_parses_launchctl_print(monkeypatch):
+    outcome = runtime.CommandOutcome(
+        ["launchctl"], 0, "gui/501/com.local.doh = {\n\tstate = not running\n\tpid = 0\n}", ""
+    )
+    monkeypatch.setattr(runtime, "_run", lambda cmd, timeout=10: outcome)
+    assert runtime.launch_agent_state() == "not running"
+    assert runtime.launch_agent_running() is False
+
+    missing = runtime.CommandOutcome(["launchctl"], 113, "", "Could not find service")
+    monkeypatch.setattr(runtime, "_run", lambda cmd, timeout=10: missing)
+    assert runtime.launch_agent_state() is None
+
+
 def test_needs_temporary_dns_release_only_for_disruptive_expected_resolver():
     assert runtime.needs_temporary_dns_release(["192.168.64.2"], True, False) is True
     assert runtime.needs_temporary_dns_release(["192.168.64.2"], False, True) is True
@@ -83,6 +173,34 @@ def test_render_launch_agent_uses_configured_upstreams():
     assert "<string>https://two.example/dns-query</string>" in rendered
 
 
+def test_render_launch_agent_persists_compiled_template(monkeypatch, tmp_path):
+    template = tmp_path / "agent.plist.j2"
+    template.write_text("<string>{{ CLOUDFLARED_BIN }}</string>", encoding="utf-8")
+    monkeypatch.setattr(runtime, "LAUNCH_AGENT_TEMPLATE", template)
+
+    rendered = runtime.render_launch_agent(_settings(), Path("/bin/one"))
+
+    assert rendered == "<string>/bin/one</string>"
+    assert len(list(runtime.JINJA_BYTECODE_CACHE_DIR.glob("__jinja2_*.cache"))) == 1
+
+
+def test_render_launch_agent_recompiles_only_when_template_changes(monkeypatch, tmp_path):
+    template = tmp_path / "agent.plist.j2"
+    template.write_text("<string>{{ CLOUDFLARED_BIN }}</string>", encoding="utf-8")
+    monkeypatch.setattr(runtime, "LAUNCH_AGENT_TEMPLATE", template)
+    settings = _settings()
+
+    first = runtime.render_launch_agent(settings, Path("/bin/one"))
+    runtime.render_launch_agent(settings, Path("/bin/two"))
+    assert first == "<string>/bin/one</string>"
+    assert runtime._compiled_launch_agent_template.cache_info().misses == 1
+
+    template.write_text("<path>{{ CLOUDFLARED_BIN }}</path>", encoding="utf-8")
+    stat = template.stat()
+    os.utime(template, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert runtime.render_launch_agent(settings, Path("/bin/one")) == "<path>/bin/one</path>"
+
+
 def test_cloudflared_release_url_targets_exact_darwin_asset(monkeypatch):
     settings = _settings()
     monkeypatch.setattr(runtime.platform, "system", lambda: "Darwin")
@@ -153,6 +271,34 @@ def test_ensure_cloudflared_binary_dry_run_reports_bootstrap(monkeypatch, tmp_pa
     assert any("Would bootstrap cloudflared 2025.5.0" in text for _, text in result.messages)
 
 
+def test_ensure_cloudflared_binary_skips_version_probe_for_missing_candidates(
+    monkeypatch, tmp_path
+):
+    settings = _settings(
+        {
+            "networking": {
+                "cloudflared_host_agent": {
+                    "binary_path": str(tmp_path / "missing-cloudflared"),
+                    "bootstrap_bin_dir": str(tmp_path / "bin"),
+                    "bootstrap_cache_dir": str(tmp_path / "cache"),
+                }
+            }
+        }
+    )
+    probed: list[object] = []
+    monkeypatch.setattr(runtime.platform, "system", lambda: "Darwin")
+    monkeypatch.setattr(runtime.platform, "machine", lambda: "arm64")
+    monkeypatch.setattr(
+        runtime, "cloudflared_version", lambda binary=None: probed.append(binary) or None
+    )
+
+    result = runtime.ensure_cloudflared_binary(settings, dry_run=True)
+
+    assert probed == []
+    assert [c["exists"] for c in result.evidence["candidates"]] == [False, False, False]
+    assert any("Preferred cloudflared binary is absent" in text for _, text in result.messages)
+
+
 def test_resolve_cloudflared_expected_sha256_parses_release_body_checksums(monkeypatch, tmp_path):
     settings = _settings()
     monkeypatch.setattr(
@@ -429,6 +575,9 @@ def test_orchestrate_dns_stack_releases_dns_before_disruptive_changes(monkeypatc
     monkeypatch.setattr(
         runtime, "remove_legacy_containers", lambda dry_run=False: runtime.StepResult(True)
     )
+    monkeypatch.setattr(
+        runtime, "start_pihole_image_prefetch", lambda settings: ({"present": True}, None)
+    )
     monkeypatch.setattr(
         runtime, "ensure_pihole_container", lambda settings, dry_run=False: runtime.StepResult(True)
     )
@@ -516,6 +665,9 @@ def test_orchestrate_dns_stack_releases_dns_when_expected_resolver_is_unhealthy(
     monkeypatch.setattr(
         runtime, "remove_legacy_containers", lambda dry_run=False: runtime.StepResult(True)
     )
+    monkeypatch.setattr(
+        runtime, "start_pihole_image_prefetch", lambda settings: ({"present": True}, None)
+    )
     monkeypatch.setattr(
         runtime, "ensure_pihole_container", lambda settings, dry_run=False: runtime.StepResult(True)
     )
@@ -544,7 +696,7 @@ def test_remove_legacy_containers_checks_default_context_when_active_is_colima(m
         if cmd[:5] == ["docker", "--context", "colima", "ps", "-a"]:
             return runtime.CommandOutcome(cmd, 0, "pihole\n", "")
         if cmd[:5] == ["docker", "--context", "default", "ps", "-a"]:
-            return runtime.CommandOutcome(cmd, 0, "cloudflared\n", "")
+            return runtime.CommandOutcome(cmd, 0, "cloudflared\nunbound\nweb\n", "")
         if cmd[:4] == ["docker", "--context", "default", "rm"]:
             removals.append(cmd)
             return runtime.CommandOutcome(cmd, 0, "cloudflared", "")
@@ -556,11 +708,39 @@ def test_remove_legacy_containers_checks_default_context_when_active_is_colima(m
     result = runtime.remove_legacy_containers()
 
     assert result.success is True
-    assert removals == [["docker", "--context", "default", "rm", "-f", "cloudflared"]]
-    assert any(
-        text == "Removed legacy container cloudflared from Docker context default."
-        for _, text in result.messages
-    )
+    assert removals == [["docker", "--context", "default", "rm", "-f", "cloudflared", "unbound"]]
+    for name in ("cloudflared", "unbound"):
+        assert (
+            Severity.INFO,
+            f"Removed legacy container {name} from Docker context default.",
+        ) in result.messages
+
+
+def test_remove_legacy_containers_reports_partial_batch_failure(monkeypatch):
+    listings = iter(["cloudflared\nunbound\n", "unbound\n"])
+
+    def fake_run(cmd: list[str], timeout: int) -> runtime.CommandOutcome:
+        if cmd[:5] == ["docker", "--context", "default", "ps", "-a"]:
+            return runtime.CommandOutcome(cmd, 0, next(listings), "")
+        if cmd[:4] == ["docker", "--context", "default", "rm"]:
+            return runtime.CommandOutcome(cmd, 1, "cloudflared\n", "unbound: device busy")
+        return runtime.CommandOutcome(cmd, 1, "", "unexpected command")
+
+    monkeypatch.setattr(runtime, "docker_context", lambda: "default")
+    monkeypatch.setattr(runtime, "_run", fake_run)
+
+    result = runtime.remove_legacy_containers()
+
+    assert result.success is False
+    assert result.changed is True
+    assert result.messages == [
+        (Severity.INFO, "Removed legacy container cloudflared from Docker context default."),
+        (Severity.ERROR, "Failed to remove legacy container unbound from Docker context default."),
+    ]
+    context_evidence = result.evidence["contexts"][0]
+    assert context_evidence["cloudflared"] == {"removed": True}
+    assert context_evidence["unbound"] == {"removed": False}
+    assert context_evidence["recheck"]["stdout"] == "unbound\n"
 
 
 def test_ensure_colima_runtime_honors_start_on_run_false(monkeypatch):
@@ -670,3 +850,156 @@ def test_audit_browser_dns_posture_detects_firefox_trr_override(tmp_path):
     assert audit["success"] is False
     assert audit["explicit_dns_overrides"][0]["browser"] == "Firefox"
     assert "network.trr.mode" in audit["explicit_dns_overrides"][0]["findings"]
+
+
+def _fake_resolver(replies: dict[bytes, tuple[int, int]]) -> tuple[socket.socket, threading.Thread]:
+    """Answer one query per entry with the (RCODE, ANCOUNT) mapped to its first QNAME label."""
+    server = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    server.bind(("127.0.0.1", 0))
+
+    def respond() -> None:
+        for _ in replies:
+            query, addr = server.recvfrom(512)
+            label = query[13 : 13 + query[12]]
+            rcode, ancount = replies[label]
+            flags = bytes([0x81, 0x80 | rcode])  # QR+RD, RA + rcode
+            header = query[:2] + flags + query[4:6] + ancount.to_bytes(2, "big")
+            server.sendto(header + query[8:], addr)
+
+    thread = threading.Thread(target=respond, daemon=True)
+    thread.start()
+    return server, thread
+
+
+def test_cloudflared_listener_healthy_probes_in_process(monkeypatch):
+    forked = []
+    monkeypatch.setattr(runtime, "_run", lambda cmd, **kwargs: forked.append(cmd))
+    server, thread = _fake_resolver({b"example": (0, 1), b"dnssec-failed": (2, 0)})
+    with server:
+        settings = dataclasses.replace(
+            _settings(), cloudflared_address="127.0.0.1", cloudflared_port=server.getsockname()[1]
+        )
+        assert runtime.cloudflared_listener_healthy(settings) is True
+        thread.join(timeout=2)
+    assert forked == []
+
+
+def test_udp_dns_query_reports_refused_port_as_no_answer():
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as placeholder:
+        placeholder.bind(("127.0.0.1", 0))
+        port = placeholder.getsockname()[1]
+    assert runtime.udp_dns_query("127.0.0.1", port, "example.com", timeout=0.5) is None
+
+
+def test_wait_for_cloudflared_health_backs_off_between_polls(monkeypatch):
+    probes = iter([False] * 6 + [True])
+    sleeps: list[float] = []
+    monkeypatch.setattr(runtime, "cloudflared_listener_healthy", lambda settings: next(probes))
+    monkeypatch.setattr(runtime.time, "sleep", sleeps.append)
+
+    assert runtime.wait_for_cloudflared_health(_settings()) is True
+    assert sleeps == [0.025, 0.05, 0.1, 0.2, 0.4, 0.4]
+
+
+def test_wait_for_pihole_health_backs_off_between_polls(monkeypatch):
+    outputs = iter([(1, "")] + [(0, "true starting\n")] * 6 + [(0, "true healthy\n")])
+    commands: list[list[str]] = []
+    sleeps: list[float] = []
+
+    def fake_run(cmd: list[str], timeout: int) -> runtime.CommandOutcome:
+        commands.append(cmd)
+        returncode, stdout = next(outputs)
+        return runtime.CommandOutcome(cmd, returncode, stdout, "")
+
+    monkeypatch.setattr(runtime, "_run", fake_run)
+    monkeypatch.setattr(runtime.time, "sleep", sleeps.append)
+
+    assert runtime.wait_for_pihole_health() is True
+    assert sleeps == [0.1, 0.2, 0.4, 0.8, 1.6, 2.0, 2.0]
+    assert commands[-1] == [
+        "docker",
+        "inspect",
+        "-f",
+        runtime.PIHOLE_HEALTH_TEMPLATE,
+        runtime.PIHOLE_CONTAINER,
+    ]
+
+
+def test_pihole_image_prefetch_skips_pull_when_image_is_local(monkeypatch):
+    monkeypatch.setattr(
+        runtime, "_run", lambda cmd, timeout: runtime.CommandOutcome(cmd, 0, "sha256:abc", "")
+    )
+
+    def no_popen(*args, **kwargs):
+        raise AssertionError("docker pull should not start for a local image")
+
+    monkeypatch.setattr(runtime.subprocess, "Popen", no_popen)
+
+    assert runtime.start_pihole_image_prefetch(_settings()) == ({"present": True}, None)
+
+
+def _start_background_pull(monkeypatch, script: str):
+    monkeypatch.setattr(
+        runtime, "_run", lambda cmd, timeout: runtime.CommandOutcome(cmd, 1, "", "No such image")
+    )
+    real_popen = subprocess.Popen
+    monkeypatch.setattr(
+        runtime.subprocess,
+        "Popen",
+        lambda cmd, **kwargs: real_popen([sys.executable, "-c", script], **kwargs),
+    )
+    return runtime.start_pihole_image_prefetch(_settings())
+
+
+def test_pihole_image_prefetch_records_finished_pull(monkeypatch):
+    evidence, pull = _start_background_pull(
+        monkeypatch, "import sys; sys.stderr.write('pulled\\n')"
+    )
+
+    assert pull is not None
+    result = runtime.finish_pihole_image_prefetch(evidence, pull)
+
+    assert result["present"] is False
+    assert result["pull"]["success"] is True
+    assert result["pull"]["stderr"] == "pulled"
+
+
+def test_pihole_image_prefetch_is_terminated_when_no_longer_needed(monkeypatch):
+    _, pull = _start_background_pull(monkeypatch, "import time; time.sleep(60)")
+
+    runtime.stop_pihole_image_prefetch(pull)
+
+    assert pull.poll() is not None
+
+
+def test_orchestrate_stops_prefetch_when_legacy_cleanup_fails(monkeypatch):
+    stopped = []
+    pull = object()
+    monkeypatch.setattr(runtime, "capture_runtime_snapshot", dict)
+    monkeypatch.setattr(runtime, "inspect_colima_runtime", lambda settings: {})
+    monkeypatch.setattr(runtime, "inspect_pihole_container", lambda settings: {})
+    monkeypatch.setattr(
+        runtime,
+        "ensure_cloudflared_service",
+        lambda settings, dry_run=False: runtime.StepResult(True),
+    )
+    monkeypatch.setattr(
+        runtime,
+        "ensure_colima_runtime",
+        lambda config, settings, dry_run=False: runtime.StepResult(True),
+    )
+    monkeypatch.setattr(
+        runtime, "ensure_docker_context_colima", lambda dry_run=False: runtime.StepResult(True)
+    )
+    monkeypatch.setattr(
+        runtime, "start_pihole_image_prefetch", lambda settings: ({"present": False}, pull)
+    )
+    monkeypatch.setattr(runtime, "stop_pihole_image_prefetch", stopped.append)
+    monkeypatch.setattr(
+        runtime, "remove_legacy_containers", lambda dry_run=False: runtime.StepResult(False)
+    )
+
+    result = runtime.orchestrate_dns_stack({}, dry_run=False)
+
+    assert result.success is False
+    assert stopped == [pull]
@@ -0,0 +1,132 @@
+from __future__ import annotations
+
+import json
+import threading
+
+import nextlevelapex.tasks.network as network
+from nextlevelapex.core.command import CommandResult
+from nextlevelapex.core.task import Severity
+
+
+def _context() -> dict:
+    return {"config": {"networking": {}}, "dry_run": False}
+
+
+def test_networking_probes_run_concurrently(monkeypatch):
+    all_probing = threading.Barrier(3, timeout=5)
+
+    def probe(value):
+        def _probe(*_args):
+            all_probing.wait()  # times out if the probes run one after another
+            return value
+
+        return _probe
+
+    monkeypatch.setattr(network, "_get_active_network_service_name", probe("Wi-Fi"))
+    monkeypatch.setattr(network, "_get_colima_network", probe(("192.168.64.2", "192.168.64.1")))
+    monkeypatch.setattr(network, "_get_vm_ip_from_docker_network", probe("172.17.0.1"))
+
+    result = network.setup_networking_tasks(_context())
+
+    assert result.success is True
+    assert (Severity.INFO, "Using interface: Wi-Fi") in result.messages
+    assert not any(level == Severity.WARNING for level, _ in result.messages)
+
+
+def test_networking_uses_docker_vm_ip_when_colima_has_none(monkeypatch):
+    monkeypatch.setattr(network, "_get_active_network_service_name", lambda: "Wi-Fi")
+    monkeypatch.setattr(network, "_get_colima_network", lambda dry_run: (None, "192.168.5.1"))
+    monkeypatch.setattr(network, "_get_vm_ip_from_docker_network", lambda dry_run: "172.17.0.1")
+
+    result = network.setup_networking_tasks(_context())
+
+    assert result.success is True
+    assert (Severity.WARNING, "Fallback Colima VM IP obtained via Docker.") in result.messages
+
+
+def test_colima_network_derives_host_ip_from_one_status_call(monkeypatch):
+    commands = []
+
+    def fake_run_command(cmd, **kwargs):
+        commands.append(cmd)
+        status = {"runtime": "docker", "network": {"address": "192.168.106.2"}}
+        return CommandResult(0, json.dumps(status), "", True)
+
+    monkeypatch.setattr(network, "run_command", fake_run_command)
+
+    assert network._get_colima_network() == ("192.168.106.2", "192.168.106.1")
+    assert commands == [["colima", "status", "--json"]]
+
+
+def test_docker_vm_ip_reads_only_the_gateway_field(monkeypatch):
+    commands = []
+
+    def fake_run_command(cmd, **kwargs):
+        commands.append(cmd)
+        return CommandResult(0, "172.17.0.1\n", "", True)
+
+    monkeypatch.setattr(network, "run_command", fake_run_command)
+
+    assert network._get_vm_ip_from_docker_network() == "172.17.0.1"
+    assert commands == [
+        ["docker", "network", "inspect", "-f", network.BRIDGE_GATEWAY_TEMPLATE, "bridge"]
+    ]
+
+
+def test_host_ip_fallback_uses_route_not_dns(monkeypatch):
+    monkeypatch.setattr(network, "_get_active_network_service_name", lambda: "Wi-Fi")
+    monkeypatch.setattr(network, "_get_colima_network", lambda dry_run: ("192.168.64.2", None))
+    monkeypatch.setattr(network, "_get_vm_ip_from_docker_network", lambda dry_run: None)
+    monkeypatch.setattr(network, "_get_host_ip_from_route", lambda: "10.0.0.5")
+
+    def no_dns(*_args):
+        raise AssertionError("host IP fallback must not resolve names")
+
+    monkeypatch.setattr(network.socket, "gethostbyname", no_dns)
+
+    result = network.setup_networking_tasks(_context())
+
+    assert (Severity.WARNING, "Fallback host IP from socket: 10.0.0.5") in result.messages
+
+
+def test_host_ip_from_route_reads_socket_source_address(monkeypatch):
+    calls = []
+
+    class FakeSocket:
+        def __init__(self, family, kind):
+            calls.append((family, kind))
+
+        def __enter__(self):
+            return self
+
+        def __exit__(self, *_exc):
+            return False
+
+        def connect(self, address):
+            calls.append(address)
+
+        def getsockname(self):
+            return ("10.0.0.5", 54321)
+
+    monkeypatch.setattr(network.socket, "socket", FakeSocket)
+
+    assert network._get_host_ip_from_route() == "10.0.0.5"
+    assert calls == [
+        (network.socket.AF_INET, network.socket.SOCK_DGRAM),
+        network.ROUTE_PROBE_ADDRESS,
+    ]
+
+
+def test_active_network_service_skips_header_and_disabled_services(monkeypatch):
+    listing = (
+        "An asterisk (*) denotes that a network service is disabled.\n"
+        "\n"
+        "  *Thunderbolt Bridge\n"
+        "  Wi-Fi  \r\n"
+        "USB 10/100/1000 LAN\n"
+    )
+    monkeypatch.setattr(
+        network, "run_command", lambda cmd, **kwargs: CommandResult(0, listing, "", True)
+    )
+
+    assert network._get_active_network_service_name() == "Wi-Fi"
@@ -1,7 +1,88 @@
-from nextlevelapex.core.task import TaskResult
+import subprocess
+import threading
+import time
+
+import pytest
+
+import nextlevelapex.tasks.security as security
+from nextlevelapex.core.task import Severity, TaskResult
 from nextlevelapex.tasks.security import security_task
 
 
 def test_security_smoke():
     res: TaskResult = security_task({"config": {"security": {}}, "dry_run": True, "verbose": False})
     assert res.success
+
+
+def test_security_subtasks_run_concurrently(monkeypatch):
+    both_running = threading.Barrier(2, timeout=5)
+
+    def subtask(name, success):
+        def _subtask(ctx, dry_run):
+            both_running.wait()  # times out if the subtasks run one after another
+            return TaskResult(name, success, True, [(Severity.INFO, name)])
+
+        return _subtask
+
+    monkeypatch.setattr(security, "_firewall_stealth", subtask("firewall", True))
+    monkeypatch.setattr(security, "_enable_touchid_sudo", subtask("touchid", False))
+
+    res = security_task({"config": {}, "dry_run": True})
+
+    assert res.success is False
+    assert res.changed is True
+    assert res.messages == [(Severity.INFO, "firewall"), (Severity.INFO, "touchid")]
+
+
+def test_security_prewarms_sudo_only_when_both_subtasks_need_it(monkeypatch):
+    commands = []
+
+    def fake_run(cmd, **kwargs):
+        commands.append((cmd, kwargs["timeout"]))
+        return subprocess.CompletedProcess(cmd, 0)
+
+    monkeypatch.setattr(security.subprocess, "run", fake_run)
+    for name in ("_firewall_stealth", "_enable_touchid_sudo"):
+        monkeypatch.setattr(security, name, lambda ctx, dry_run: TaskResult("sub", True, False))
+
+    security_task({"security": {"enable_firewall_stealth": True}, "dry_run": False})
+    assert commands == []
+
+    both = {"enable_firewall_stealth": True, "enable_touchid_sudo": True}
+    security_task({"security": both, "dry_run": False})
+    assert commands == [(["sudo", "-v"], security.SUDO_PREWARM_TIMEOUT)]
+
+
+@pytest.mark.parametrize(
+    "prewarm",
+    [
+        lambda cmd, **kwargs: subprocess.CompletedProcess(cmd, 1),
+        lambda cmd, **kwargs: (_ for _ in ()).throw(subprocess.TimeoutExpired(cmd, 60)),
+    ],
+)
+def test_security_runs_subtasks_serially_when_prewarm_fails(monkeypatch, prewarm):
+    running = threading.Lock()
+    order = []
+
+    def subtask(name):
+        def _subtask(ctx, dry_run):
+            assert running.acquire(blocking=False), "subtasks overlapped after failed sudo -v"
+            try:
+                time.sleep(0.05)
+                order.append(name)
+            finally:
+                running.release()
+            return TaskResult(name, True, True, [(Severity.INFO, name)])
+
+        return _subtask
+
+    monkeypatch.setattr(security.subprocess, "run", prewarm)
+    monkeypatch.setattr(security.log, "warning", lambda *args: None)
+    monkeypatch.setattr(security, "_firewall_stealth", subtask("firewall"))
+    monkeypatch.setattr(security, "_enable_touchid_sudo", subtask("touchid"))
+
+    both = {"enable_firewall_stealth": True, "enable_touchid_sudo": True}
+    res = security_task({"security": both, "dry_run": False})
+
+    assert res.success is True
+    assert order == ["firewall", "touchid"]
@@ -3,6 +3,7 @@ from __future__ import annotations
 import pytest
 from typer.testing import CliRunner
 
+import nextlevelapex.core.dns_diagnose as dns_diagnose
 import nextlevelapex.main2 as main2
 from nextlevelapex.core.dns_diagnose import DiagnoseSummary
 
@@ -28,7 +29,7 @@ def test_diagnose_without_task_prints_single_line_and_exits(monkeypatch, exit_co
         notes="ok",
         exit_code=exit_code,
     )
-    monkeypatch.setattr(main2, "collect_dns_summary", lambda: summary)
+    monkeypatch.setattr(dns_diagnose, "collect_dns_summary", lambda: summary)
 
     result = runner.invoke(main2.app, ["diagnose"])
 
@@ -1,6 +1,10 @@
+from dataclasses import dataclass, field
+from pathlib import Path
+
 import pytest
 
-import nextlevelapex.tasks.launch_agents  # noqa: F401
+import nextlevelapex.tasks.launch_agents as launch_agents
+from nextlevelapex.core.command import CommandResult
 from nextlevelapex.core.registry import get_task_registry
 from nextlevelapex.core.task import Severity, TaskResult
 from nextlevelapex.tasks.launch_agents import setup_battery_alert_agent_task
@@ -13,6 +17,32 @@ class DummyCtx(dict):
         self["config"] = {}
 
 
+@dataclass
+class RecordedCommands:
+    home: Path
+    listing: str = "PID\tStatus\tLabel\n"  # what `launchctl list` reports
+    calls: list[list[str]] = field(default_factory=list)
+
+    def run(self, cmd, dry_run=False, check=True):
+        self.calls.append(cmd)
+        stdout = self.listing if cmd == ["launchctl", "list"] else ""
+        return CommandResult(0, stdout, "", True)
+
+    def heads(self) -> list[list[str]]:
+        return [cmd[:2] for cmd in self.calls]
+
+
+@pytest.fixture
+def agent_home(monkeypatch, tmp_path):
+    """A tmp home directory, a recording run_command, and a fresh launchctl survey."""
+    recorded = RecordedCommands(tmp_path)
+    monkeypatch.setattr(launch_agents.Path, "home", lambda: tmp_path)
+    monkeypatch.setattr(launch_agents, "run_command", recorded.run)
+    launch_agents._loaded_launch_agent_labels.cache_clear()
+    yield recorded
+    launch_agents._loaded_launch_agent_labels.cache_clear()
+
+
 def test_launch_agents_in_registry():
     """Ensure our launch agents wrappers are registered correctly."""
     import importlib
@@ -54,3 +84,74 @@ def test_battery_alert_agent_task(
     else:
         # On success, messages list should be empty
         assert result.messages == []
+
+
+def test_manage_launch_agent_skips_reload_when_unchanged_and_loaded(agent_home):
+    agent_home.listing += "-\t0\tcom.example.test\n"
+
+    assert launch_agents._manage_launch_agent("com.example.test.plist", "<plist/>", False)
+    assert agent_home.heads() == [
+        ["plutil", "-lint"],
+        ["launchctl", "bootout"],
+        ["launchctl", "bootstrap"],
+    ]
+
+    agent_home.calls.clear()
+    assert launch_agents._manage_launch_agent("com.example.test.plist", "<plist/>", False)
+    assert agent_home.heads() == [["launchctl", "list"]]
+
+    agent_home.calls.clear()
+    assert launch_agents._manage_launch_agent("com.example.test.plist", "<plist v2/>", False)
+    assert ["launchctl", "bootstrap"] in agent_home.heads()
+
+
+def test_launch_agent_files_written_with_final_modes(agent_home):
+    script = agent_home.home / "bin" / "alert.sh"
+    assert launch_agents._write_executable_script(script, "#!/bin/bash\n", False)
+    assert script.read_text() == "#!/bin/bash\n"
+    assert script.stat().st_mode & 0o777 == 0o755
+
+    assert launch_agents._manage_launch_agent("com.example.modes.plist", "<plist/>", False)
+    plist = agent_home.home / "Library" / "LaunchAgents" / "com.example.modes.plist"
+    assert plist.stat().st_mode & 0o777 == 0o644
+    assert list(plist.parent.glob(".*.tmp")) == []
+
+
+def test_unchanged_script_is_not_rewritten(monkeypatch, tmp_path):
+    script = tmp_path / "alert.sh"
+    assert launch_agents._write_executable_script(script, "#!/bin/bash\n", False)
+
+    writes = []
+    monkeypatch.setattr(
+        launch_agents, "atomic_write_text", lambda path, content, perms=None: writes.append(path)
+    )
+    assert launch_agents._write_executable_script(script, "#!/bin/bash\n", False)
+    assert writes == []
+
+    script.chmod(0o644)  # lost its exec bit: rewrite even though the bytes match
+    assert launch_agents._write_executable_script(script, "#!/bin/bash\n", False)
+    assert writes == [script]
+
+
+def test_plist_lint_skipped_for_previously_linted_content(agent_home):
+    # The agent was booted out between runs, so `launchctl list` never shows it
+    for _ in range(2):
+        assert launch_agents._manage_launch_agent("com.example.lint.plist", "<plist/>", False)
+    assert agent_home.heads().count(["plutil", "-lint"]) == 1
+    assert ["launchctl", "bootstrap"] in agent_home.heads()[-3:]
+
+    agent_home.calls.clear()
+    assert launch_agents._manage_launch_agent("com.example.lint.plist", "<plist v2/>", False)
+    assert ["plutil", "-lint"] in agent_home.heads()
+
+
+def test_unchanged_agents_share_one_launchctl_survey(agent_home):
+    agents_dir = agent_home.home / "Library" / "LaunchAgents"
+    agents_dir.mkdir(parents=True)
+    for label in ("com.example.one", "com.example.two"):
+        (agents_dir / f"{label}.plist").write_text("<plist/>")
+    agent_home.listing += "412\t0\tcom.example.one\n-\t0\tcom.example.two\n"
+
+    assert launch_agents._manage_launch_agent("com.example.one.plist", "<plist/>", False)
+    assert launch_agents._manage_launch_agent("com.example.two.plist", "<plist/>", False)
+    assert agent_home.calls == [["launchctl", "list"]]
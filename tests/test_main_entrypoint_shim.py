@@ -205,3 +205,133 @@ def test_auto_fix_uses_failed_sections_fallback_and_passes_runtime_context(monke
     assert captured[0]["context"]["dry_run"] is True
     assert state["task_status"]["Task A"]["status"] == "PENDING"
     assert "No remediation plan available for Task A." in result.output
+
+
+def test_auto_fix_skips_post_flight_when_plan_has_no_actions(monkeypatch):
+    import nextlevelapex.main2 as main2
+
+    runs: list[str] = []
+    state = {
+        "version": "2.0",
+        "last_run_status": "UNKNOWN",
+        "completed_sections": [],
+        "failed_sections": [],
+        "task_status": {"Task A": {"status": "FAIL", "last_update": None}},
+        "file_hashes": {},
+        "health_history": {},
+        "service_versions": {},
+        "last_report_path": None,
+    }
+
+    def fake_run_task(task_name, task_callable, context):
+        runs.append(context["mode"])
+        return {"status": "FAIL", "remediation_plan": {"description": "noop", "actions": []}}
+
+    monkeypatch.setattr(main2, "load_state", lambda _path: state)
+    monkeypatch.setattr(main2, "discover_tasks", lambda: {"Task A": object()})
+    monkeypatch.setattr(main2, "load_config", dict)
+    monkeypatch.setattr(main2, "run_task", fake_run_task)
+
+    result = CliRunner().invoke(main2.app, ["auto-fix"])
+
+    assert result.exit_code == 0, result.output
+    assert runs == ["diagnose"]
+    assert "Post-flight validation" not in result.output
+    assert "Remediation failed to clear the fault in Task A." in result.output
+
+
+@pytest.mark.parametrize(
+    ("filters", "expected_exit"),
+    [
+        (["ZZZ", "n t"], 0),  # any filter may match, case-insensitively
+        (["Known Task ("], 1),  # regex metacharacters are matched literally
+    ],
+)
+def test_main2_task_filter_matches_substrings_literally(monkeypatch, filters, expected_exit):
+    import nextlevelapex.main2 as main2
+
+    state = {
+        "version": "2.0",
+        "last_run_status": "UNKNOWN",
+        "completed_sections": [],
+        "failed_sections": [],
+        "task_status": {},
+        "file_hashes": {},
+        "health_history": {},
+        "service_versions": {},
+        "last_report_path": None,
+    }
+
+    monkeypatch.setattr(
+        main2, "discover_tasks", lambda: {"Known Task": lambda ctx: {"status": "PASS"}}
+    )
+    monkeypatch.setattr(main2, "load_state", lambda _path: state)
+    monkeypatch.setattr(main2, "load_config", dict)
+    monkeypatch.setattr(main2, "discover_files_for_hashing", list)
+    monkeypatch.setattr(main2, "save_state", lambda *_a, **_k: True)
+
+    args = ["--dry-run", "--no-reports"]
+    for f in filters:
+        args += ["--task", f]
+    result = CliRunner().invoke(main2.app, args)
+
+    assert result.exit_code == expected_exit, result.output
+    assert "Traceback" not in result.output
+
+
+def test_main2_ensure_task_state_prunes_stale_tasks():
+    import nextlevelapex.main2 as main2
+
+    state = {
+        "task_status": {"Kept": {"status": "PASS"}, "Gone": {"status": "FAIL"}},
+        "health_history": {"Gone": [], "Other Gone": []},
+    }
+    main2.ensure_task_state(state, ["Kept", "New"])
+
+    assert state["task_status"] == {
+        "Kept": {"status": "PASS"},
+        "New": {"status": "PENDING", "last_update": None},
+    }
+    assert state["health_history"] == {"Kept": [], "New": []}
+
+
+def test_install_archiver_is_idempotent_when_plist_unchanged(monkeypatch, tmp_path):
+    import nextlevelapex.main2 as main2
+
+    calls: list[list[str]] = []
+
+    def fake_run(cmd, **kwargs):
+        calls.append(cmd)
+        return subprocess.CompletedProcess(cmd, 0)
+
+    monkeypatch.setattr(main2.Path, "home", lambda: tmp_path)
+    monkeypatch.setattr(main2.shutil, "which", lambda _name: "/usr/local/bin/poetry")
+    monkeypatch.setattr(main2.subprocess, "run", fake_run)
+    runner = CliRunner()
+
+    first = runner.invoke(main2.app, ["install-archiver"])
+    assert first.exit_code == 0, first.output
+    plist = tmp_path / "Library" / "LaunchAgents" / "com.nextlevelapex.archiver.plist"
+    assert "<string>/usr/local/bin/poetry</string>" in plist.read_text()
+    assert [cmd[1] for cmd in calls] == ["unload", "load"]
+
+    calls.clear()
+    second = runner.invoke(main2.app, ["install-archiver"])
+    assert second.exit_code == 0, second.output
+    assert "already up to date" in second.output
+    assert calls == [["launchctl", "list", "com.nextlevelapex.archiver"]]
+
+
+def test_archiver_agent_treated_as_unloaded_when_launchctl_hangs(monkeypatch):
+    import nextlevelapex.main2 as main2
+
+    budgets: list[float] = []
+
+    def wedged_run(cmd, **kwargs):
+        budgets.append(kwargs["timeout"])
+        raise subprocess.TimeoutExpired(cmd, kwargs["timeout"])
+
+    monkeypatch.setattr(main2.subprocess, "run", wedged_run)
+
+    assert main2._archiver_agent_loaded() is False
+    assert budgets == [10]
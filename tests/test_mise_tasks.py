@@ -37,7 +37,7 @@ def test_mise_task_behavior(monkeypatch):
     # Force the underlying function to succeed/fail
     monkeypatch.setattr(
         "nextlevelapex.tasks.mise.setup_mise_globals",
-        lambda tools, dry_run: True,
+        lambda tools, dry_run, jobs: True,
     )
 
     ctx = DummyCtx(dry_run=False)
@@ -48,10 +48,40 @@ def test_mise_task_behavior(monkeypatch):
     # Now simulate failure
     monkeypatch.setattr(
         "nextlevelapex.tasks.mise.setup_mise_globals",
-        lambda tools, dry_run: False,
+        lambda tools, dry_run, jobs: False,
     )
 
     ctx = DummyCtx(dry_run=False)
     result_fail: TaskResult = setup_mise_globals_task(ctx)
     assert result_fail.success is False
     assert any(sev == Severity.ERROR for sev, _ in result_fail.messages)
+
+
+def test_ensure_mise_activation_ignores_commented_lines(tmp_path):
+    from nextlevelapex.tasks.mise import MISE_ACTIVATION_LINE, ensure_mise_activation
+
+    zshrc = tmp_path / ".zshrc"
+    zshrc.write_text(f"export PATH=/opt/bin:$PATH\n  # {MISE_ACTIVATION_LINE}\n")
+
+    assert ensure_mise_activation(str(zshrc))
+    assert ensure_mise_activation(str(zshrc))  # second run finds the appended line
+
+    lines = zshrc.read_text().splitlines()
+    assert lines.count(MISE_ACTIVATION_LINE) == 1
+    assert lines[1] == f"  # {MISE_ACTIVATION_LINE}"
+
+
+def test_setup_mise_globals_pins_and_installs_in_one_call(monkeypatch):
+    import nextlevelapex.tasks.mise as mise
+    from nextlevelapex.core.command import CommandResult
+
+    commands = []
+
+    def fake_run_command(cmd, dry_run=False, check=True):
+        commands.append(cmd)
+        return CommandResult(0, "", "", True)
+
+    monkeypatch.setattr(mise, "run_command", fake_run_command)
+
+    assert mise.setup_mise_globals({"python": "3.11.9", "node": "20"}, jobs=2)
+    assert commands == [["mise", "use", "--global", "--jobs", "2", "python@3.11.9", "node@20"]]
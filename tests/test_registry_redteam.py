@@ -60,3 +60,31 @@ class TestRegistryRedteam(unittest.TestCase):
         # Run discover_tasks()
         discovered = discover_tasks()
         self.assertIn("Benign Task", discovered)
+
+    def test_discover_tasks_reuses_loaded_modules(self):
+        """Already-imported task modules are served from sys.modules without re-importing."""
+        from unittest.mock import patch
+
+        discover_tasks()
+        with patch("nextlevelapex.main2.importlib.import_module") as mock_import:
+            discover_tasks()
+        mock_import.assert_not_called()
+
+    def test_registered_tasks_snapshot_refreshes_after_registration(self):
+        """get_registered_tasks reuses one immutable snapshot until a new task registers."""
+        from nextlevelapex.tasks import base_task
+
+        before = base_task.get_registered_tasks()
+        self.assertIs(base_task.get_registered_tasks(), before)
+
+        def extra_task(ctx):
+            return {"status": "PASS"}
+
+        try:
+            base_task.register_task(extra_task)
+            after = base_task.get_registered_tasks()
+            self.assertIsInstance(after, tuple)
+            self.assertEqual(after, (*before, extra_task))
+        finally:
+            base_task._registered_tasks.remove(extra_task)
+            base_task._registered_tasks_snapshot = None
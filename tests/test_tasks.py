@@ -1,7 +1,11 @@
+import os
+import threading
+
 import pytest
 
 import nextlevelapex.tasks.brew
 import nextlevelapex.tasks.ollama  # noqa: F401
+from nextlevelapex.core.command import CommandResult
 from nextlevelapex.core.registry import get_task_registry
 from nextlevelapex.core.task import Severity, TaskResult
 from nextlevelapex.tasks.brew import ensure_brew_shellenv_task, install_brew_task
@@ -32,6 +36,50 @@ def test_ollama_task_returns_taskresult(dry_run, monkeypatch):
         assert any(sev == Severity.ERROR for sev, _ in result.messages)
 
 
+def test_ollama_pulls_models_concurrently(monkeypatch):
+    import nextlevelapex.tasks.ollama as ollama
+
+    models = ["mistral:7b", "llama3:8b", "phi3:mini"]
+    all_pulling = threading.Barrier(len(models), timeout=5)
+    pulled = []
+
+    def fake_run_command(cmd, dry_run=False, check=True):
+        if cmd[:2] == ["ollama", "pull"]:
+            all_pulling.wait()  # deadlocks (and times out) if pulls run one at a time
+            pulled.append(cmd[2])
+            return CommandResult(0 if cmd[2] != "phi3:mini" else 1, "", "", cmd[2] != "phi3:mini")
+        return CommandResult(0, "", "", True)
+
+    monkeypatch.setattr(ollama, "run_command", fake_run_command)
+    config = {"local_ai": {"ollama": {"enable": True, "models_to_pull": models}}}
+
+    assert ollama.setup_ollama(config) is True
+    assert sorted(pulled) == sorted(models)
+
+
+@pytest.mark.parametrize(("force_reinstall", "expect_install"), [(False, False), (True, True)])
+def test_ollama_skips_brew_install_when_on_path(monkeypatch, force_reinstall, expect_install):
+    import nextlevelapex.tasks.ollama as ollama
+
+    commands = []
+
+    def fake_run_command(cmd, dry_run=False, check=True):
+        commands.append(cmd)
+        return CommandResult(0, "", "", True)
+
+    monkeypatch.setattr(ollama, "run_command", fake_run_command)
+    monkeypatch.setattr(ollama.shutil, "which", lambda name: f"/opt/homebrew/bin/{name}")
+    config = {
+        "local_ai": {
+            "ollama": {"enable": True, "force_reinstall": force_reinstall, "models_to_pull": []}
+        }
+    }
+
+    assert ollama.setup_ollama(config) is True
+    assert (["brew", "install", "ollama"] in commands) is expect_install
+    assert ["brew", "services", "start", "ollama"] in commands
+
+
 def test_brew_tasks(monkeypatch):
     # Patch install_brew() to succeed and shellenv to fail
     monkeypatch.setattr("nextlevelapex.tasks.brew.install_brew", lambda dry_run: True)
@@ -63,3 +111,119 @@ def test_registry_contains_tasks():
     assert "Homebrew Install" in names
     assert "Homebrew Shellenv" in names
     assert "Colima Setup" in names  # ← ✅ added
+
+
+def test_brew_path_lookup_is_cached_until_install(monkeypatch, tmp_path):
+    import nextlevelapex.tasks.brew as brew
+
+    brew_bin = tmp_path / "brew"
+    monkeypatch.setattr(brew, "BREW_CANDIDATE_PATHS", (tmp_path / "missing", brew_bin))
+    brew._brew_path.cache_clear()
+    try:
+        assert brew.is_brew_installed() is False
+
+        brew_bin.write_text("#!/bin/sh\n")
+        assert brew.is_brew_installed() is False  # negative result is cached
+
+        def fake_run_command(cmd, dry_run, check):
+            return CommandResult(0, "", "", True)
+
+        monkeypatch.setattr(brew, "run_command", fake_run_command)
+        assert brew.install_brew(dry_run=False) is True
+        assert brew._brew_path() == brew_bin
+    finally:
+        brew._brew_path.cache_clear()
+
+
+SHELLENV_OUTPUT = (
+    'export HOMEBREW_PREFIX="{p}";\n'
+    'export HOMEBREW_CELLAR="{p}/Cellar";\n'
+    'export HOMEBREW_REPOSITORY="{p}";\n'
+    'export PATH="{p}/bin:{p}/sbin${{PATH+:$PATH}}";\n'
+    '[ -z "${{MANPATH-}}" ] || export MANPATH=":${{MANPATH#:}}";\n'
+)
+
+
+def _shellenv_fixture(monkeypatch, tmp_path):
+    import nextlevelapex.tasks.brew as brew
+
+    brew_bin = tmp_path / "homebrew" / "bin" / "brew"
+    brew_bin.parent.mkdir(parents=True)
+    brew_bin.write_text("#!/bin/sh\n")
+    monkeypatch.setattr(brew, "_brew_path", lambda: brew_bin)
+    monkeypatch.setattr(brew.Path, "home", lambda: tmp_path)
+    for var in (*brew.BREW_SHELLENV_VARS, "PATH"):
+        monkeypatch.setenv(var, "/usr/bin" if var == "PATH" else "")
+    calls = []
+
+    def fake_run_command(cmd, dry_run, check):
+        calls.append(cmd)
+        return CommandResult(0, SHELLENV_OUTPUT.format(p=brew_bin.parent.parent), "", True)
+
+    monkeypatch.setattr(brew, "run_command", fake_run_command)
+    return brew, brew_bin, calls
+
+
+def test_brew_shellenv_exports_parsed_with_path_expansion(monkeypatch, tmp_path):
+    brew, brew_bin, calls = _shellenv_fixture(monkeypatch, tmp_path)
+    prefix = str(brew_bin.parent.parent)
+
+    assert brew.ensure_brew_shellenv(dry_run=False) is True
+    assert len(calls) == 1
+    assert os.environ["HOMEBREW_PREFIX"] == prefix
+    assert os.environ["HOMEBREW_CELLAR"] == f"{prefix}/Cellar"
+    assert os.environ["PATH"] == f"{prefix}/bin:{prefix}/sbin:/usr/bin"
+    assert f'eval "$({brew_bin} shellenv)"' in (tmp_path / ".zprofile").read_text()
+
+
+def test_brew_shellenv_skipped_when_environment_already_set(monkeypatch, tmp_path):
+    brew, brew_bin, calls = _shellenv_fixture(monkeypatch, tmp_path)
+    prefix = str(brew_bin.parent.parent)
+    monkeypatch.setenv("HOMEBREW_PREFIX", prefix)
+    monkeypatch.setenv("HOMEBREW_CELLAR", f"{prefix}/Cellar")
+    monkeypatch.setenv("HOMEBREW_REPOSITORY", prefix)
+
+    assert brew.ensure_brew_shellenv(dry_run=False) is True
+    assert calls == []
+
+
+def test_brew_shellenv_does_not_duplicate_zprofile_entry(monkeypatch, tmp_path):
+    brew, brew_bin, _calls = _shellenv_fixture(monkeypatch, tmp_path)
+    profile = tmp_path / ".zprofile"
+    profile.write_text(f'export EDITOR=vim\neval "$({brew_bin} shellenv)"\n')
+
+    assert brew.ensure_brew_shellenv(dry_run=False) is True
+    assert profile.read_text().count(f'eval "$({brew_bin} shellenv)"') == 1
+
+
+@pytest.mark.parametrize(
+    ("value", "env", "expected"),
+    [
+        ("/b${PATH+:$PATH}", {"PATH": "/usr/bin"}, "/b:/usr/bin"),
+        ("/b${PATH+:$PATH}", {}, "/b"),
+        ("/i:${INFOPATH:-}", {}, "/i:"),
+        ("${EDITOR:-vi}", {"EDITOR": ""}, "vi"),
+        ("${HOME}/x:$USER", {"HOME": "/h", "USER": "me"}, "/h/x:me"),
+    ],
+)
+def test_expand_shell_parameters(value, env, expected):
+    import nextlevelapex.tasks.brew as brew
+
+    assert brew._expand_shell_parameters(value, env) == expected
+
+
+def test_shellenv_export_pattern_handles_quoting_styles():
+    import nextlevelapex.tasks.brew as brew
+
+    output = (
+        'export A="double";\n'
+        "  export B='single'\n"
+        "export C=bare;\n"
+        'export D="";\n'
+        'fpath[1,0]="/opt/homebrew/share/zsh/site-functions";\n'
+    )
+    parsed = {
+        m.group(1): next(v for v in m.groups()[1:] if v is not None)
+        for m in brew.SHELLENV_EXPORT_PATTERN.finditer(output)
+    }
+    assert parsed == {"A": "double", "B": "single", "C": "bare", "D": ""}